@@ -1,12 +1,22 @@
 """
 appointment/executor.py — DentalBot v2
 New date/time parsers + old try/except logic on all DB functions.
+
+Every DB function has an async twin (a-prefixed, e.g. abook_appointment)
+that runs the same SQL through adb_cursor() for the voice bridge.
+
+Availability checks answer from appointment/slot_index.py when it is live
+and fall back to the SQL below when it can't be sure.
 """
 
 import re
-import traceback
 from datetime import datetime, date, timedelta
-from db.db_connection import db_cursor
+from db.db_connection import db_cursor, adb_cursor
+from appointment import slot_index
+from utils.date_time_utils import format_time_hhmm, CLINIC_START, CLINIC_END, SLOT_MINUTES
+from utils.logger import get_logger
+
+log = get_logger("appointment")
 
 
 DENTISTS = [
@@ -15,17 +25,22 @@ DENTISTS = [
     "Dr. Sarah Mitchell"
 ]
 
+MAX_ALTERNATIVES = 3      # SLOT_TAKEN alternatives, drawn from the SLOT_MINUTES grid
+
+UNIQUE_VIOLATION = "23505"
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DATE / TIME PARSERS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def parse_date_str(date_str: str) -> str:
+def parse_date_str(date_str: str, today: date = None) -> str:
+    """today: what "tomorrow" / "friday" are relative to (default: now)."""
     if not date_str:
         return None
 
     s     = date_str.lower().strip()
-    today = date.today()
+    today = today or date.today()
 
     if "today"    in s: return today.strftime("%Y-%m-%d")
     if "tomorrow" in s: return (today + timedelta(days=1)).strftime("%Y-%m-%d")
@@ -64,7 +79,7 @@ def parse_time_str(time_str: str) -> str:
 
     s = time_str.lower().strip()
 
-    match = re.match(r'^(\d{1,2}):(\d{2})$', s)
+    match = re.match(r'^(\d{1,2}):(\d{2})(?::\d{2})?$', s)
     if match:
         h, m = int(match.group(1)), int(match.group(2))
         return f"{h:02d}:{m:02d}"
@@ -85,119 +100,331 @@ def parse_time_str(time_str: str) -> str:
     return time_str
 
 
+def typed_slot(parsed_date, parsed_time):
+    """
+    (date, time) for the DATE / TIME columns, or None when the parsers let an
+    unparseable value through unchanged ("next week", "lunchtime").
+    """
+    try:
+        return (datetime.strptime(parsed_date, "%Y-%m-%d").date(),
+                datetime.strptime(parsed_time, "%H:%M").time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _invalid_slot_result():
+    return {
+        "status":  "INVALID_DATETIME",
+        "message": (
+            "I didn't quite catch that date and time. Could you say it again, "
+            "for example 'Tuesday the 5th of March at 10 in the morning'?"
+        )
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # AVAILABILITY
 # ─────────────────────────────────────────────────────────────────────────────
 
-def check_dentist_availability(date_str, time_str, dentist_name):
-    parsed_date = parse_date_str(date_str)
-    parsed_time = parse_time_str(time_str)
+# Both probe uq_appointments_confirmed_slot — UNIQUE (preferred_dentist,
+# preferred_date, preferred_time) WHERE status = 'confirmed' — so each check is
+# an index lookup that stops at the first match, however long the history.
+_AVAILABILITY_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM appointments
+        WHERE preferred_dentist = %s
+          AND preferred_date    = %s
+          AND preferred_time    = %s
+          AND status            = 'confirmed'
+    )
+"""
 
-    try:
-        with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT COUNT(*) FROM appointments
-                WHERE preferred_date    = %s
-                  AND preferred_time    = %s
-                  AND preferred_dentist = %s
-                  AND status            = 'confirmed'
-            """, (parsed_date, parsed_time, dentist_name))
-            count = cursor.fetchone()[0]
-
-        if count > 0:
-            return {
-                "status":       "UNAVAILABLE",
-                "dentist":      dentist_name,
-                "date":         parsed_date,
-                "time":         parsed_time,
-                "message":      f"{dentist_name} is not available at that time."
-            }
+# NOT EXISTS rather than NOT IN: one index probe per dentist, and no
+# all-or-nothing surprise if the subquery ever yields a NULL
+_FIND_DENTIST_SQL = """
+    SELECT d.dentist_name FROM dentists d
+    WHERE NOT EXISTS (
+        SELECT 1 FROM appointments a
+        WHERE a.preferred_dentist = d.dentist_name
+          AND a.preferred_date    = %s
+          AND a.preferred_time    = %s
+          AND a.status            = 'confirmed'
+    )
+    ORDER BY d.dentist_name
+    LIMIT 1
+"""
+
+
+def _availability_result(taken, dentist_name, parsed_date, parsed_time):
+    if taken:
+        return {
+            "status":       "UNAVAILABLE",
+            "dentist":      dentist_name,
+            "date":         parsed_date,
+            "time":         parsed_time,
+            "message":      f"{dentist_name} is not available at that time."
+        }
+    return {
+        "status":  "AVAILABLE",
+        "dentist": dentist_name,
+        "date":    parsed_date,
+        "time":    parsed_time
+    }
+
+
+def _find_dentist_result(row, parsed_date, parsed_time):
+    if row:
         return {
             "status":  "AVAILABLE",
-            "dentist": dentist_name,
+            "dentist": row[0],
             "date":    parsed_date,
             "time":    parsed_time
         }
+    return {
+        "status":  "UNAVAILABLE",
+        "message": "No dentists available at that date and time."
+    }
+
+
+def check_dentist_availability(date_str, time_str, dentist_name):
+    parsed_date = parse_date_str(date_str)
+    parsed_time = parse_time_str(time_str)
+    slot        = typed_slot(parsed_date, parsed_time)
+    if slot is None:
+        return _invalid_slot_result()
+
+    taken = slot_index.is_taken(dentist_name, *slot)
+    if taken is not None:
+        return _availability_result(taken, dentist_name, parsed_date, parsed_time)
+
+    try:
+        with db_cursor() as (cursor, conn):
+            cursor.execute(_AVAILABILITY_SQL, (dentist_name, *slot))
+            taken = cursor.fetchone()[0]
+        return _availability_result(taken, dentist_name, parsed_date, parsed_time)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[APPOINTMENT] ❌ check_dentist_availability failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def acheck_dentist_availability(date_str, time_str, dentist_name):
+    parsed_date = parse_date_str(date_str)
+    parsed_time = parse_time_str(time_str)
+    slot        = typed_slot(parsed_date, parsed_time)
+    if slot is None:
+        return _invalid_slot_result()
+
+    taken = slot_index.is_taken(dentist_name, *slot)
+    if taken is not None:
+        return _availability_result(taken, dentist_name, parsed_date, parsed_time)
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_AVAILABILITY_SQL, (dentist_name, *slot))
+            taken = (await cursor.fetchone())[0]
+        return _availability_result(taken, dentist_name, parsed_date, parsed_time)
+
+    except Exception as e:
+        log.exception("[APPOINTMENT] ❌ acheck_dentist_availability failed")
         return {"status": "ERROR", "message": str(e)}
 
 
 def find_available_dentist(date_str, time_str):
     parsed_date = parse_date_str(date_str)
     parsed_time = parse_time_str(time_str)
+    slot        = typed_slot(parsed_date, parsed_time)
+    if slot is None:
+        return _invalid_slot_result()
+
+    free = slot_index.free_dentists(*slot)
+    if free is not None:
+        return _find_dentist_result(free[:1], parsed_date, parsed_time)
 
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT dentist_name FROM dentists
-                WHERE dentist_name NOT IN (
-                    SELECT preferred_dentist FROM appointments
-                    WHERE preferred_date = %s
-                      AND preferred_time = %s
-                      AND status         = 'confirmed'
-                )
-                LIMIT 1
-            """, (parsed_date, parsed_time))
+            cursor.execute(_FIND_DENTIST_SQL, slot)
             row = cursor.fetchone()
+        return _find_dentist_result(row, parsed_date, parsed_time)
 
-        if row:
-            return {
-                "status":  "AVAILABLE",
-                "dentist": row[0],
-                "date":    parsed_date,
-                "time":    parsed_time
-            }
-        return {
-            "status":  "UNAVAILABLE",
-            "message": "No dentists available at that date and time."
-        }
+    except Exception as e:
+        log.exception("[APPOINTMENT] ❌ find_available_dentist failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def afind_available_dentist(date_str, time_str):
+    parsed_date = parse_date_str(date_str)
+    parsed_time = parse_time_str(time_str)
+    slot        = typed_slot(parsed_date, parsed_time)
+    if slot is None:
+        return _invalid_slot_result()
+
+    free = slot_index.free_dentists(*slot)
+    if free is not None:
+        return _find_dentist_result(free[:1], parsed_date, parsed_time)
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_FIND_DENTIST_SQL, slot)
+            row = await cursor.fetchone()
+        return _find_dentist_result(row, parsed_date, parsed_time)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[APPOINTMENT] ❌ afind_available_dentist failed")
         return {"status": "ERROR", "message": str(e)}
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# SLOT CONFLICTS
+# uq_appointments_confirmed_slot (db/migrations/004) is the arbiter: booking
+# inserts only if the slot is free and rescheduling moves only if the target is
+# free, each in a single statement — no table locks, no check-then-write gap
+# between two lines that both heard "AVAILABLE".
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Free slots nearest the one asked for: same dentist at other times that day,
+# or another dentist at the same time
+_ALTERNATIVES_SQL = """
+    SELECT d.dentist_name, s.slot::time
+    FROM dentists d
+    CROSS JOIN generate_series(%(day)s::date + %(open)s::time,
+                               %(day)s::date + %(last)s::time,
+                               make_interval(mins => %(step)s)) AS s(slot)
+    WHERE (d.dentist_name = %(dentist)s OR s.slot::time = %(time)s)
+      AND NOT EXISTS (
+          SELECT 1 FROM appointments a
+          WHERE a.preferred_dentist = d.dentist_name
+            AND a.preferred_date    = %(day)s
+            AND a.preferred_time    = s.slot::time
+            AND a.status            = 'confirmed'
+      )
+    ORDER BY abs(extract(epoch FROM s.slot::time - %(time)s::time)),
+             d.dentist_name <> %(dentist)s,
+             s.slot
+    LIMIT %(limit)s
+"""
+
+
+def _alternatives_params(dentist, day, t):
+    last = (datetime.combine(day, CLINIC_END) - timedelta(minutes=SLOT_MINUTES)).time()
+    return {
+        "dentist": dentist, "day": day, "time": t,
+        "open": CLINIC_START, "last": last,
+        "step": SLOT_MINUTES, "limit": MAX_ALTERNATIVES
+    }
+
+
+def _slot_taken_result(rows, dentist, day, t):
+    alternatives = [
+        {"dentist": r[0], "date": str(day), "time": format_time_hhmm(r[1])}
+        for r in rows
+    ]
+    spoken = ", ".join(f"{a['time']} with {a['dentist']}" for a in alternatives)
+    return {
+        "status":       "SLOT_TAKEN",
+        "dentist":      dentist,
+        "date":         str(day),
+        "time":         format_time_hhmm(t),
+        "alternatives": alternatives,
+        "message": (
+            f"{dentist} is already booked at that time. "
+            + (f"Nearest free on that day: {spoken}." if spoken
+               else "There are no other free times that day.")
+        )
+    }
+
+
+def _is_slot_conflict(e) -> bool:
+    """UniqueViolation from either driver (psycopg2 .pgcode, psycopg 3 .sqlstate)."""
+    return (getattr(e, "pgcode", None) or getattr(e, "sqlstate", None)) == UNIQUE_VIOLATION
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # BOOKING
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Insert-if-free: a taken slot inserts nothing and returns no row
+_BOOK_SQL = """
+    INSERT INTO appointments
+    (patient_id, first_name, last_name, date_of_birth,
+     contact_number, preferred_treatment, preferred_date,
+     preferred_time, preferred_dentist, status)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,'confirmed')
+    ON CONFLICT (preferred_dentist, preferred_date, preferred_time)
+        WHERE status = 'confirmed'
+        DO NOTHING
+    RETURNING appointment_id
+"""
+
+
+def _booked_result(appt_id, preferred_treatment, parsed_date, parsed_time, preferred_dentist):
+    return {
+        "status":         "BOOKED",
+        "appointment_id": appt_id,
+        "treatment":      preferred_treatment,
+        "date":           parsed_date,
+        "time":           parsed_time,
+        "dentist":        preferred_dentist
+    }
+
+
 def book_appointment(patient_id, first_name, last_name, date_of_birth,
                      contact_number, preferred_treatment,
                      preferred_date, preferred_time, preferred_dentist):
 
     parsed_date = parse_date_str(preferred_date)
     parsed_time = parse_time_str(preferred_time)
+    slot        = typed_slot(parsed_date, parsed_time)
+    if slot is None:
+        return _invalid_slot_result()
 
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                INSERT INTO appointments
-                (patient_id, first_name, last_name, date_of_birth,
-                 contact_number, preferred_treatment, preferred_date,
-                 preferred_time, preferred_dentist, status)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,'confirmed')
-                RETURNING appointment_id
-            """, (
+            cursor.execute(_BOOK_SQL, (
                 patient_id, first_name, last_name, date_of_birth,
                 contact_number, preferred_treatment,
-                parsed_date, parsed_time, preferred_dentist
+                *slot, preferred_dentist
             ))
-            appt_id = cursor.fetchone()[0]
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(_ALTERNATIVES_SQL, _alternatives_params(preferred_dentist, *slot))
+                log.info("[APPOINTMENT] slot taken: %s %s %s", preferred_dentist, *slot)
+                return _slot_taken_result(cursor.fetchall(), preferred_dentist, *slot)
 
-        return {
-            "status":         "BOOKED",
-            "appointment_id": appt_id,
-            "treatment":      preferred_treatment,
-            "date":           parsed_date,
-            "time":           parsed_time,
-            "dentist":        preferred_dentist
-        }
+        return _booked_result(row[0], preferred_treatment, parsed_date, parsed_time, preferred_dentist)
+
+    except Exception as e:
+        log.exception("[APPOINTMENT] ❌ book_appointment failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def abook_appointment(patient_id, first_name, last_name, date_of_birth,
+                            contact_number, preferred_treatment,
+                            preferred_date, preferred_time, preferred_dentist):
+
+    parsed_date = parse_date_str(preferred_date)
+    parsed_time = parse_time_str(preferred_time)
+    slot        = typed_slot(parsed_date, parsed_time)
+    if slot is None:
+        return _invalid_slot_result()
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_BOOK_SQL, (
+                patient_id, first_name, last_name, date_of_birth,
+                contact_number, preferred_treatment,
+                *slot, preferred_dentist
+            ))
+            row = await cursor.fetchone()
+            if row is None:
+                await cursor.execute(_ALTERNATIVES_SQL, _alternatives_params(preferred_dentist, *slot))
+                log.info("[APPOINTMENT] slot taken: %s %s %s", preferred_dentist, *slot)
+                return _slot_taken_result(await cursor.fetchall(), preferred_dentist, *slot)
+
+        return _booked_result(row[0], preferred_treatment, parsed_date, parsed_time, preferred_dentist)
 
     except Exception as e:
-        print("[APPOINTMENT] ❌ book_appointment failed:")
-        traceback.print_exc()
+        log.exception("[APPOINTMENT] ❌ abook_appointment failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -205,36 +432,54 @@ def book_appointment(patient_id, first_name, last_name, date_of_birth,
 # FETCH ALL APPOINTMENTS
 # ─────────────────────────────────────────────────────────────────────────────
 
+_PATIENT_APPOINTMENTS_SQL = """
+    SELECT appointment_id, preferred_treatment,
+           preferred_date, preferred_time,
+           preferred_dentist, status
+    FROM appointments
+    WHERE patient_id = %s
+      AND status     = 'confirmed'
+    ORDER BY preferred_date ASC, preferred_time ASC
+"""
+
+
+def _patient_appointments_result(rows):
+    return {
+        "status": "SUCCESS",
+        "appointments": [
+            {
+                "_id":       r[0],
+                "treatment": r[1],
+                "date":      str(r[2]),
+                "time":      format_time_hhmm(r[3]),
+                "dentist":   r[4],
+                "status":    r[5]
+            } for r in rows
+        ]
+    }
+
+
 def get_patient_appointments(patient_id):
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT appointment_id, preferred_treatment,
-                       preferred_date, preferred_time,
-                       preferred_dentist, status
-                FROM appointments
-                WHERE patient_id = %s
-                  AND status     = 'confirmed'
-                ORDER BY preferred_date ASC
-            """, (patient_id,))
+            cursor.execute(_PATIENT_APPOINTMENTS_SQL, (patient_id,))
             rows = cursor.fetchall()
+        return _patient_appointments_result(rows)
 
-        return {
-            "status": "SUCCESS",
-            "appointments": [
-                {
-                    "_id":       r[0],
-                    "treatment": r[1],
-                    "date":      str(r[2]),
-                    "time":      str(r[3]),
-                    "dentist":   r[4],
-                    "status":    r[5]
-                } for r in rows
-            ]
-        }
+    except Exception as e:
+        log.exception("[APPOINTMENT] ❌ get_patient_appointments failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def aget_patient_appointments(patient_id):
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_PATIENT_APPOINTMENTS_SQL, (patient_id,))
+            rows = await cursor.fetchall()
+        return _patient_appointments_result(rows)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[APPOINTMENT] ❌ aget_patient_appointments failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -242,75 +487,175 @@ def get_patient_appointments(patient_id):
 # UPDATE
 # ─────────────────────────────────────────────────────────────────────────────
 
-def update_appointment(appointment_id, fields: dict):
-    if not fields:
-        return {"status": "ERROR", "message": "No fields to update."}
+SLOT_COLUMNS = ("preferred_dentist", "preferred_date", "preferred_time")
+
+_APPOINTMENT_SLOT_SQL = """
+    SELECT preferred_dentist, preferred_date, preferred_time
+    FROM appointments
+    WHERE appointment_id = %s
+"""
 
-    # Parse date/time if provided
+
+def _prepare_update(appointment_id, fields: dict):
+    """(sql, values), or (None, None) if a new date/time doesn't parse."""
+    # Parse date/time if provided — typed values for the DATE / TIME columns
     if "preferred_date" in fields:
-        fields["preferred_date"] = parse_date_str(fields["preferred_date"])
+        try:
+            fields["preferred_date"] = datetime.strptime(
+                parse_date_str(fields["preferred_date"]), "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None, None
     if "preferred_time" in fields:
-        fields["preferred_time"] = parse_time_str(fields["preferred_time"])
+        try:
+            fields["preferred_time"] = datetime.strptime(
+                parse_time_str(fields["preferred_time"]), "%H:%M").time()
+        except (TypeError, ValueError):
+            return None, None
 
     set_clause = ", ".join([f"{k} = %s" for k in fields.keys()])
     values     = list(fields.values()) + [appointment_id]
 
-    try:
-        with db_cursor() as (cursor, conn):
-            cursor.execute(f"""
-                UPDATE appointments
-                SET {set_clause}
-                WHERE appointment_id = %s
-                RETURNING preferred_treatment, preferred_date,
-                          preferred_time, preferred_dentist
-            """, values)
-            row = cursor.fetchone()
+    # Moving the slot: only if nobody else holds the target — an unchanged
+    # column is compared against the row's own value
+    guard = ""
+    if any(col in fields for col in SLOT_COLUMNS):
+        matches = []
+        for col in SLOT_COLUMNS:
+            if col in fields:
+                matches.append(f"b.{col} = %s")
+                values.append(fields[col])
+            else:
+                matches.append(f"b.{col} = a.{col}")
+        guard = f"""
+          AND NOT EXISTS (
+              SELECT 1 FROM appointments b
+              WHERE b.appointment_id <> a.appointment_id
+                AND b.status = 'confirmed'
+                AND {" AND ".join(matches)}
+          )"""
+
+    sql = f"""
+        UPDATE appointments a
+        SET {set_clause}
+        WHERE a.appointment_id = %s{guard}
+        RETURNING preferred_treatment, preferred_date,
+                  preferred_time, preferred_dentist
+    """
+    return sql, values
+
+
+def _target_slot(current_row, fields: dict) -> tuple:
+    """(dentist, date, time) the update was trying to move to."""
+    return tuple(fields.get(col, value) for col, value in zip(SLOT_COLUMNS, current_row))
+
+
+def _changed_result(status, row):
+    if not row:
+        return {"status": "ERROR", "message": "Appointment not found."}
+
+    return {
+        "status":    status,
+        "treatment": row[0],
+        "date":      str(row[1]),
+        "time":      format_time_hhmm(row[2]),
+        "dentist":   row[3]
+    }
 
-        if not row:
-            return {"status": "ERROR", "message": "Appointment not found."}
 
-        return {
-            "status":    "UPDATED",
-            "treatment": row[0],
-            "date":      str(row[1]),
-            "time":      str(row[2]),
-            "dentist":   row[3]
-        }
+def update_appointment(appointment_id, fields: dict):
+    if not fields:
+        return {"status": "ERROR", "message": "No fields to update."}
 
-    except Exception as e:
-        print("[APPOINTMENT] ❌ update_appointment failed:")
-        traceback.print_exc()
-        return {"status": "ERROR", "message": str(e)}
+    sql, values = _prepare_update(appointment_id, fields)
+    if sql is None:
+        return _invalid_slot_result()
+
+    for attempt in range(2):
+        try:
+            with db_cursor() as (cursor, conn):
+                cursor.execute(sql, values)
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(_APPOINTMENT_SLOT_SQL, (appointment_id,))
+                    current = cursor.fetchone()
+                    if current:
+                        target = _target_slot(current, fields)
+                        cursor.execute(_ALTERNATIVES_SQL, _alternatives_params(*target))
+                        log.info("[APPOINTMENT] slot taken: %s %s %s", *target)
+                        return _slot_taken_result(cursor.fetchall(), *target)
+            return _changed_result("UPDATED", row)
+
+        except Exception as e:
+            # Lost a race with a booking committed mid-statement; the re-run's
+            # guard sees it and answers SLOT_TAKEN
+            if attempt == 0 and _is_slot_conflict(e):
+                continue
+            log.exception("[APPOINTMENT] ❌ update_appointment failed")
+            return {"status": "ERROR", "message": str(e)}
+
+
+async def aupdate_appointment(appointment_id, fields: dict):
+    if not fields:
+        return {"status": "ERROR", "message": "No fields to update."}
+
+    sql, values = _prepare_update(appointment_id, fields)
+    if sql is None:
+        return _invalid_slot_result()
+
+    for attempt in range(2):
+        try:
+            async with adb_cursor() as (cursor, conn):
+                await cursor.execute(sql, values)
+                row = await cursor.fetchone()
+                if row is None:
+                    await cursor.execute(_APPOINTMENT_SLOT_SQL, (appointment_id,))
+                    current = await cursor.fetchone()
+                    if current:
+                        target = _target_slot(current, fields)
+                        await cursor.execute(_ALTERNATIVES_SQL, _alternatives_params(*target))
+                        log.info("[APPOINTMENT] slot taken: %s %s %s", *target)
+                        return _slot_taken_result(await cursor.fetchall(), *target)
+            return _changed_result("UPDATED", row)
+
+        except Exception as e:
+            if attempt == 0 and _is_slot_conflict(e):
+                continue
+            log.exception("[APPOINTMENT] ❌ aupdate_appointment failed")
+            return {"status": "ERROR", "message": str(e)}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CANCEL
 # ─────────────────────────────────────────────────────────────────────────────
 
+_CANCEL_SQL = """
+    UPDATE appointments
+    SET status = 'cancelled'
+    WHERE appointment_id = %s
+    RETURNING preferred_treatment, preferred_date,
+              preferred_time, preferred_dentist
+"""
+
+
 def cancel_appointment(appointment_id, reason=None):
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                UPDATE appointments
-                SET status = 'cancelled'
-                WHERE appointment_id = %s
-                RETURNING preferred_treatment, preferred_date,
-                          preferred_time, preferred_dentist
-            """, (appointment_id,))
+            cursor.execute(_CANCEL_SQL, (appointment_id,))
             row = cursor.fetchone()
+        return _changed_result("CANCELLED", row)
+
+    except Exception as e:
+        log.exception("[APPOINTMENT] ❌ cancel_appointment failed")
+        return {"status": "ERROR", "message": str(e)}
 
-        if not row:
-            return {"status": "ERROR", "message": "Appointment not found."}
 
-        return {
-            "status":    "CANCELLED",
-            "treatment": row[0],
-            "date":      str(row[1]),
-            "time":      str(row[2]),
-            "dentist":   row[3]
-        }
+async def acancel_appointment(appointment_id, reason=None):
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_CANCEL_SQL, (appointment_id,))
+            row = await cursor.fetchone()
+        return _changed_result("CANCELLED", row)
 
     except Exception as e:
-        print("[APPOINTMENT] ❌ cancel_appointment failed:")
-        traceback.print_exc()
+        log.exception("[APPOINTMENT] ❌ acancel_appointment failed")
         return {"status": "ERROR", "message": str(e)}
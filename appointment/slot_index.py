@@ -0,0 +1,257 @@
+"""
+appointment/slot_index.py — DentalBot v2
+
+In-process occupancy of confirmed appointment slots, so availability
+questions are answered from memory instead of a Railway round trip per turn.
+
+The calendar is tiny — 3 dentists × 18 half-hour slots per working day — so
+each (dentist, day) is a single int used as a bitset: bit i set means the
+slot at CLINIC_START + i × SLOT_MINUTES is confirmed.
+
+    await start()                   # app startup — loads + listens in the background
+    is_taken(dentist, day, t)       # True / False, or None = ask the DB
+    free_dentists(day, t)           # [names] in dentist_name order, or None = ask the DB
+    await close()                   # app shutdown
+
+- A dedicated autocommit psycopg 3 connection LISTENs on appointment_slots
+  (trigger: db/migrations/005) BEFORE loading the snapshot, so no change can
+  fall between the two; replaying one the snapshot already has is harmless —
+  each notification only sets or clears a bit
+- Covers today … SLOT_INDEX_DAYS ahead; reloads every SLOT_INDEX_REFRESH_S
+  so the window moves and edits to the dentists table are picked up
+- TCP keepalives on the connection, plus a SELECT 1 whenever
+  SLOT_INDEX_PING_S passes without a notification: a connection the proxy
+  dropped silently takes the index dark within a ping, rather than leaving
+  it answering from bits that no longer update
+- None whenever the index can't be sure — not loaded yet or listener down,
+  a date outside the window, a time off the grid — and the caller queries
+  the DB exactly as before
+- Advisory only: booking still goes through uq_appointments_confirmed_slot
+  (ON CONFLICT DO NOTHING), so a stale bit can cost a SLOT_TAKEN, never a
+  double booking
+"""
+
+import os
+import time
+import asyncio
+from datetime import date, time as dt_time, timedelta
+
+from db.db_connection import DATABASE_URL, CONNECT_KWARGS
+from utils import json_codec
+from utils.date_time_utils import CLINIC_START, CLINIC_END, SLOT_MINUTES
+from utils.logger import get_logger
+from utils.metrics import REGISTRY
+
+try:
+    import psycopg
+except ImportError:      # optional — without it every lookup goes to the DB
+    psycopg = None
+
+log = get_logger("slot_index")
+
+SLOT_INDEX_ENABLED        = os.getenv("SLOT_INDEX_ENABLED", "1") == "1"
+SLOT_INDEX_DAYS           = int(os.getenv("SLOT_INDEX_DAYS", "180"))
+SLOT_INDEX_REFRESH_S      = float(os.getenv("SLOT_INDEX_REFRESH_S", "3600"))
+SLOT_INDEX_RECONNECT_S    = float(os.getenv("SLOT_INDEX_RECONNECT_S", "5"))
+SLOT_INDEX_PING_S         = float(os.getenv("SLOT_INDEX_PING_S", "30"))
+SLOT_INDEX_PING_TIMEOUT_S = float(os.getenv("SLOT_INDEX_PING_TIMEOUT_S", "5"))
+
+CHANNEL = "appointment_slots"
+
+_FIRST_MINUTE = CLINIC_START.hour * 60 + CLINIC_START.minute
+SLOTS_PER_DAY = (CLINIC_END.hour * 60 + CLINIC_END.minute - _FIRST_MINUTE) // SLOT_MINUTES
+
+SLOT_INDEX_LOOKUPS = REGISTRY.counter(
+    "dentalbot_slot_index_lookups_total",
+    "Availability lookups by whether the in-memory index could answer.",
+    labelnames=("result",)      # hit | miss
+)
+SLOT_INDEX_NOTIFICATIONS = REGISTRY.counter(
+    "dentalbot_slot_index_notifications_total",
+    "appointment_slots notifications by outcome.",
+    labelnames=("outcome",)     # applied | reload | bad
+)
+SLOT_INDEX_READY = REGISTRY.gauge(
+    "dentalbot_slot_index_ready",
+    "1 while the slot index is loaded and listening, else 0."
+)
+
+_DENTISTS_SQL = "SELECT dentist_name FROM dentists ORDER BY dentist_name"
+
+_CONFIRMED_SLOTS_SQL = """
+    SELECT preferred_dentist, preferred_date, preferred_time
+    FROM appointments
+    WHERE status = 'confirmed'
+      AND preferred_date BETWEEN %s AND %s
+"""
+
+_occupied = {}      # (dentist, day) -> bitset of confirmed slots
+_dentists = ()      # dentist_name order, as _FIND_DENTIST_SQL returns them
+_window   = None    # (first, last) day covered; None while not live
+_task     = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BITSETS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _bit(t: dt_time) -> int | None:
+    """The slot's bit, or None for a time off the SLOT_MINUTES grid."""
+    if t.second or t.microsecond:
+        return None
+    minutes = t.hour * 60 + t.minute - _FIRST_MINUTE
+    if minutes < 0 or minutes % SLOT_MINUTES or minutes // SLOT_MINUTES >= SLOTS_PER_DAY:
+        return None
+    return 1 << (minutes // SLOT_MINUTES)
+
+
+def _mark(occupied: dict, dentist: str, day: date, t: dt_time, taken: bool):
+    bit = _bit(t)
+    if bit is None:
+        return
+    key  = (dentist, day)
+    bits = occupied.get(key, 0)
+    bits = bits | bit if taken else bits & ~bit
+    if bits:
+        occupied[key] = bits
+    else:
+        occupied.pop(key, None)
+
+
+def _lookup_bit(day: date, t: dt_time) -> int | None:
+    window = _window
+    bit    = _bit(t)
+    if window is None or bit is None or not window[0] <= day <= window[1]:
+        SLOT_INDEX_LOOKUPS.inc(result="miss")
+        return None
+    SLOT_INDEX_LOOKUPS.inc(result="hit")
+    return bit
+
+
+def is_taken(dentist: str, day: date, t: dt_time) -> bool | None:
+    bit = _lookup_bit(day, t)
+    if bit is None:
+        return None
+    return bool(_occupied.get((dentist, day), 0) & bit)
+
+
+def free_dentists(day: date, t: dt_time) -> list | None:
+    bit = _lookup_bit(day, t)
+    if bit is None:
+        return None
+    occupied = _occupied
+    return [d for d in _dentists if not occupied.get((d, day), 0) & bit]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOAD + LISTEN
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _go_dark():
+    global _window
+    _window = None
+    SLOT_INDEX_READY.set(0)
+
+
+async def _load(conn):
+    global _occupied, _dentists, _window
+    _go_dark()
+    first = date.today()
+    last  = first + timedelta(days=SLOT_INDEX_DAYS)
+
+    async with conn.cursor() as cursor:
+        await cursor.execute(_DENTISTS_SQL)
+        dentists = tuple(r[0] for r in await cursor.fetchall())
+        await cursor.execute(_CONFIRMED_SLOTS_SQL, (first, last))
+        rows = await cursor.fetchall()
+
+    occupied = {}
+    for dentist, day, t in rows:
+        _mark(occupied, dentist, day, t, True)
+
+    _occupied, _dentists, _window = occupied, dentists, (first, last)
+    SLOT_INDEX_READY.set(1)
+    log.info("[SLOT INDEX] ✅ %d confirmed slots loaded, %s → %s", len(rows), first, last)
+
+
+def _apply(payload: str) -> bool:
+    """Apply one notification; True when the index must be reloaded instead."""
+    try:
+        change = json_codec.loads(payload)
+        if change.get("reload"):
+            SLOT_INDEX_NOTIFICATIONS.inc(outcome="reload")
+            return True
+        for key, taken in (("old", False), ("new", True)):
+            if change.get(key):
+                dentist, day, t = change[key]
+                _mark(_occupied, dentist, date.fromisoformat(day), dt_time.fromisoformat(t), taken)
+    except Exception:
+        SLOT_INDEX_NOTIFICATIONS.inc(outcome="bad")
+        log.warning("[SLOT INDEX] Unreadable notification %r — reloading", payload)
+        return True
+    SLOT_INDEX_NOTIFICATIONS.inc(outcome="applied")
+    return False
+
+
+async def _ping(conn):
+    await asyncio.wait_for(conn.execute("SELECT 1"), SLOT_INDEX_PING_TIMEOUT_S)
+
+
+async def _follow(conn):
+    """Apply notifications until SLOT_INDEX_REFRESH_S is up or a reload is asked for."""
+    reload_at = time.monotonic() + SLOT_INDEX_REFRESH_S
+    while time.monotonic() < reload_at:
+        quiet_for = min(SLOT_INDEX_PING_S, max(0.0, reload_at - time.monotonic()))
+        async for notify in conn.notifies(timeout=quiet_for):
+            if _apply(notify.payload):
+                return
+        # notifications arriving during the ping are buffered for the next notifies()
+        await _ping(conn)
+
+
+async def _listen():
+    while True:
+        conn = None
+        try:
+            conn = await psycopg.AsyncConnection.connect(
+                DATABASE_URL, autocommit=True, **CONNECT_KWARGS
+            )
+            await conn.execute(f"LISTEN {CHANNEL}")
+            while True:
+                await _load(conn)
+                await _follow(conn)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("[SLOT INDEX] Listener down (%s: %s) — availability from the DB",
+                        type(e).__name__, e)
+        finally:
+            _go_dark()
+            if conn is not None:
+                try:
+                    await conn.close()
+                except Exception:
+                    pass
+        await asyncio.sleep(SLOT_INDEX_RECONNECT_S)
+
+
+async def start():
+    global _task
+    if not SLOT_INDEX_ENABLED or _task is not None:
+        return
+    if psycopg is None or not DATABASE_URL:
+        log.warning("[SLOT INDEX] Disabled (psycopg / DATABASE_URL missing) — availability from the DB")
+        return
+    _task = asyncio.create_task(_listen())
+
+
+async def close():
+    global _task
+    task, _task = _task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _go_dark()
@@ -0,0 +1,90 @@
+"""
+benchmarks/bench_audio_codec.py — DentalBot v2
+
+utils.audio_codec vs a naive per-sample Python loop (and audioop when the
+interpreter still ships it), per 20 ms Twilio frame and per 1 s of audio.
+
+    python -m benchmarks.bench_audio_codec
+"""
+
+import os
+import timeit
+import warnings
+
+import numpy as np
+
+from utils import audio_codec
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:      # Python 3.13+
+    audioop = None
+
+FRAME = os.urandom(160)                                    # 20 ms μ-law
+SECOND = os.urandom(8000)                                  # 1 s μ-law
+PCM_FRAME = audio_codec.ulaw_to_pcm16(FRAME).tobytes()
+
+
+# ── naive reference: G.711 per sample, straight from the spec ───────────────
+
+def _naive_ulaw2lin(buf: bytes) -> list:
+    out = []
+    for byte in buf:
+        u = ~byte & 0xFF
+        t = (((u & 0x0F) << 3) + 0x84) << ((u & 0x70) >> 4)
+        out.append(0x84 - t if u & 0x80 else t - 0x84)
+    return out
+
+
+def _naive_lin2ulaw(samples) -> bytes:
+    seg_end = (0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF)
+    out = bytearray()
+    for s in samples:
+        pcm = s >> 2
+        mask = 0x7F if pcm < 0 else 0xFF
+        pcm = min(abs(pcm), 8159) + 0x21
+        seg = next((i for i, end in enumerate(seg_end) if pcm <= end), 8)
+        out.append((0x7F if seg >= 8 else (seg << 4) | ((pcm >> (seg + 1)) & 0x0F)) ^ mask)
+    return bytes(out)
+
+
+def _us(fn, number) -> float:
+    return timeit.timeit(fn, number=number) / number * 1e6
+
+
+def main():
+    # parity with the naive loop (and audioop) before timing anything
+    decoded = audio_codec.ulaw_to_pcm16(SECOND)
+    assert decoded.tolist() == _naive_ulaw2lin(SECOND)
+    assert audio_codec.pcm16_to_ulaw(decoded).tobytes() == _naive_lin2ulaw(decoded.tolist())
+    if audioop is not None:
+        assert decoded.tobytes() == audioop.ulaw2lin(SECOND, 2)
+
+    frame_samples = np.frombuffer(PCM_FRAME, dtype=np.int16).tolist()
+    out_pcm  = np.empty(160, dtype=np.int16)
+    out_ulaw = np.empty(160, dtype=np.uint8)
+    view     = memoryview(FRAME)
+
+    print(f"resampler: {audio_codec.RESAMPLER}   audioop: {'yes' if audioop else 'no'}\n")
+    rows = [
+        ("ulaw→pcm16 20 ms  — naive loop",             lambda: _naive_ulaw2lin(FRAME), 20_000),
+        ("ulaw→pcm16 20 ms  — audio_codec",            lambda: audio_codec.ulaw_to_pcm16(FRAME), 200_000),
+        ("ulaw→pcm16 20 ms  — audio_codec out=, view", lambda: audio_codec.ulaw_to_pcm16(view, out=out_pcm), 200_000),
+        ("pcm16→ulaw 20 ms  — naive loop",             lambda: _naive_lin2ulaw(frame_samples), 5_000),
+        ("pcm16→ulaw 20 ms  — audio_codec",            lambda: audio_codec.pcm16_to_ulaw(PCM_FRAME), 200_000),
+        ("pcm16→ulaw 20 ms  — audio_codec out=",       lambda: audio_codec.pcm16_to_ulaw(PCM_FRAME, out=out_ulaw), 200_000),
+        ("ulaw→pcm16 1 s    — naive loop",             lambda: _naive_ulaw2lin(SECOND), 500),
+        ("ulaw→pcm16 1 s    — audio_codec",            lambda: audio_codec.ulaw_to_pcm16(SECOND), 20_000),
+        ("8k→24k 1 s        — resample()",             lambda: audio_codec.resample(decoded, 8000, 24000), 500),
+    ]
+    if audioop is not None:
+        rows[2:2] = [("ulaw→pcm16 20 ms  — audioop", lambda: audioop.ulaw2lin(FRAME, 2), 200_000)]
+
+    for label, fn, number in rows:
+        print(f"  {label:<46} {_us(fn, number):10.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
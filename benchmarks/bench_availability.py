@@ -0,0 +1,149 @@
+"""
+benchmarks/bench_availability.py — DentalBot v2
+
+check_dentist_availability / find_available_dentist over a multi-year
+appointment history: the old COUNT(*) / NOT IN queries on an unindexed
+table vs the EXISTS / NOT EXISTS queries probing
+uq_appointments_confirmed_slot (db/migrations/004).
+
+Builds TEMP tables (never touches real appointments): BENCH_YEARS of
+weekday half-hour slots for the three dentists, ~70% booked, ~10% of those
+cancelled.
+
+    DATABASE_URL=... python -m benchmarks.bench_availability [years]
+"""
+
+import sys
+import time
+import random
+import statistics
+
+from db.db_connection import db_cursor
+from appointment.executor import DENTISTS, _AVAILABILITY_SQL, _FIND_DENTIST_SQL
+
+BENCH_YEARS = 5
+PROBES      = 300
+
+
+def _bench(sql: str) -> str:
+    return (sql.replace("FROM appointments", "FROM bench_appointments")
+               .replace("FROM dentists", "FROM bench_dentists"))
+
+
+# pre-004 queries
+_OLD_AVAILABILITY_SQL = """
+    SELECT COUNT(*) FROM bench_appointments
+    WHERE preferred_date    = %s
+      AND preferred_time    = %s
+      AND preferred_dentist = %s
+      AND status            = 'confirmed'
+"""
+_OLD_FIND_DENTIST_SQL = """
+    SELECT dentist_name FROM bench_dentists
+    WHERE dentist_name NOT IN (
+        SELECT preferred_dentist FROM bench_appointments
+        WHERE preferred_date = %s
+          AND preferred_time = %s
+          AND status         = 'confirmed'
+    )
+    LIMIT 1
+"""
+_NEW_AVAILABILITY_SQL = _bench(_AVAILABILITY_SQL)
+_NEW_FIND_DENTIST_SQL = _bench(_FIND_DENTIST_SQL)
+
+
+def _build(cursor, years: int):
+    cursor.execute("CREATE TEMP TABLE bench_dentists (dentist_name TEXT NOT NULL UNIQUE)")
+    cursor.executemany("INSERT INTO bench_dentists VALUES (%s)", [(d,) for d in DENTISTS])
+    cursor.execute("""
+        CREATE TEMP TABLE bench_appointments (
+            appointment_id    SERIAL PRIMARY KEY,
+            patient_id        INT,
+            preferred_dentist TEXT NOT NULL,
+            preferred_date    DATE NOT NULL,
+            preferred_time    TIME NOT NULL,
+            status            TEXT DEFAULT 'confirmed'
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO bench_appointments
+            (patient_id, preferred_dentist, preferred_date, preferred_time, status)
+        SELECT (random() * 100000)::int, d.dentist_name, day::date, slot::time,
+               CASE WHEN random() < 0.1 THEN 'cancelled' ELSE 'confirmed' END
+        FROM generate_series(CURRENT_DATE - make_interval(years => %s),
+                             CURRENT_DATE + 90, interval '1 day') AS day
+        CROSS JOIN generate_series(TIMESTAMP '2000-01-01 09:00',
+                                   TIMESTAMP '2000-01-01 17:30', interval '30 min') AS slot
+        CROSS JOIN bench_dentists d
+        WHERE extract(isodow FROM day) < 6
+          AND random() < 0.7
+    """, (years,))
+    cursor.execute("SELECT COUNT(*) FROM bench_appointments")
+    rows = cursor.fetchone()[0]
+    cursor.execute("ANALYZE bench_appointments")
+    return rows
+
+
+def _probes(cursor) -> list:
+    cursor.execute("""
+        SELECT preferred_dentist, preferred_date, preferred_time FROM bench_appointments
+        ORDER BY random() LIMIT %s
+    """, (PROBES,))
+    return cursor.fetchall()
+
+
+def _time(cursor, sql, params) -> list:
+    samples = []
+    for p in params:
+        started = time.perf_counter()
+        cursor.execute(sql, p)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _plan(cursor, sql, params) -> str:
+    cursor.execute("EXPLAIN " + sql, params)
+    return cursor.fetchone()[0].strip()
+
+
+def _report(label, samples, plan):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<36} p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+    print(f"  {'':<36} {plan}")
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else BENCH_YEARS
+    with db_cursor() as (cursor, conn):
+        rows   = _build(cursor, years)
+        print(f"{rows:,} appointments over {years} years\n")
+        probes = _probes(cursor)
+        random.shuffle(probes)
+        old_check = [(day, t, dentist) for dentist, day, t in probes]
+        new_check = [(dentist, day, t) for dentist, day, t in probes]
+        find      = [(day, t) for _, day, t in probes]
+
+        _report("check  — COUNT(*), no index", _time(cursor, _OLD_AVAILABILITY_SQL, old_check),
+                _plan(cursor, _OLD_AVAILABILITY_SQL, old_check[0]))
+        _report("find   — NOT IN, no index", _time(cursor, _OLD_FIND_DENTIST_SQL, find),
+                _plan(cursor, _OLD_FIND_DENTIST_SQL, find[0]))
+
+        cursor.execute("""
+            CREATE UNIQUE INDEX ON bench_appointments
+                (preferred_dentist, preferred_date, preferred_time)
+                WHERE status = 'confirmed'
+        """)
+        cursor.execute("ANALYZE bench_appointments")
+
+        _report("check  — EXISTS, slot index", _time(cursor, _NEW_AVAILABILITY_SQL, new_check),
+                _plan(cursor, _NEW_AVAILABILITY_SQL, new_check[0]))
+        _report("find   — NOT EXISTS, slot index", _time(cursor, _NEW_FIND_DENTIST_SQL, find),
+                _plan(cursor, _NEW_FIND_DENTIST_SQL, find[0]))
+
+        cursor.execute("DROP TABLE bench_appointments, bench_dentists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+benchmarks/bench_json_codec.py — DentalBot v2
+
+Per-frame cost of the WebSocket JSON hot path, before vs after utils.json_codec.
+
+    python -m benchmarks.bench_json_codec
+"""
+
+import os
+import json
+import base64
+import timeit
+
+from utils import json_codec
+from utils.json_codec import TwilioMediaFrames, input_audio_append
+
+N = 200_000
+
+STREAM_SID = "MZ" + "0123456789abcdef" * 2
+PAYLOAD    = base64.b64encode(os.urandom(160)).decode()     # one 20 ms μ-law frame
+EVENT      = json.dumps({
+    "type": "response.audio.delta", "event_id": "event_123", "response_id": "resp_123",
+    "item_id": "item_123", "output_index": 0, "content_index": 0, "delta": PAYLOAD,
+})
+
+
+def _per_frame_us(fn) -> float:
+    return timeit.timeit(fn, number=N) / N * 1e6
+
+
+def main():
+    frames = TwilioMediaFrames(STREAM_SID)
+
+    # parity: template output must equal the generic encoders byte for byte
+    media_dict = {"event": "media", "streamSid": STREAM_SID, "media": {"payload": PAYLOAD}}
+    assert frames.media(PAYLOAD) == json_codec.stdlib_dumps(media_dict) == json_codec.dumps(media_dict)
+    append_dict = {"type": "input_audio_buffer.append", "audio": PAYLOAD}
+    assert input_audio_append(PAYLOAD) == json_codec.stdlib_dumps(append_dict)
+
+    print(f"backend: {json_codec.BACKEND}   frames: {N:,}\n")
+    rows = [
+        ("outbound media frame  — json.dumps(dict)",
+         lambda: json.dumps({"event": "media", "streamSid": STREAM_SID, "media": {"payload": PAYLOAD}})),
+        ("outbound media frame  — json_codec.dumps(dict)",
+         lambda: json_codec.dumps({"event": "media", "streamSid": STREAM_SID, "media": {"payload": PAYLOAD}})),
+        ("outbound media frame  — TwilioMediaFrames.media()",
+         lambda: frames.media(PAYLOAD)),
+        ("inbound append        — json.dumps(dict)",
+         lambda: json.dumps({"type": "input_audio_buffer.append", "audio": PAYLOAD})),
+        ("inbound append        — input_audio_append()",
+         lambda: input_audio_append(PAYLOAD)),
+        ("audio.delta event     — json.loads",
+         lambda: json.loads(EVENT)),
+        ("audio.delta event     — json_codec.loads",
+         lambda: json_codec.loads(EVENT)),
+    ]
+    for label, fn in rows:
+        print(f"  {label:<52} {_per_frame_us(fn):7.3f} µs/frame")
+
+
+if __name__ == "__main__":
+    main()
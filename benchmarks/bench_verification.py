@@ -0,0 +1,117 @@
+"""
+benchmarks/bench_verification.py — DentalBot v2
+
+verify_by_lastname_dob latency at clinic-chain scale, before and after
+db/migrations/002_patients_dob_date (TEXT DOB cast per row vs DATE column +
+idx_patients_lastname_dob).
+
+Builds a TEMP table (never touches real patients) with BENCH_PATIENTS rows,
+times random verification probes against the old schema/query, migrates the
+table the way 002 does, and times the executor's current query.
+
+    DATABASE_URL=... python -m benchmarks.bench_verification [rows]
+"""
+
+import sys
+import time
+import random
+import statistics
+
+from db.db_connection import db_cursor
+from verification.verification_executor import _PATIENT_BY_LASTNAME_DOB_SQL
+
+BENCH_PATIENTS = 100_000
+PROBES         = 300
+
+# pre-migration: TEXT DOB cast on the fly, nothing indexable
+_OLD_SQL = """
+    SELECT patient_id, first_name, last_name,
+        date_of_birth, contact_number, insurance_info
+    FROM bench_patients
+    WHERE TRIM(LOWER(last_name)) = TRIM(%s)
+    AND date_of_birth::date = %s::date
+"""
+_NEW_SQL = _PATIENT_BY_LASTNAME_DOB_SQL.replace("FROM patients", "FROM bench_patients")
+
+
+def _build(cursor, rows: int):
+    cursor.execute("""
+        CREATE TEMP TABLE bench_patients (
+            patient_id     SERIAL PRIMARY KEY,
+            first_name     TEXT NOT NULL,
+            last_name      TEXT NOT NULL,
+            date_of_birth  TEXT NOT NULL,
+            contact_number TEXT NOT NULL,
+            insurance_info TEXT
+        ) ON COMMIT PRESERVE ROWS
+    """)
+    cursor.execute("""
+        INSERT INTO bench_patients (first_name, last_name, date_of_birth, contact_number)
+        SELECT 'First' || i,
+               'Surname' || (i % 20000),
+               to_char(DATE '1940-01-01' + (i * 7919 % 29000), 'YYYY-MM-DD'),
+               '04' || lpad((i * 104729 % 100000000)::text, 8, '0')
+        FROM generate_series(1, %s) AS i
+    """, (rows,))
+    cursor.execute("ANALYZE bench_patients")
+
+
+def _probes(cursor) -> list:
+    cursor.execute("""
+        SELECT lower(last_name), date_of_birth FROM bench_patients
+        ORDER BY random() LIMIT %s
+    """, (PROBES,))
+    return [(name, str(dob)) for name, dob in cursor.fetchall()]
+
+
+def _time(cursor, sql, probes) -> list:
+    samples = []
+    for name, dob in probes:
+        started = time.perf_counter()
+        cursor.execute(sql, (name, dob))
+        cursor.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _plan(cursor, sql, probe) -> str:
+    cursor.execute("EXPLAIN " + sql, probe)
+    return cursor.fetchone()[0].strip()
+
+
+def _report(label, samples, plan):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<28} p50 {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+    print(f"  {'':<28} {plan}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else BENCH_PATIENTS
+    with db_cursor() as (cursor, conn):
+        print(f"building {rows:,} patients...")
+        _build(cursor, rows)
+        probes = _probes(cursor)
+        random.shuffle(probes)
+
+        before = _time(cursor, _OLD_SQL, probes)
+        _report("TEXT dob, no index", before, _plan(cursor, _OLD_SQL, probes[0]))
+
+        cursor.execute("""
+            ALTER TABLE bench_patients
+                ALTER COLUMN date_of_birth TYPE DATE USING date_of_birth::date
+        """)
+        cursor.execute("""
+            CREATE INDEX ON bench_patients (lower(trim(last_name)), date_of_birth)
+        """)
+        cursor.execute("ANALYZE bench_patients")
+
+        after = _time(cursor, _NEW_SQL, probes)
+        _report("DATE dob + expression index", after, _plan(cursor, _NEW_SQL, probes[0]))
+
+        print(f"\n  speed-up (p50): {statistics.median(before) / statistics.median(after):.0f}x")
+        cursor.execute("DROP TABLE bench_patients")
+
+
+if __name__ == "__main__":
+    main()
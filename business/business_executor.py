@@ -13,10 +13,12 @@ Supplier flow (Type 3):
 from db.db_connection import db_cursor
 from utils.phone_utils import normalize_phone
 from utils.text_utils import title_case
-import traceback
+from utils.logger import get_logger
 
+log = get_logger("business")
 
-# ── Known suppliers (seeded once via create_tables.py) ───────────────────────
+
+# ── Known suppliers (seeded by db/migrations/000_baseline.py) ──────────────
 KNOWN_SUPPLIERS = [
     {
         "supplier_id":   1,
@@ -110,7 +112,7 @@ def log_business_call(
             conn.commit()
         return {"status": "LOGGED"}
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[BUSINESS] ❌ log_business_call failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -158,7 +160,7 @@ def update_order_by_patient_id(
             "message": f"No pending order found for patient_id={patient_id} with product '{product_name}'.",
         }
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[BUSINESS] ❌ update_order_by_patient_id failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -204,7 +206,7 @@ def update_order_status_by_patient_name(
             "message": f"No pending order found for {patient_name} / {product_name}.",
         }
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[BUSINESS] ❌ update_order_status_by_patient_name failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -235,7 +237,7 @@ def get_all_pending_orders() -> dict:
             "count": len(rows),
         }
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[BUSINESS] ❌ get_all_pending_orders failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -264,5 +266,5 @@ def get_orders_for_patient(patient_id: int) -> dict:
             "count": len(rows),
         }
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[BUSINESS] ❌ get_orders_for_patient failed")
         return {"status": "ERROR", "message": str(e)}
\ No newline at end of file
@@ -47,7 +47,7 @@ def show_summary():
         with db_cursor() as (cursor, conn):
             cursor.execute(
                 "SELECT COUNT(*) FROM appointments "
-                "WHERE preferred_date::date = %s AND status != 'cancelled'",
+                "WHERE preferred_date = %s AND status != 'cancelled'",
                 (today,)
             )
             today_count = cursor.fetchone()[0]
@@ -9,7 +9,9 @@ Two-path complaint saving:
 from db.db_connection import db_cursor
 from utils.text_utils import title_case
 from utils.phone_utils import normalize_phone, format_phone_for_speech
-import traceback
+from utils.logger import get_logger
+
+log = get_logger("complaint")
 
 
 def save_complaint(
@@ -56,7 +58,7 @@ def save_complaint(
         norm_contact = normalize_phone(contact_number)
         contact_spoken = format_phone_for_speech(norm_contact)
 
-        print(f"[COMPLAINT] TYPE 1 (general) — {patient_name_full}")
+        log.info("[COMPLAINT] TYPE 1 (general) — %s", patient_name_full)
         try:
             with db_cursor() as (cursor, conn):
                 cursor.execute(
@@ -82,7 +84,7 @@ def save_complaint(
                 ),
             }
         except Exception as e:
-            traceback.print_exc()
+            log.exception("[COMPLAINT] ❌ save_complaint failed")
             return {"status": "ERROR", "message": str(e)}
 
     # ── TYPE 2 validation ─────────────────────────────────
@@ -93,7 +95,7 @@ def save_complaint(
                 "message": "Patient must be verified before filing a treatment complaint.",
             }
 
-        print(f"[COMPLAINT] TYPE 2 (treatment) — patient_id={patient_id}")
+        log.info("[COMPLAINT] TYPE 2 (treatment) — patient_id=%s", patient_id)
         try:
             with db_cursor() as (cursor, conn):
                 cursor.execute(
@@ -131,7 +133,7 @@ def save_complaint(
                 ),
             }
         except Exception as e:
-            traceback.print_exc()
+            log.exception("[COMPLAINT] ❌ save_complaint failed")
             return {"status": "ERROR", "message": str(e)}
 
 
@@ -162,5 +164,5 @@ def get_complaints_by_patient_id(patient_id: int) -> dict:
             "count": len(rows),
         }
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[COMPLAINT] ❌ get_complaints_by_patient_id failed")
         return {"status": "ERROR", "message": str(e)}
\ No newline at end of file
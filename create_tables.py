@@ -141,157 +141,27 @@
 #     create_tables()
 """
 reset_db.py — DentalBot v2
-Completely wipes all data and recreates tables fresh.
+Completely wipes all data and rebuilds the schema from db/migrations/.
+For adding tables, columns or indexes use `python -m db.migrate` instead —
+it never drops anything.
 
 Usage:
-    python reset_db.py
+    ALLOW_SCHEMA_RESET=1 python reset_db.py
 """
 
-from db.db_connection import db_cursor
 from dotenv import load_dotenv
 
+from db.create_tables import reset_and_migrate
+
 load_dotenv()
 
 
 def reset():
-    conn   = db_cursor()
-    cursor = conn.cursor()
-
     print("=" * 60)
     print("  DentalBot v2 — Full Database Reset")
     print("=" * 60)
-
-    # ── STEP 1: Drop everything ───────────────────────────────────
-    print("\n[STEP 1] Dropping all existing tables...")
-
-    drop_order = [
-        "appointments_backup",
-        "complaints_backup",
-        "business_logs_backup",
-        "patients_backup",
-        "business_logs",
-        "complaints",
-        "patient_orders",
-        "appointments",
-        "patients"
-    ]
-
-    for table in drop_order:
-        try:
-            cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
-            conn.commit()
-            print(f"  ✅ Dropped: {table}")
-        except Exception as e:
-            conn.rollback()
-            print(f"  ⚠️  {table} — {e}")
-
-
-    # ── STEP 2: Create fresh tables ───────────────────────────────
-    print("\n[STEP 2] Creating fresh tables...")
-
-    tables = [
-
-        ("patients", """
-            CREATE TABLE patients (
-                patient_id      SERIAL PRIMARY KEY,
-                first_name      VARCHAR(100) NOT NULL,
-                last_name       VARCHAR(100) NOT NULL,
-                date_of_birth   VARCHAR(20)  NOT NULL,
-                contact_number  VARCHAR(20)  NOT NULL,
-                insurance_info  VARCHAR(200),
-                created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """),
-
-        ("appointments", """
-            CREATE TABLE appointments (
-                appointment_id      SERIAL PRIMARY KEY,
-                patient_id          INTEGER REFERENCES patients(patient_id)
-                                    ON DELETE CASCADE,
-                first_name          VARCHAR(100),
-                last_name           VARCHAR(100),
-                date_of_birth       VARCHAR(20),
-                contact_number      VARCHAR(20),
-                preferred_treatment VARCHAR(200) NOT NULL,
-                preferred_date      VARCHAR(50)  NOT NULL,
-                preferred_time      VARCHAR(50)  NOT NULL,
-                preferred_dentist   VARCHAR(200) NOT NULL,
-                status              VARCHAR(50)  DEFAULT 'confirmed',
-                created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """),
-
-        ("complaints", """
-            CREATE TABLE complaints (
-                complaint_id        SERIAL PRIMARY KEY,
-                complaint_category  VARCHAR(50)  DEFAULT 'general',
-                patient_name        VARCHAR(200) NOT NULL,
-                contact_number      VARCHAR(20),
-                complaint_text      TEXT         NOT NULL,
-                treatment_name      VARCHAR(200),
-                dentist_name        VARCHAR(200),
-                treatment_date      VARCHAR(50),
-                status              VARCHAR(50)  DEFAULT 'pending',
-                created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """),
-
-        ("patient_orders", """
-            CREATE TABLE patient_orders (
-                order_id        SERIAL PRIMARY KEY,
-                patient_id      INTEGER REFERENCES patients(patient_id)
-                                ON DELETE CASCADE,
-                product_name    VARCHAR(200) NOT NULL,
-                order_status    VARCHAR(50)  DEFAULT 'placed',
-                notes           TEXT,
-                placed_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """),
-
-        ("business_logs", """
-            CREATE TABLE business_logs (
-                log_id          SERIAL PRIMARY KEY,
-                caller_name     VARCHAR(150),
-                company_name    VARCHAR(200),
-                contact_number  VARCHAR(20),
-                purpose         VARCHAR(100),
-                full_call_notes TEXT,
-                created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-    ]
-
-    for table_name, ddl in tables:
-        try:
-            cursor.execute(ddl)
-            conn.commit()
-            print(f"  ✅ Created: {table_name}")
-        except Exception as e:
-            conn.rollback()
-            print(f"  ❌ {table_name} FAILED — {e}")
-
-
-    # ── STEP 3: Verify ────────────────────────────────────────────
-    print("\n[STEP 3] Verifying...")
-    print("-" * 60)
-
-    for table_name, _ in tables:
-        try:
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            count = cursor.fetchone()[0]
-            print(f"  ✅ {table_name:<25} — {count} records (empty)")
-        except Exception as e:
-            conn.rollback()
-            print(f"  ❌ {table_name:<25} — MISSING: {e}")
-
-    cursor.close()
-    conn.close()
-
-    print("\n" + "=" * 60)
-    print("  ✅ Database reset complete — all tables are fresh!")
+    reset_and_migrate()
     print("  Run: python check_db.py to confirm")
-    print("=" * 60)
 
 
 if __name__ == "__main__":
@@ -2,19 +2,35 @@
 db/db_connection.py — DentalBot v2
 
 Connection pool for Railway PostgreSQL.
-- Uses SimpleConnectionPool (1-10 connections) for performance
+- Uses db.db_pool.ConnectionPool (DB_POOL_MIN–DB_POOL_MAX connections):
+  thread-safe (tools run on utils/tool_executor.py threads), queues callers
+  for up to DB_POOL_TIMEOUT seconds when exhausted, validates connections
+  that sat idle, and recycles old/idle ones the Railway proxy may have killed
+- get_pool_stats() / get_async_pool_stats() expose in-use / waiting /
+  wait-time / checkout-duration for /health and /metrics
 - Forces IPv4 to fix Railway cloud routing issues
 - Provides both db_cursor() context manager AND get_db_connection()
   so both old and new executor patterns work
+- Provides adb_cursor(), an asyncio context manager over a separate
+  psycopg 3 AsyncConnectionPool, for awaiting DB work in the voice bridge.
+  Same protection as the sync pool: TCP keepalives, SELECT 1 after
+  DB_POOL_VALIDATE_AFTER idle, recycling on DB_POOL_MAX_IDLE / _MAX_LIFETIME
 """
 
 import os
+import time
 import socket
+import asyncio
+import weakref
 import psycopg2
-import psycopg2.pool
 import threading
-import traceback
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
+
+from db.db_pool import ConnectionPool
+from utils.metrics import REGISTRY
+from utils.logger import get_logger
+
+log = get_logger("db")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DATABASE URL
@@ -26,6 +42,13 @@ from contextlib import contextmanager
 # )
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN  = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX  = int(os.getenv("DB_POOL_MAX", "10"))
+
+DB_POOL_TIMEOUT        = float(os.getenv("DB_POOL_TIMEOUT", "10"))          # wait for a free conn
+DB_POOL_MAX_LIFETIME   = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))   # recycle after 30 min
+DB_POOL_MAX_IDLE       = float(os.getenv("DB_POOL_MAX_IDLE", "300"))        # recycle after 5 min idle
+DB_POOL_VALIDATE_AFTER = float(os.getenv("DB_POOL_VALIDATE_AFTER", "30"))   # SELECT 1 if idle > 30 s
 
 # ─────────────────────────────────────────────────────────────────────────────
 # FORCE IPv4 — fixes Railway cloud IPv6 routing issue
@@ -44,13 +67,25 @@ socket.getaddrinfo = _ipv4_only_getaddrinfo
 # ─────────────────────────────────────────────────────────────────────────────
 # CONNECTION POOL
 # Reuses connections across calls instead of opening a new one every time.
-# Handles up to 10 concurrent DB operations (enough for multiple live calls).
+# Handles up to DB_POOL_MAX concurrent DB operations (enough for multiple live calls).
+# When all connections are out, callers wait (up to DB_POOL_TIMEOUT) instead of failing.
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Both pools: the keepalives make the kernel notice a connection the Railway
+# proxy dropped, instead of a booking finding out mid-call
+CONNECT_KWARGS = {
+    "sslmode":             "prefer",
+    "connect_timeout":     10,
+    "keepalives":          1,
+    "keepalives_idle":     30,
+    "keepalives_interval": 10,
+    "keepalives_count":    3,
+}
+
 _pool      = None
 _pool_lock = threading.Lock()
 
-def get_pool() -> psycopg2.pool.SimpleConnectionPool:
+def get_pool() -> ConnectionPool:
     global _pool
     if _pool is None:
         with _pool_lock:
@@ -58,15 +93,18 @@ def get_pool() -> psycopg2.pool.SimpleConnectionPool:
                 if not DATABASE_URL:
                     raise RuntimeError("DATABASE_URL is not set in environment variables")
 
-                print("[DB] Initialising connection pool...")
-                _pool = psycopg2.pool.SimpleConnectionPool(
-                    1,    # min connections — always keep 1 alive
-                    3,   # max connections — handles concurrent callers
+                log.info("[DB] Initialising connection pool...")
+                _pool = ConnectionPool(
+                    DB_POOL_MIN,   # min connections — always keep 1 alive
+                    DB_POOL_MAX,   # max connections — handles concurrent callers
                     dsn=DATABASE_URL,
-                    sslmode="prefer",
-                    connect_timeout=10
+                    timeout=DB_POOL_TIMEOUT,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    max_idle=DB_POOL_MAX_IDLE,
+                    validate_after=DB_POOL_VALIDATE_AFTER,
+                    **CONNECT_KWARGS
                 )
-                print("[DB] ✅ Connection pool ready (1–10 connections)")
+                log.info("[DB] ✅ Connection pool ready (%s–%s connections)", DB_POOL_MIN, DB_POOL_MAX)
     return _pool
 
 
@@ -87,6 +125,67 @@ def release_db_connection(conn):
         pass
 
 
+def get_pool_stats() -> dict:
+    """Pool stats for /health and metrics; empty until the pool is first used."""
+    return _pool.stats() if _pool is not None else {}
+
+
+def get_async_pool_stats() -> dict:
+    """AsyncConnectionPool.get_stats() for /health and metrics; empty until first used."""
+    return _async_pool.get_stats() if _async_pool is not None else {}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# METRICS
+# db_cursor()/adb_cursor() time every block; pool stats are read at scrape time.
+# ─────────────────────────────────────────────────────────────────────────────
+
+DB_CURSOR_SECONDS = REGISTRY.histogram(
+    "dentalbot_db_cursor_seconds",
+    "Time spent inside db_cursor()/adb_cursor() blocks, including checkout and commit.",
+    labelnames=("mode", "outcome")
+)
+
+
+def _collect_pool_metrics() -> list:
+    stats = get_pool_stats()
+    if not stats:
+        return []
+    lines = []
+    for key in ("size", "idle", "in_use", "waiting"):
+        name = f"dentalbot_db_pool_{key}"
+        lines += [f"# TYPE {name} gauge", f"{name} {stats[key]}"]
+    for key in ("checkouts", "timeouts", "recycled", "validation_failures"):
+        name = f"dentalbot_db_pool_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {stats[key]}"]
+    return lines
+
+
+# psycopg_pool counters only appear once non-zero, hence .get(key, 0)
+_ASYNC_POOL_GAUGES   = ("pool_size", "pool_available", "requests_waiting")
+_ASYNC_POOL_COUNTERS = ("requests_num", "requests_queued", "requests_errors",
+                        "requests_wait_ms", "returns_bad", "connections_num",
+                        "connections_errors", "connections_lost")
+
+
+def _collect_async_pool_metrics() -> list:
+    stats = get_async_pool_stats()
+    if not stats:
+        return []
+    lines = []
+    for key in _ASYNC_POOL_GAUGES:
+        name = f"dentalbot_async_db_{key}"
+        lines += [f"# TYPE {name} gauge", f"{name} {stats.get(key, 0)}"]
+    for key in _ASYNC_POOL_COUNTERS:
+        name = f"dentalbot_async_db_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {stats.get(key, 0)}"]
+    return lines
+
+
+REGISTRY.register_collector(_collect_pool_metrics)
+REGISTRY.register_collector(_collect_async_pool_metrics)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # db_cursor() CONTEXT MANAGER
 # Used by all new-style executors with `with db_cursor() as (cursor, conn):`
@@ -95,21 +194,123 @@ def release_db_connection(conn):
 
 @contextmanager
 def db_cursor():
-    conn   = None
-    cursor = None
+    conn    = None
+    cursor  = None
+    broken  = False
+    outcome = "error"
+    started = time.perf_counter()
     try:
         conn   = get_pool().getconn()
         cursor = conn.cursor()
         yield cursor, conn
         conn.commit()    # ✅ auto-commit on clean exit
+        outcome = "ok"
     except Exception as e:
-        print(f"❌ DB ERROR: {type(e).__name__}: {e}")
-        traceback.print_exc()
-        if conn:
-            conn.rollback()   # ✅ rollback on any error
+        log.exception("❌ DB ERROR: %s: %s", type(e).__name__, e)
+        # ✅ dead socket — don't hand this connection to the next caller
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if conn and not conn.closed:
+            try:
+                conn.rollback()   # ✅ rollback on any error
+            except Exception:
+                broken = True
         raise
     finally:
-        if cursor:
-            cursor.close()
+        if cursor and not cursor.closed:
+            try:
+                cursor.close()
+            except Exception:
+                pass
         if conn:
-            get_pool().putconn(conn)   # ✅ return to pool, not close()
+            get_pool().putconn(conn, close=broken)   # ✅ return to pool, not close()
+        DB_CURSOR_SECONDS.observe(time.perf_counter() - started, mode="sync", outcome=outcome)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ASYNC POOL + adb_cursor() CONTEXT MANAGER
+# Native asyncio counterpart of db_cursor() for the FastAPI voice bridge:
+#     async with adb_cursor() as (cursor, conn):
+#         await cursor.execute(...)
+# Uses psycopg 3 (same %s placeholders as psycopg2, so executors share SQL).
+# Commits on clean exit, rolls back on error, returns conn to the async pool.
+# ─────────────────────────────────────────────────────────────────────────────
+
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", "2"))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "20"))
+
+_async_pool      = None
+_async_pool_lock = None
+_async_last_used = weakref.WeakKeyDictionary()    # conn -> monotonic time it went idle
+
+
+async def _touch(conn):
+    """configure / reset callback: remember when the connection went idle."""
+    _async_last_used[conn] = time.monotonic()
+
+
+async def _check_if_idle(conn):
+    """check callback: SELECT 1 only after DB_POOL_VALIDATE_AFTER idle, like the sync pool."""
+    last_used = _async_last_used.get(conn)
+    if last_used is None or time.monotonic() - last_used > DB_POOL_VALIDATE_AFTER:
+        from psycopg_pool import AsyncConnectionPool
+        await AsyncConnectionPool.check_connection(conn)
+
+
+async def get_async_pool():
+    global _async_pool, _async_pool_lock
+    if _async_pool is not None:
+        return _async_pool
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+    async with _async_pool_lock:
+        if _async_pool is None:
+            if not DATABASE_URL:
+                raise RuntimeError("DATABASE_URL is not set in environment variables")
+            try:
+                from psycopg_pool import AsyncConnectionPool
+            except ImportError:
+                raise RuntimeError("psycopg[pool] is required for adb_cursor()")
+
+            log.info("[DB] Initialising async connection pool...")
+            pool = AsyncConnectionPool(
+                DATABASE_URL,
+                min_size=ASYNC_DB_POOL_MIN,
+                max_size=ASYNC_DB_POOL_MAX,
+                kwargs=CONNECT_KWARGS,
+                configure=_touch,
+                reset=_touch,
+                check=_check_if_idle,
+                timeout=DB_POOL_TIMEOUT,
+                max_idle=DB_POOL_MAX_IDLE,
+                max_lifetime=DB_POOL_MAX_LIFETIME,
+                open=False
+            )
+            await pool.open()
+            _async_pool = pool
+            log.info("[DB] ✅ Async connection pool ready (%s–%s connections)",
+                     ASYNC_DB_POOL_MIN, ASYNC_DB_POOL_MAX)
+    return _async_pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+@asynccontextmanager
+async def adb_cursor():
+    outcome = "error"
+    started = time.perf_counter()
+    pool    = await get_async_pool()
+    try:
+        async with pool.connection() as conn:    # ✅ commit / rollback handled by the pool
+            async with conn.cursor() as cursor:
+                yield cursor, conn
+        outcome = "ok"
+    except Exception as e:
+        log.exception("❌ DB ERROR: %s: %s", type(e).__name__, e)
+        raise
+    finally:
+        DB_CURSOR_SECONDS.observe(time.perf_counter() - started, mode="async", outcome=outcome)
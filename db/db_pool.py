@@ -0,0 +1,266 @@
+"""
+db/db_pool.py — DentalBot v2
+
+Thread-safe, instrumented psycopg2 connection pool used by db_cursor().
+
+Why not psycopg2.pool:
+- SimpleConnectionPool is not thread-safe
+- Threaded/SimpleConnectionPool raise PoolError the instant every
+  connection is out, instead of queueing the caller
+- Neither notices that the Railway TCP proxy silently killed an idle
+  connection — that surfaced mid-call as a failed booking
+
+This pool:
+- Blocks up to `timeout` seconds when exhausted (raises PoolTimeout after)
+- Validates a connection with SELECT 1 if it sat idle > validate_after
+- Recycles connections older than max_lifetime or idle longer than max_idle
+- Exposes stats(): size, in-use, waiting, average wait / checkout times;
+  the wait-time and checkout-duration histograms go to utils.metrics
+"""
+
+import time
+import threading
+from collections import deque
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+from utils.metrics import REGISTRY
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """No connection became free within the checkout timeout."""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────────────────────────────────────
+
+POOL_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "dentalbot_db_pool_wait_seconds",
+    "Time callers waited to check out a sync-pool connection.",
+    buckets=POOL_BUCKETS_S
+)
+POOL_CHECKOUT_SECONDS = REGISTRY.histogram(
+    "dentalbot_db_pool_checkout_seconds",
+    "How long sync-pool connections stayed checked out.",
+    buckets=POOL_BUCKETS_S
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# POOL
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ConnectionPool:
+
+    def __init__(self, minconn: int, maxconn: int, dsn: str,
+                 timeout: float = 10.0,
+                 max_lifetime: float = 1800.0,
+                 max_idle: float = 300.0,
+                 validate_after: float = 30.0,
+                 **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size: need 0 <= minconn <= maxconn, maxconn >= 1")
+
+        self.minconn        = minconn
+        self.maxconn        = maxconn
+        self.timeout        = timeout
+        self.max_lifetime   = max_lifetime
+        self.max_idle       = max_idle
+        self.validate_after = validate_after
+        self._dsn           = dsn
+        self._kwargs        = connect_kwargs
+
+        self._cond        = threading.Condition(threading.Lock())
+        self._idle        = deque()     # (conn, created_at, last_used_at)
+        self._created     = {}          # id(conn) -> created_at
+        self._checked_out = {}          # id(conn) -> checkout monotonic time
+        self._size        = 0           # idle + checked out + being opened
+        self._waiting     = 0
+        self._closed      = False
+
+        self._wait_sum        = 0.0
+        self._checkout_sum    = 0.0
+        self._returns         = 0
+        self._checkouts       = 0
+        self._timeouts        = 0
+        self._recycled        = 0
+        self._validation_fail = 0
+
+        for _ in range(minconn):
+            conn = self._connect()
+            with self._cond:
+                self._size += 1
+                self._idle.append((conn, self._created[id(conn)], time.monotonic()))
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    def _connect(self):
+        conn = psycopg2.connect(self._dsn, **self._kwargs)
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection that has already been removed from the pool's size."""
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at: float, last_used: float, now: float) -> bool:
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return True
+        if self.max_idle and now - last_used > self.max_idle:
+            return True
+        return False
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    def getconn(self, timeout: float = None):
+        timeout  = self.timeout if timeout is None else timeout
+        start    = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            conn, idle_for, open_new, stale = None, 0.0, False, []
+
+            with self._cond:
+                self._waiting += 1
+                try:
+                    while True:
+                        if self._closed:
+                            raise psycopg2.pool.PoolError("connection pool is closed")
+
+                        now = time.monotonic()
+                        while self._idle:
+                            c, created_at, last_used = self._idle.pop()   # LIFO — warmest first
+                            if c.closed or self._is_expired(created_at, last_used, now):
+                                self._size -= 1
+                                self._recycled += 1
+                                stale.append(c)
+                                continue
+                            conn, idle_for = c, now - last_used
+                            break
+                        if conn is not None:
+                            break
+
+                        if self._size < self.maxconn:
+                            self._size += 1
+                            open_new = True
+                            break
+
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeout(
+                                f"no connection available within {timeout:.1f}s "
+                                f"({self._size} in use, {self._waiting - 1} others waiting)"
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            for c in stale:
+                self._discard(c)
+
+            if open_new:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif self.validate_after is not None and idle_for > self.validate_after:
+                if not self._ping(conn):
+                    # Proxy dropped it while idle — replace and try again
+                    with self._cond:
+                        self._size -= 1
+                        self._validation_fail += 1
+                        self._cond.notify()
+                    self._discard(conn)
+                    continue
+
+            now = time.monotonic()
+            with self._cond:
+                self._checked_out[id(conn)] = now
+                self._checkouts += 1
+                self._wait_sum  += now - start
+            POOL_WAIT_SECONDS.observe(now - start)
+            return conn
+
+    def putconn(self, conn, close: bool = False):
+        now = time.monotonic()
+        with self._cond:
+            checked_out_at = self._checked_out.pop(id(conn), None)
+            if checked_out_at is None:
+                raise psycopg2.pool.PoolError("trying to put unkeyed connection")
+            self._returns      += 1
+            self._checkout_sum += now - checked_out_at
+        POOL_CHECKOUT_SECONDS.observe(now - checked_out_at)
+
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+
+        created_at = self._created.get(id(conn), now)
+        if (close or conn.closed or self._closed
+                or (self.max_lifetime and now - created_at > self.max_lifetime)):
+            with self._cond:
+                self._size -= 1
+                if not close and not conn.closed and not self._closed:
+                    self._recycled += 1
+                self._cond.notify()
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, now))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle = [c for c, _, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for c in idle:
+            self._discard(c)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size":                len(self._idle) + len(self._checked_out),
+                "max":                 self.maxconn,
+                "idle":                len(self._idle),
+                "in_use":              len(self._checked_out),
+                "waiting":             self._waiting,
+                "checkouts":           self._checkouts,
+                "timeouts":            self._timeouts,
+                "recycled":            self._recycled,
+                "validation_failures": self._validation_fail,
+                "wait_ms_avg":         round(self._wait_sum * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "checkout_ms_avg":     round(self._checkout_sum * 1000 / self._returns, 3) if self._returns else 0.0,
+            }
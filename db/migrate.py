@@ -0,0 +1,171 @@
+"""
+db/migrate.py — DentalBot v2
+
+Versioned schema migrations for the live database — the schema changes by
+adding a file, never by dropping tables.
+
+    python -m db.migrate              # apply every pending migration, in order
+    python -m db.migrate --status     # applied / pending, changes nothing
+
+- db/migrations/NNN_name.py, applied in NNN order; each defines
+  upgrade(cursor) and is recorded in schema_migrations once it succeeds,
+  so re-running is a no-op
+- Runs on its own autocommit connection (not the app pool) so migrations can
+  use CREATE INDEX CONCURRENTLY — the live tables stay writable while an
+  index builds. Anything that must be atomic goes in `with transaction(cursor):`
+- A Postgres advisory lock serializes concurrent runs (two deploys starting
+  at once); the second waits, then finds nothing pending
+- Stops at the first failure; later migrations are not attempted
+"""
+
+import os
+import re
+import sys
+import time
+import importlib
+from contextlib import contextmanager
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MIGRATIONS_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE   = re.compile(r"^(\d{3})_(\w+)\.py$")
+MIGRATE_LOCK_ID  = 72_110_001      # pg_advisory_lock key — any constant unique to this app
+
+_SCHEMA_MIGRATIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     TEXT PRIMARY KEY,
+        name        TEXT NOT NULL,
+        applied_at  TIMESTAMPTZ DEFAULT now(),
+        duration_ms INT
+    )
+"""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HELPERS FOR MIGRATION FILES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@contextmanager
+def transaction(cursor):
+    """BEGIN … COMMIT on the autocommit connection; ROLLBACK on any error."""
+    cursor.execute("BEGIN")
+    try:
+        yield cursor
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    cursor.execute("COMMIT")
+
+
+def create_index_concurrently(cursor, name: str, on: str, unique: bool = False, where: str = None):
+    """
+    CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS name ON <on> [WHERE …].
+    A failed concurrent build leaves an INVALID index behind that IF NOT EXISTS
+    would silently accept — drop that first so a re-run actually rebuilds it.
+    """
+    cursor.execute("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND NOT i.indisvalid
+    """, (name,))
+    if cursor.fetchone():
+        print(f"  dropping invalid index {name} left by an earlier failed build")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    cursor.execute(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {on}"
+        + (f" WHERE {where}" if where else "")
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RUNNER
+# ─────────────────────────────────────────────────────────────────────────────
+
+def connect():
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL is not set")
+    conn = psycopg2.connect(database_url, connect_timeout=10, sslmode="prefer")
+    conn.autocommit = True
+    return conn
+
+
+def discover() -> list:
+    """[(version, name, module_path)] sorted by version."""
+    found = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            version, name = match.groups()
+            found.append((version, name, f"db.migrations.{filename[:-3]}"))
+    found.sort()
+    versions = [version for version, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"duplicate migration version in {MIGRATIONS_DIR}")
+    return found
+
+
+def applied_versions(cursor) -> set:
+    cursor.execute(_SCHEMA_MIGRATIONS_SQL)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn=None) -> int:
+    """Apply pending migrations; returns how many ran."""
+    own_conn = conn is None
+    conn     = conn or connect()
+    cursor   = conn.cursor()
+    ran      = 0
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATE_LOCK_ID,))
+        try:
+            done = applied_versions(cursor)
+            for version, name, module_path in discover():
+                if version in done:
+                    continue
+                print(f"→ {version}_{name}")
+                started = time.perf_counter()
+                importlib.import_module(module_path).upgrade(cursor)
+                elapsed = int((time.perf_counter() - started) * 1000)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (%s, %s, %s)",
+                    (version, name, elapsed)
+                )
+                print(f"  applied in {elapsed} ms")
+                ran += 1
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATE_LOCK_ID,))
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+    return ran
+
+
+def status(conn=None):
+    own_conn = conn is None
+    conn     = conn or connect()
+    try:
+        with conn.cursor() as cursor:
+            done = applied_versions(cursor)
+        for version, name, _ in discover():
+            print(f"  [{'x' if version in done else ' '}] {version}_{name}")
+    finally:
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv[1:]:
+        status()
+    else:
+        try:
+            count = migrate()
+        except Exception as e:
+            print(f"\n❌ migration failed: {type(e).__name__}: {e}")
+            sys.exit(1)
+        print(f"\n✅ {count} migration(s) applied" if count else "✅ schema is up to date")
@@ -0,0 +1,152 @@
+"""
+db/migrations/000_baseline.py — DentalBot v2
+
+The schema as db/create_tables.py used to build it (before 001–003), with
+IF NOT EXISTS everywhere. On the live database every statement is a no-op
+and just marks the starting point; on an empty database it builds the
+original tables so 001 onwards run exactly as they did in production.
+
+Also creates + seeds `dentists` (read by find_available_dentist, but never
+created by any of the old scripts) and the 5 known suppliers.
+"""
+
+from appointment.executor import DENTISTS
+from db.migrate import transaction
+
+_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS patients (
+        patient_id     SERIAL PRIMARY KEY,
+        first_name     TEXT NOT NULL,
+        last_name      TEXT NOT NULL,
+        date_of_birth  TEXT NOT NULL,         -- typed DATE by 002
+        contact_number TEXT NOT NULL,
+        insurance_info TEXT DEFAULT NULL,
+        created_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS appointments (
+        appointment_id      SERIAL PRIMARY KEY,
+        patient_id          INT REFERENCES patients(patient_id),
+        first_name          TEXT NOT NULL,
+        last_name           TEXT NOT NULL,
+        date_of_birth       TEXT NOT NULL,
+        contact_number      TEXT NOT NULL,
+        preferred_treatment TEXT NOT NULL,
+        preferred_date      TEXT NOT NULL,    -- typed DATE by 003
+        preferred_time      TEXT NOT NULL,    -- typed TIME by 003
+        preferred_dentist   TEXT NOT NULL,
+        status              TEXT DEFAULT 'confirmed',
+        created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS appointment_updates (
+        update_id      SERIAL PRIMARY KEY,
+        appointment_id INT REFERENCES appointments(appointment_id),
+        updated_fields JSONB NOT NULL,
+        updated_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cancellations (
+        cancellation_id SERIAL PRIMARY KEY,
+        appointment_id  INT REFERENCES appointments(appointment_id),
+        reason          TEXT,
+        cancelled_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS patient_orders (
+        order_id       SERIAL PRIMARY KEY,
+        patient_id     INT REFERENCES patients(patient_id),
+        first_name     TEXT,
+        last_name      TEXT,
+        contact_number TEXT,
+        product_name   TEXT NOT NULL,   -- e.g. Dentures, Tooth Cap, Braces
+        order_status   TEXT DEFAULT 'placed'
+                       CHECK (order_status IN ('placed', 'ready', 'delivered')),
+        notes          TEXT,
+        placed_by      TEXT DEFAULT 'management',
+        placed_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS complaints (
+        complaint_id       SERIAL PRIMARY KEY,
+        complaint_category TEXT NOT NULL CHECK (complaint_category IN ('general', 'treatment')),
+        -- TYPE 1 (general) fields
+        patient_name       TEXT NOT NULL,
+        contact_number     TEXT,
+        -- TYPE 2 (treatment) fields -- NULL for general complaints
+        patient_id         INT  REFERENCES patients(patient_id) DEFAULT NULL,
+        appointment_id     INT  REFERENCES appointments(appointment_id) DEFAULT NULL,
+        date_of_birth      TEXT DEFAULT NULL,
+        treatment_name     TEXT DEFAULT NULL,
+        dentist_name       TEXT DEFAULT NULL,
+        treatment_date     TEXT DEFAULT NULL,
+        treatment_time     TEXT DEFAULT NULL,
+        additional_info    TEXT DEFAULT NULL,
+        -- shared
+        complaint_text     TEXT NOT NULL,
+        status             TEXT DEFAULT 'pending',
+        created_at         TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS suppliers (
+        supplier_id    SERIAL PRIMARY KEY,
+        company_name   TEXT NOT NULL UNIQUE,
+        specialty      TEXT,
+        contact_number TEXT,
+        email          TEXT,
+        is_active      BOOLEAN DEFAULT TRUE,
+        created_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS business_logs (
+        log_id          SERIAL PRIMARY KEY,
+        caller_name     TEXT,
+        company_name    TEXT,
+        contact_number  TEXT,
+        purpose         TEXT,
+        full_call_notes TEXT,
+        logged_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dentists (
+        dentist_id   SERIAL PRIMARY KEY,
+        dentist_name TEXT NOT NULL UNIQUE,
+        is_active    BOOLEAN DEFAULT TRUE
+    )
+    """,
+]
+
+_SUPPLIERS_SEED = [
+    ("AusDental Labs Pty Ltd",      "Crowns, Bridges, Veneers, Tooth Caps",          "03 9100 2211", "orders@ausdentalabs.com.au"),
+    ("MedPro Orthodontics",          "Braces, Clear Aligners, Retainers",             "03 9200 4455", "supply@medproortho.com.au"),
+    ("Southern Implant Supply Co.",  "Dental Implants, Abutments, Implant Crowns",    "03 9300 6677", "logistics@southernimplant.com.au"),
+    ("PrecisionDenture Works",       "Dentures, Partial Plates, Immediate Dentures",  "03 9400 8899", "production@precisiondenture.com.au"),
+    ("OralCraft Technologies",       "Custom Mouthguards, Night Guards, Sports Guards","03 9500 1122", "dispatch@oralcraft.com.au"),
+]
+
+
+def upgrade(cursor):
+    with transaction(cursor):
+        for ddl in _TABLES:
+            cursor.execute(ddl)
+        cursor.executemany("""
+            INSERT INTO suppliers (company_name, specialty, contact_number, email)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (company_name) DO NOTHING
+        """, _SUPPLIERS_SEED)
+        # only into an empty table — a pre-existing dentists table may lack the UNIQUE
+        cursor.execute("""
+            INSERT INTO dentists (dentist_name)
+            SELECT unnest(%s::text[])
+            WHERE NOT EXISTS (SELECT 1 FROM dentists)
+        """, (DENTISTS,))
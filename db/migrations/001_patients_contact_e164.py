@@ -0,0 +1,76 @@
+"""
+db/migrations/001_patients_contact_e164.py — DentalBot v2
+
+patients.contact_e164: one normalized spelling per phone number.
+
+contact_number holds whatever was captured (04xx, +614xx, spaces), so phone
+matching used to mean fetching rows and normalizing in Python, or
+LIKE '%...%' scans. This adds the E.164 column, backfills it with the same
+utils.phone_utils.to_e164() the executors write with, and indexes it for
+exact (verification, caller ID) and prefix (console search) lookups.
+
+- Backfills in BATCH_SIZE chunks keyed on patient_id, each its own
+  transaction, so no long-held row locks on a live table
+- Index built CONCURRENTLY; re-running only fills rows still missing a value
+- contact_number was cut to 10 digits on insert, so "+61 462 361 789" was
+  stored as 6146236178 — its E.164 can't be recovered. Such rows are left
+  NULL and logged rather than given a wrong number
+"""
+
+from psycopg2.extras import execute_values
+
+from db.migrate import transaction, create_index_concurrently
+from utils.phone_utils import to_e164, DEFAULT_COUNTRY_CODE
+
+BATCH_SIZE = 1000
+
+
+def _backfill_e164(number) -> str:
+    """E.164 for a stored contact_number, or "" when it can't be trusted."""
+    raw    = str(number or "").strip()
+    digits = "".join(ch for ch in raw if ch.isdigit())
+    if not raw.startswith("+") and len(digits) == 10 and digits.startswith(DEFAULT_COUNTRY_CODE):
+        return ""   # a truncated +61 number, not a local one
+    return to_e164(raw)
+
+
+def upgrade(cursor):
+    cursor.execute("ALTER TABLE patients ADD COLUMN IF NOT EXISTS contact_e164 TEXT")
+
+    last_id = 0
+    filled  = 0
+    skipped = []
+    while True:
+        cursor.execute("""
+            SELECT patient_id, contact_number
+            FROM patients
+            WHERE contact_e164 IS NULL AND patient_id > %s
+            ORDER BY patient_id
+            LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        updates = []
+        for pid, number in rows:
+            e164 = _backfill_e164(number)
+            if e164:
+                updates.append((pid, e164))
+            elif number:
+                skipped.append(pid)
+        if updates:
+            with transaction(cursor):
+                execute_values(cursor, """
+                    UPDATE patients AS p SET contact_e164 = v.e164
+                    FROM (VALUES %s) AS v (patient_id, e164)
+                    WHERE p.patient_id = v.patient_id
+                """, updates)
+            filled += len(updates)
+    print(f"  backfilled contact_e164 on {filled} patients")
+    if skipped:
+        print(f"  skipped {len(skipped)} truncated contact numbers (patient_id {skipped[:20]}"
+              f"{' ...' if len(skipped) > 20 else ''}) — re-enter them by hand")
+
+    create_index_concurrently(cursor, "idx_patients_contact_e164",
+                              "patients (contact_e164 text_pattern_ops)")
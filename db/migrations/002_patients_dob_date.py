@@ -0,0 +1,65 @@
+"""
+db/migrations/002_patients_dob_date.py — DentalBot v2
+
+patients.date_of_birth TEXT → DATE, plus the verification index.
+
+Every verify_by_lastname_dob compared a TEXT column against %s::date and
+matched TRIM(LOWER(last_name)) — nothing indexable, so each verification
+scanned and cast the whole patients table. After this migration:
+
+    idx_patients_lastname_dob ON patients (lower(trim(last_name)), date_of_birth)
+
+and _PATIENT_BY_LASTNAME_DOB_SQL filters on exactly those expressions.
+
+- Non-ISO values ("15 Jun 1990", "05-12-2003") are rewritten to YYYY-MM-DD
+  first with the same parser the executors use (dob_to_db_format), so the
+  cast never depends on the server's DateStyle
+- Refuses to convert while any value is unparseable and lists those rows —
+  fix them by hand and re-run; nothing is guessed or dropped
+- Rewrite + ALTER run in one transaction; the index is built CONCURRENTLY
+- Idempotent: skips the conversion once the column is already DATE
+"""
+
+import re
+
+from db.migrate import transaction, create_index_concurrently
+from utils.date_time_utils import dob_to_db_format, normalize_dob
+
+ISO_DATE = r"^\d{4}-\d{2}-\d{2}$"
+
+
+def _column_type(cursor) -> str:
+    cursor.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'patients' AND column_name = 'date_of_birth'
+    """)
+    return cursor.fetchone()[0]
+
+
+def upgrade(cursor):
+    if _column_type(cursor) != "date":
+        cursor.execute("""
+            SELECT patient_id, date_of_birth FROM patients
+            WHERE trim(date_of_birth) !~ %s
+        """, (ISO_DATE,))
+        fixes, bad = [], []
+        for patient_id, dob in cursor.fetchall():
+            iso = dob_to_db_format(normalize_dob(dob or ""))
+            if re.match(ISO_DATE, iso):
+                fixes.append((iso, patient_id))
+            else:
+                bad.append((patient_id, dob))
+        if bad:
+            raise RuntimeError(f"unparseable date_of_birth on {len(bad)} patients: {bad[:20]}")
+
+        with transaction(cursor):
+            cursor.executemany("UPDATE patients SET date_of_birth = %s WHERE patient_id = %s", fixes)
+            cursor.execute("""
+                ALTER TABLE patients
+                    ALTER COLUMN date_of_birth TYPE DATE USING trim(date_of_birth)::date
+            """)
+        print(f"  date_of_birth is DATE ({len(fixes)} values rewritten to ISO first)")
+
+    create_index_concurrently(cursor, "idx_patients_lastname_dob",
+                              "patients (lower(trim(last_name)), date_of_birth)")
+    cursor.execute("ANALYZE patients")
@@ -0,0 +1,93 @@
+"""
+db/migrations/003_appointments_date_time.py — DentalBot v2
+
+appointments.preferred_date / preferred_time TEXT → DATE / TIME.
+
+As TEXT, availability checks compared strings, patient lists sorted text,
+and "today" on the console was a string match. parse_date_str /
+parse_time_str return their input unchanged when they can't parse it, so
+the table also holds odd values ("next friday", "9:00:00", "10am").
+
+- Repair pass first: every value that isn't already YYYY-MM-DD / HH:MM is
+  re-run through the executor parsers, with relative words ("tomorrow",
+  "friday") resolved against the row's created_at, not today
+- Refuses to convert while anything is still unparseable and lists those
+  rows — fix them by hand and re-run; nothing is guessed or dropped
+- Repair + ALTER run in one transaction; then idx_appointments_patient_date
+  and idx_appointments_date_time are built CONCURRENTLY
+- Idempotent: skips the conversion once the columns are typed
+"""
+
+import re
+from datetime import datetime, date
+
+from db.migrate import transaction, create_index_concurrently
+from appointment.executor import parse_date_str, parse_time_str
+
+ISO_DATE = r"^\d{4}-\d{2}-\d{2}$"
+HH_MM    = r"^\d{2}:\d{2}$"
+
+
+def _column_types(cursor) -> dict:
+    cursor.execute("""
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_name = 'appointments'
+          AND column_name IN ('preferred_date', 'preferred_time')
+    """)
+    return dict(cursor.fetchall())
+
+
+def _repair_date(value: str, created_at) -> str | None:
+    booked_on = created_at.date() if created_at else date.today()
+    fixed     = parse_date_str(value or "", today=booked_on)
+    try:
+        return datetime.strptime(fixed, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def _repair_time(value: str) -> str | None:
+    fixed = parse_time_str(value or "")
+    try:
+        return datetime.strptime(fixed, "%H:%M").strftime("%H:%M")
+    except (TypeError, ValueError):
+        return None
+
+
+def upgrade(cursor):
+    if _column_types(cursor) != {"preferred_date": "date",
+                                 "preferred_time": "time without time zone"}:
+        cursor.execute("""
+            SELECT appointment_id, preferred_date::text, preferred_time::text, created_at
+            FROM appointments
+            WHERE preferred_date::text !~ %s OR preferred_time::text !~ %s
+        """, (ISO_DATE, HH_MM))
+
+        fixes, bad = [], []
+        for appt_id, raw_date, raw_time, created_at in cursor.fetchall():
+            fixed_date = raw_date if re.match(ISO_DATE, raw_date or "") else _repair_date(raw_date, created_at)
+            fixed_time = raw_time if re.match(HH_MM, raw_time or "") else _repair_time(raw_time)
+            if fixed_date and fixed_time:
+                fixes.append((fixed_date, fixed_time, appt_id))
+            else:
+                bad.append((appt_id, raw_date, raw_time))
+        if bad:
+            raise RuntimeError(f"unparseable date/time on {len(bad)} appointments: {bad[:20]}")
+
+        with transaction(cursor):
+            cursor.executemany("""
+                UPDATE appointments SET preferred_date = %s, preferred_time = %s
+                WHERE appointment_id = %s
+            """, fixes)
+            cursor.execute("""
+                ALTER TABLE appointments
+                    ALTER COLUMN preferred_date TYPE DATE USING preferred_date::date,
+                    ALTER COLUMN preferred_time TYPE TIME USING preferred_time::time
+            """)
+        print(f"  preferred_date/time are DATE/TIME ({len(fixes)} values repaired first)")
+
+    create_index_concurrently(cursor, "idx_appointments_patient_date",
+                              "appointments (patient_id, preferred_date, preferred_time)")
+    create_index_concurrently(cursor, "idx_appointments_date_time",
+                              "appointments (preferred_date, preferred_time)")
+    cursor.execute("ANALYZE appointments")
@@ -0,0 +1,48 @@
+"""
+db/migrations/004_appointments_confirmed_slot.py — DentalBot v2
+
+One confirmed booking per dentist slot, enforced by Postgres:
+
+    uq_appointments_confirmed_slot UNIQUE ON appointments
+        (preferred_dentist, preferred_date, preferred_time)
+        WHERE status = 'confirmed'
+
+The same partial index is what check_dentist_availability (EXISTS) and
+find_available_dentist (NOT EXISTS per dentist) probe, so availability
+questions no longer scan the whole appointment history. Cancelled rows fall
+outside the predicate — a freed slot can be booked again.
+
+Slots are fixed start times, not ranges, so a unique index does the job an
+exclusion constraint would; an overlap (tsrange &&) constraint only becomes
+necessary if appointments get variable durations.
+
+- Refuses to build while two confirmed appointments already share a slot and
+  lists them — one has to be moved or cancelled by staff first
+- Built CONCURRENTLY: bookings keep working during the build
+"""
+
+from db.migrate import create_index_concurrently
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        SELECT preferred_dentist, preferred_date, preferred_time,
+               array_agg(appointment_id ORDER BY appointment_id)
+        FROM appointments
+        WHERE status = 'confirmed'
+        GROUP BY preferred_dentist, preferred_date, preferred_time
+        HAVING COUNT(*) > 1
+    """)
+    clashes = cursor.fetchall()
+    if clashes:
+        raise RuntimeError(
+            f"{len(clashes)} dentist slot(s) double-booked — resolve before re-running: "
+            + "; ".join(f"{d} {day} {t} → appointments {ids}" for d, day, t, ids in clashes[:20])
+        )
+
+    create_index_concurrently(
+        cursor, "uq_appointments_confirmed_slot",
+        "appointments (preferred_dentist, preferred_date, preferred_time)",
+        unique=True, where="status = 'confirmed'"
+    )
+    cursor.execute("ANALYZE appointments")
@@ -0,0 +1,68 @@
+"""
+db/migrations/005_appointments_slot_notify.py — DentalBot v2
+
+NOTIFY appointment_slots whenever a confirmed slot is taken or freed, so
+each app process can keep its in-memory occupancy index
+(appointment/slot_index.py) current without polling.
+
+- Payload: {"old": [dentist, date, time] | null, "new": [...] | null}.
+  "old" is the confirmed slot the row gave up, "new" the confirmed slot it
+  now holds. Rows that were not and are not confirmed send nothing, and an
+  UPDATE that leaves the slot as it was sends nothing
+- TRUNCATE sends {"reload": true}
+- Notifications go out on COMMIT, in commit order; a rolled-back booking
+  never notifies
+- Idempotent: CREATE OR REPLACE the function, re-create the triggers
+"""
+
+from db.migrate import transaction
+
+CHANNEL = "appointment_slots"
+
+_FUNCTION_SQL = f"""
+    CREATE OR REPLACE FUNCTION notify_appointment_slot() RETURNS trigger AS $$
+    DECLARE
+        old_slot json;
+        new_slot json;
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            PERFORM pg_notify('{CHANNEL}', '{{"reload": true}}');
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'confirmed' THEN
+            old_slot := json_build_array(OLD.preferred_dentist, OLD.preferred_date, OLD.preferred_time);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'confirmed' THEN
+            new_slot := json_build_array(NEW.preferred_dentist, NEW.preferred_date, NEW.preferred_time);
+        END IF;
+
+        IF old_slot::text IS NOT DISTINCT FROM new_slot::text THEN
+            RETURN NULL;
+        END IF;
+
+        PERFORM pg_notify('{CHANNEL}', json_build_object('old', old_slot, 'new', new_slot)::text);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade(cursor):
+    with transaction(cursor):
+        cursor.execute(_FUNCTION_SQL)
+        cursor.execute("DROP TRIGGER IF EXISTS appointments_slot_notify ON appointments")
+        cursor.execute("DROP TRIGGER IF EXISTS appointments_slot_notify_truncate ON appointments")
+        cursor.execute("""
+            CREATE TRIGGER appointments_slot_notify
+            AFTER INSERT OR DELETE
+               OR UPDATE OF preferred_dentist, preferred_date, preferred_time, status
+            ON appointments
+            FOR EACH ROW EXECUTE FUNCTION notify_appointment_slot()
+        """)
+        cursor.execute("""
+            CREATE TRIGGER appointments_slot_notify_truncate
+            AFTER TRUNCATE ON appointments
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_appointment_slot()
+        """)
+    print(f"  appointments notify '{CHANNEL}' on confirmed-slot changes")
@@ -3,6 +3,7 @@
 
 from datetime import date
 from db.db_connection import db_cursor
+from utils.phone_utils import to_e164
 
 def view_patients():
     with db_cursor() as (cursor, conn):
@@ -95,10 +96,10 @@ def create_test_patient():
 
     with db_cursor() as (cursor, conn):
         cursor.execute("""
-            INSERT INTO patients (first_name, last_name, date_of_birth, contact_number)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO patients (first_name, last_name, date_of_birth, contact_number, contact_e164)
+            VALUES (%s, %s, %s, %s, %s)
             RETURNING patient_id
-        """, (first_name, last_name, dob, phone))
+        """, (first_name, last_name, dob, phone, to_e164(phone)))
         pid = cursor.fetchone()[0]
 
     print(f"✅ Created patient with ID: {pid}")
@@ -1,38 +1,60 @@
 """
 General Enquiry Executor - DentalBot v2
 Old try/except logic + new db_cursor() syntax.
+Async twins (aget_patient_orders, ...) run the same SQL via adb_cursor().
 """
 
-from db.db_connection import db_cursor
-import traceback
+from db.db_connection import db_cursor, adb_cursor
+from utils.date_time_utils import format_time_hhmm
+from utils.logger import get_logger
+
+log = get_logger("enquiry")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # ORDER STATUS
 # ─────────────────────────────────────────────────────────────────────────────
 
+_PATIENT_ORDERS_SQL = """
+    SELECT product_name, order_status, notes
+    FROM patient_orders
+    WHERE patient_id = %s
+    ORDER BY placed_at DESC
+"""
+
+
+def _orders_result(rows):
+    return {
+        "status": "SUCCESS",
+        "orders": [
+            {"product_name": r[0], "order_status": r[1], "status_text": r[2]}
+            for r in rows
+        ],
+        "count": len(rows)
+    }
+
+
 def get_patient_orders(patient_id):
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT product_name, order_status, notes
-                FROM patient_orders
-                WHERE patient_id = %s
-                ORDER BY placed_at DESC
-            """, (patient_id,))
+            cursor.execute(_PATIENT_ORDERS_SQL, (patient_id,))
             rows = cursor.fetchall()
+        return _orders_result(rows)
+
+    except Exception as e:
+        log.exception("[ENQUIRY] ❌ get_patient_orders failed")
+        return {"status": "ERROR", "message": str(e)}
+
 
-        return {
-            "status": "SUCCESS",
-            "orders": [
-                {"product_name": r[0], "order_status": r[1], "status_text": r[2]}
-                for r in rows
-            ],
-            "count": len(rows)
-        }
+async def aget_patient_orders(patient_id):
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_PATIENT_ORDERS_SQL, (patient_id,))
+            rows = await cursor.fetchall()
+        return _orders_result(rows)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[ENQUIRY] ❌ aget_patient_orders failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -40,35 +62,53 @@ def get_patient_orders(patient_id):
 # UPCOMING APPOINTMENTS
 # ─────────────────────────────────────────────────────────────────────────────
 
+_UPCOMING_SQL = """
+    SELECT preferred_treatment, preferred_date,
+           preferred_time, preferred_dentist
+    FROM appointments
+    WHERE patient_id     = %s
+      AND preferred_date >= CURRENT_DATE
+      AND status          = 'confirmed'
+    ORDER BY preferred_date ASC, preferred_time ASC
+"""
+
+
+def _upcoming_result(rows):
+    return {
+        "status": "SUCCESS",
+        "appointments": [
+            {
+                "treatment": r[0],
+                "date":      str(r[1]),
+                "time":      format_time_hhmm(r[2]),
+                "dentist":   r[3]
+            } for r in rows
+        ],
+        "count": len(rows)
+    }
+
+
 def get_upcoming_appointments(patient_id):
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT preferred_treatment, preferred_date,
-                       preferred_time, preferred_dentist
-                FROM appointments
-                WHERE patient_id     = %s
-                  AND preferred_date >= CURRENT_DATE
-                  AND status          = 'confirmed'
-                ORDER BY preferred_date ASC, preferred_time ASC
-            """, (patient_id,))
+            cursor.execute(_UPCOMING_SQL, (patient_id,))
             rows = cursor.fetchall()
+        return _upcoming_result(rows)
 
-        return {
-            "status": "SUCCESS",
-            "appointments": [
-                {
-                    "treatment": r[0],
-                    "date":      str(r[1]),
-                    "time":      str(r[2]),
-                    "dentist":   r[3]
-                } for r in rows
-            ],
-            "count": len(rows)
-        }
+    except Exception as e:
+        log.exception("[ENQUIRY] ❌ get_upcoming_appointments failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def aget_upcoming_appointments(patient_id):
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_UPCOMING_SQL, (patient_id,))
+            rows = await cursor.fetchall()
+        return _upcoming_result(rows)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[ENQUIRY] ❌ aget_upcoming_appointments failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -76,30 +116,48 @@ def get_upcoming_appointments(patient_id):
 # PAST APPOINTMENTS / TREATMENT HISTORY
 # ─────────────────────────────────────────────────────────────────────────────
 
+_PAST_SQL = """
+    SELECT preferred_treatment, preferred_date, preferred_dentist
+    FROM appointments
+    WHERE patient_id     = %s
+      AND preferred_date  < CURRENT_DATE
+    ORDER BY preferred_date DESC, preferred_time DESC
+"""
+
+
+def _past_result(rows):
+    return {
+        "status": "SUCCESS",
+        "appointments": [
+            {
+                "treatment": r[0],
+                "date":      str(r[1]),
+                "dentist":   r[2]
+            } for r in rows
+        ],
+        "count": len(rows)
+    }
+
+
 def get_past_appointments(patient_id):
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT preferred_treatment, preferred_date, preferred_dentist
-                FROM appointments
-                WHERE patient_id     = %s
-                  AND preferred_date  < CURRENT_DATE
-                ORDER BY preferred_date DESC
-            """, (patient_id,))
+            cursor.execute(_PAST_SQL, (patient_id,))
             rows = cursor.fetchall()
+        return _past_result(rows)
 
-        return {
-            "status": "SUCCESS",
-            "appointments": [
-                {
-                    "treatment": r[0],
-                    "date":      str(r[1]),
-                    "dentist":   r[2]
-                } for r in rows
-            ],
-            "count": len(rows)
-        }
+    except Exception as e:
+        log.exception("[ENQUIRY] ❌ get_past_appointments failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def aget_past_appointments(patient_id):
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_PAST_SQL, (patient_id,))
+            rows = await cursor.fetchall()
+        return _past_result(rows)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[ENQUIRY] ❌ aget_past_appointments failed")
         return {"status": "ERROR", "message": str(e)}
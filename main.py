@@ -14,42 +14,36 @@ Fixes applied (cumulative):
 """
 
 import os
-import json
+import time
 import asyncio
-import traceback
 import websockets
 from fastapi import FastAPI, WebSocket, Request
-from fastapi.responses import Response
+from fastapi.responses import Response, PlainTextResponse
 from fastapi.websockets import WebSocketDisconnect
 from dotenv import load_dotenv
-from datetime import datetime
-
-from verification.verification_executor import (
-    verify_by_lastname_dob, verify_by_lastname_dob_contact, create_new_patient
-)
-from appointment.executor import (
-    check_dentist_availability, find_available_dentist, book_appointment,
-    get_patient_appointments, update_appointment, cancel_appointment
-)
-from complaint.complaint_executor import save_complaint
-from business.business_controller import (
-    handle_business_info, handle_insurance_query, handle_warranty_query,
-    classify_business_call, extract_order_info
-)
-from business.business_executor import (
-    log_business_call, update_order_by_patient_id,
-    update_order_status_by_patient_name, check_supplier, get_all_suppliers
-)
-from general_enquiry.enquiry_executor import (
-    get_patient_orders, get_upcoming_appointments, get_past_appointments
-)
-from knowledge_base.kb_controller import handle_kb_query
-from utils.phone_utils import extract_phone_from_text, format_phone_for_speech
-from utils.date_time_utils import normalize_dob
+from datetime import datetime, date
+from urllib.parse import parse_qs
+
+from tools import handlers  # noqa: F401 — registers every tool
+from tools.registry import dispatch, get_tool, tool_definitions
+from tools.session_cache import SessionCache
+from utils.tool_executor import shutdown_tool_executor
+from db.db_connection import close_async_pool, get_pool_stats, get_async_pool_stats
+from utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from utils.logger import get_logger, bind_call, update_call, EventSampler
+from utils import json_codec
+from utils.json_codec import TwilioMediaFrames
+from realtime import prewarm, cached_audio
+from verification import caller_id
+from appointment import slot_index
+from realtime.playback import PlaybackLedger, audio_ms
+from realtime.vad import InboundGate
+from realtime.coalescer import InboundCoalescer
 
 
 load_dotenv()
 app = FastAPI()
+log = get_logger("main")
 
 # ---------------------------------------------------------------------------
 # CONFIG
@@ -66,6 +60,35 @@ VAD_THRESHOLD        = 0.75
 PREFIX_PADDING_MS    = 300
 SILENCE_DURATION_MS  = 700   # ✅ FIX C: slightly lower for snappier barge-in
 CLOUD_RUN_WSS_BASE   = "wss://green-diods-dental-clinic-production.up.railway.app"
+SESSION_READY_TIMEOUT_S = 5     # pre-warm: wait this long for session.updated
+TWILIO_START_TIMEOUT_S  = 10    # media stream: wait this long for Twilio "start"
+HOLD_PROMPT_AFTER_S     = 0.8   # hold_prompt tools: cached clip only if still running after this
+
+# ---------------------------------------------------------------------------
+# METRICS  (scraped from /metrics)
+# ---------------------------------------------------------------------------
+
+TURN_LATENCY = REGISTRY.histogram(
+    "dentalbot_turn_latency_seconds",
+    "input_audio_buffer.speech_stopped -> first response.audio.delta sent to Twilio."
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "dentalbot_tool_duration_seconds",
+    "Tool call duration per tool (dispatch, including retries).",
+    labelnames=("tool", "status")
+)
+OPENAI_CONNECT = REGISTRY.histogram(
+    "dentalbot_openai_connect_seconds",
+    "Time to open the OpenAI Realtime WebSocket."
+)
+ACTIVE_CALLS = REGISTRY.gauge(
+    "dentalbot_active_calls",
+    "Media-stream WebSockets currently open."
+)
+CALLS_TOTAL = REGISTRY.counter(
+    "dentalbot_calls_total",
+    "Media-stream WebSockets accepted."
+)
 
 # ---------------------------------------------------------------------------
 # SYSTEM INSTRUCTIONS
@@ -196,6 +219,11 @@ SYSTEM_INSTRUCTIONS = (
     "    VERIFIED       -> read contact digit by digit, then assist\n"
     "    MULTIPLE_FOUND -> ask contact number, call verify_with_contact_number()\n"
     "    NOT_FOUND      -> offer retry or create new account\n\n"
+    "CALLER ID SHORTCUT (only when CALL CONTEXT says the phone number matched):\n"
+    "  Instead of the existing patient flow, ask ONLY date of birth, read it back,\n"
+    "  WAIT for YES, then call verify_caller_dob(). Never say whose account it is first.\n"
+    "    VERIFIED  -> read contact digit by digit, then assist\n"
+    "    NOT_FOUND -> continue with the EXISTING PATIENT FLOW (ask last name)\n\n"
     "NEW PATIENT FLOW (no skipping):\n"
     "  Step 1: first name  Step 2: last name  Step 3: DOB (confirm as DD-MON-YYYY)\n"
     "  Step 4: contact (read back digit by digit, wait for confirmation)\n"
@@ -248,13 +276,16 @@ SYSTEM_INSTRUCTIONS = (
     "  3. Confirm ALL details ONCE: 'So that's [treatment] on [date] at [time] "
     "with [dentist] — shall I go ahead and book that for you?'\n"
     "  4. Patient says YES -> call book_appointment() immediately\n"
-    "  5. NEVER book without YES. NEVER confirm again after YES.\n\n"
+    "  5. NEVER book without YES. NEVER confirm again after YES.\n"
+    "  6. SLOT_TAKEN -> someone else just took that slot. Say so briefly, offer the\n"
+    "     returned alternatives, and book again only after the patient picks one and says YES.\n\n"
 
     "UPDATE/CANCEL:\n"
     "  Skip 'new or existing' question — only existing patients have appointments.\n"
     "  Go to EXISTING PATIENT FLOW directly (last name -> DOB -> verify).\n"
     "  After verification: call get_my_appointments() -> read as numbered list.\n"
     "  Use appointment_index (1, 2, 3…) for update or cancel.\n"
+    "  UPDATE: SLOT_TAKEN means the new time is taken — offer the returned alternatives.\n"
     "  CANCEL: confirm with patient -> cancel_my_appointment() after YES.\n\n"
 
     "COMPLAINTS — TWO-TYPE FLOW:\n\n"
@@ -311,15 +342,16 @@ SYSTEM_INSTRUCTIONS = (
 # SAFE OPENAI SEND
 # ---------------------------------------------------------------------------
 
-async def safe_openai_send(openai_ws, payload: dict):
+async def safe_openai_send(openai_ws, payload):
+    """payload: dict, or an already-serialized JSON str (see build_session_update)."""
     if not openai_ws:
         return
     try:
-        await openai_ws.send(json.dumps(payload))
+        await openai_ws.send(payload if isinstance(payload, str) else json_codec.dumps(payload))
     except websockets.exceptions.ConnectionClosed:
-        print("[OpenAI WS] Send skipped — socket closed")
+        log.debug("[OpenAI WS] Send skipped — socket closed")
     except Exception as e:
-        print("[OpenAI WS ERROR]", e)
+        log.warning("[OpenAI WS ERROR] %s", e)
 
 
 # ---------------------------------------------------------------------------
@@ -333,17 +365,18 @@ def make_new_session(call_sid: str) -> dict:
         "created_at":             datetime.now(),
         "verified":               False,
         "patient_data":           None,
+        "caller_candidates":      [],   # caller-ID matches (verification/caller_id.py)
+        "caller_lookup":          None, # claim task until caller_id.resolve() stores its result
         "current_flow":           None,
-        "fetched_appointments":   [],
+        "cache":                  SessionCache(),   # per-call read cache (tools/session_cache.py)
         "is_speaking":            False,
         "interruption_pending":   False,
         "current_response_id":    None,
         "greeting_sent":          False,
         "conversation_history":   [],
         "last_assistant_item_id": None,
-        "audio_start_time":       None,
-        "elapsed_ms":             0,
-        "audio_queue":            [],
+        "playback":               PlaybackLedger(),   # what Twilio has actually played
+        "speech_stopped_at":      None,
         "supplier_context": {
             "caller_name":       None,
             "company_name":      None,
@@ -383,638 +416,186 @@ def get_session_config() -> dict:
             },
             "temperature":                TEMPERATURE,
             "max_response_output_tokens": 1024,
-            "tools": [
-                # ── VERIFICATION ──────────────────────────────────────────────
-                {
-                    "type": "function", "name": "verify_existing_patient",
-                    "description": (
-                        "Verify existing patient by last name and date of birth. "
-                        "ONLY call after user has confirmed DOB in DD-MON-YYYY format."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "last_name":     {"type": "string"},
-                            "date_of_birth": {"type": "string",
-                                              "description": "DD-MON-YYYY e.g. 15 Jun 1990"}
-                        },
-                        "required": ["last_name", "date_of_birth"]
-                    }
-                },
-                {
-                    "type": "function", "name": "verify_with_contact_number",
-                    "description": "Disambiguate when multiple patients share last name + DOB.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "last_name":      {"type": "string"},
-                            "date_of_birth":  {"type": "string"},
-                            "contact_number": {"type": "string"}
-                        },
-                        "required": ["last_name", "date_of_birth", "contact_number"]
-                    }
-                },
-                {
-                    "type": "function", "name": "create_new_patient",
-                    "description": (
-                        "Register a new patient. Call immediately after collecting "
-                        "first_name, last_name, DOB, contact. "
-                        "Do NOT say account ready before this returns status=CREATED."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "first_name":     {"type": "string"},
-                            "last_name":      {"type": "string"},
-                            "date_of_birth":  {"type": "string"},
-                            "contact_number": {"type": "string"},
-                            "insurance_info": {"type": "string"}
-                        },
-                        "required": ["first_name", "last_name", "date_of_birth", "contact_number"]
-                    }
-                },
-                # ── APPOINTMENTS ──────────────────────────────────────────────
-                {
-                    "type": "function", "name": "check_slot_availability",
-                    "description": "Check if a specific dentist is available at a given date/time.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "date":         {"type": "string"},
-                            "time":         {"type": "string"},
-                            "dentist_name": {
-                                "type": "string",
-                                "description": "MUST be exact: Dr. Emily Carter | Dr. James Nguyen | Dr. Sarah Mitchell"
-                            }
-                        },
-                        "required": ["date", "time", "dentist_name"]
-                    }
-                },
-                {
-                    "type": "function", "name": "find_any_available_dentist",
-                    "description": "Find any available dentist when patient has no preference.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "date": {"type": "string"},
-                            "time": {"type": "string"}
-                        },
-                        "required": ["date", "time"]
-                    }
-                },
-                {
-                    "type": "function", "name": "book_appointment",
-                    "description": (
-                        "Book appointment ONLY after patient says YES to full confirmation. "
-                        "preferred_dentist MUST be exact full name with Dr. prefix. "
-                        "preferred_treatment MUST be from the 18-item SERVICES list exactly."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "preferred_treatment": {"type": "string"},
-                            "preferred_date":      {"type": "string"},
-                            "preferred_time":      {"type": "string"},
-                            "preferred_dentist":   {"type": "string"}
-                        },
-                        "required": ["preferred_treatment", "preferred_date",
-                                     "preferred_time", "preferred_dentist"]
-                    }
-                },
-                {
-                    "type": "function", "name": "get_my_appointments",
-                    "description": "Get all confirmed appointments. ALWAYS call before update/cancel.",
-                    "parameters": {"type": "object", "properties": {}}
-                },
-                {
-                    "type": "function", "name": "update_my_appointment",
-                    "description": "Update appointment using appointment_index from get_my_appointments.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "appointment_index": {"type": "integer"},
-                            "new_treatment":     {"type": "string"},
-                            "new_date":          {"type": "string"},
-                            "new_time":          {"type": "string"},
-                            "new_dentist":       {"type": "string"}
-                        },
-                        "required": ["appointment_index"]
-                    }
-                },
-                {
-                    "type": "function", "name": "cancel_my_appointment",
-                    "description": "Cancel appointment after patient says YES.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "appointment_index": {"type": "integer"},
-                            "reason":            {"type": "string"}
-                        },
-                        "required": ["appointment_index"]
-                    }
-                },
-                # ── COMPLAINTS ────────────────────────────────────────────────
-                {
-                    "type": "function", "name": "file_complaint",
-                    "description": (
-                        "Save a complaint.\n"
-                        "TYPE 1 (general): NO verification needed. "
-                        "Required: complaint_text, complaint_category=general, "
-                        "first_name, last_name, contact_number.\n"
-                        "TYPE 2 (treatment): patient MUST be verified. "
-                        "Required: complaint_text, complaint_category=treatment, "
-                        "treatment_name, dentist_name, treatment_date. "
-                        "patient_id comes from verified session.\n"
-                        "NEVER ask for DOB for a general complaint."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "complaint_text":     {"type": "string"},
-                            "complaint_category": {"type": "string", "enum": ["general", "treatment"]},
-                            "first_name":         {"type": "string"},
-                            "last_name":          {"type": "string"},
-                            "contact_number":     {"type": "string"},
-                            "treatment_name":     {"type": "string"},
-                            "dentist_name":       {"type": "string"},
-                            "treatment_date":     {"type": "string"},
-                            "treatment_time":     {"type": "string"},
-                            "additional_info":    {"type": "string"},
-                            "appointment_id":     {"type": "integer"}
-                        },
-                        "required": ["complaint_text", "complaint_category"]
-                    }
-                },
-                # ── GENERAL ENQUIRY ───────────────────────────────────────────
-                {
-                    "type": "function", "name": "get_business_information",
-                    "description": "Get pricing, hours, payment options, offers, dentist info.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {"query": {"type": "string"}},
-                        "required": ["query"]
-                    }
-                },
-                {
-                    "type": "function", "name": "get_insurance_information",
-                    "description": "Get health insurance info.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {"query": {"type": "string"}},
-                        "required": ["query"]
-                    }
-                },
-                {
-                    "type": "function", "name": "get_warranty_information",
-                    "description": "Get dental warranty policy.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {"query": {"type": "string"}},
-                        "required": ["query"]
-                    }
-                },
-                {
-                    "type": "function", "name": "answer_dental_question",
-                    "description": (
-                        "Answer questions about dental procedures, pre/post care, recovery. "
-                        "Uses ONLY internal knowledge base. NOT for pricing. "
-                        "NEVER suggest 'consultation'. "
-                        "ONLY reference treatments from the clinic's 18-item SERVICES list."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {"query": {"type": "string"}},
-                        "required": ["query"]
-                    }
-                },
-                {
-                    "type": "function", "name": "get_my_order_status",
-                    "description": "Check status of patient's dental order.",
-                    "parameters": {"type": "object", "properties": {}}
-                },
-                {
-                    "type": "function", "name": "get_my_upcoming_appointments",
-                    "description": "Get upcoming appointments for verified patient.",
-                    "parameters": {"type": "object", "properties": {}}
-                },
-                {
-                    "type": "function", "name": "get_my_treatment_history",
-                    "description": "Get past treatment history for verified patient.",
-                    "parameters": {"type": "object", "properties": {}}
-                },
-                # ── SUPPLIER ──────────────────────────────────────────────────
-                {
-                    "type": "function", "name": "check_known_supplier",
-                    "description": (
-                        "Check if calling company is an authorised supplier. "
-                        "ALWAYS call first when a business caller mentions a company. "
-                        "Returns FOUND or NOT_FOUND."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "company_name": {"type": "string"}
-                        },
-                        "required": ["company_name"]
-                    }
-                },
-                {
-                    "type": "function", "name": "update_supplier_order",
-                    "description": (
-                        "Mark a patient order as ready after a VERIFIED supplier confirms. "
-                        "Use patient_id when available, else patient_last_name. "
-                        "Also call log_supplier_call() for the same call."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "patient_id":        {"type": "integer"},
-                            "patient_last_name": {"type": "string"},
-                            "product_name":      {"type": "string"}
-                        },
-                        "required": ["product_name"]
-                    }
-                },
-                {
-                    "type": "function", "name": "log_supplier_call",
-                    "description": (
-                        "Log a call from a supplier, agent, or business. "
-                        "For TYPE 2 agent calls. Also call alongside update_supplier_order. "
-                        "NEVER for patient calls."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "caller_name":    {"type": "string"},
-                            "company_name":   {"type": "string"},
-                            "contact_number": {"type": "string"},
-                            "purpose":        {"type": "string"}
-                        },
-                        "required": ["purpose"]
-                    }
-                },
-            ],
+            "tools":                      tool_definitions(),
             "tool_choice": "auto"
         }
     }
 
 
 # ---------------------------------------------------------------------------
-# FUNCTION CALL HANDLER  (unchanged logic from v21)
+# PRE-SERIALIZED session.update
+# The static session (≈20 KB of instructions + tool schemas) is serialized
+# ONCE at import. Per call we only join cached field strings and splice a
+# small JSON-escaped suffix onto the instructions string — no re-encoding of
+# the instruction block or the tools.
 # ---------------------------------------------------------------------------
 
-async def handle_function_call(function_name, arguments, call_id, session, openai_ws, disarm_fn=None):
-    print(f"[FUNCTION] {function_name}")
-    print(f"[ARGS]     {json.dumps(arguments, indent=2)}")
-    result = {}
+_compact = json_codec.dumps
 
-    try:
-        if function_name == "verify_existing_patient":
-            r = verify_by_lastname_dob(
-                last_name=arguments.get("last_name", ""),
-                dob=normalize_dob(arguments.get("date_of_birth", ""))
-            )
-            if r["status"] == "VERIFIED":
-                session["patient_data"] = r
-                session["verified"]     = True
-                result = {
-                    "status":         "VERIFIED",
-                    "first_name":     r["first_name"],
-                    "last_name":      r["last_name"],
-                    "date_of_birth":  r["date_of_birth"],
-                    "contact_spoken": format_phone_for_speech(r.get("contact_number", ""))
-                }
-            elif r["status"] == "MULTIPLE_FOUND":
-                result = {"status": "MULTIPLE_FOUND", "message": r["message"]}
-            else:
-                result = {"status": "NOT_FOUND", "message": r.get("message", "No account found.")}
-
-        elif function_name == "verify_with_contact_number":
-            phone = extract_phone_from_text(arguments.get("contact_number", ""))
-            r = verify_by_lastname_dob_contact(
-                last_name=arguments.get("last_name", ""),
-                dob=normalize_dob(arguments.get("date_of_birth", "")),
-                contact_number=phone
-            )
-            if r["status"] == "VERIFIED":
-                session["patient_data"] = r
-                session["verified"]     = True
-                result = {"status": "VERIFIED",
-                          "first_name": r["first_name"], "last_name": r["last_name"]}
-            else:
-                result = {"status": "NOT_FOUND", "message": r.get("message", "Could not verify.")}
-
-        elif function_name == "create_new_patient":
-            phone = extract_phone_from_text(arguments.get("contact_number", ""))
-            r = create_new_patient(
-                first_name=arguments.get("first_name", ""),
-                last_name=arguments.get("last_name", ""),
-                dob=normalize_dob(arguments.get("date_of_birth", "")),
-                contact_number=phone,
-                insurance_info=arguments.get("insurance_info")
-            )
-            if r["status"] == "CREATED":
-                session["patient_data"] = r
-                session["verified"]     = True
-                result = {
-                    "status":     "CREATED",
-                    "first_name": r["first_name"],
-                    "last_name":  r["last_name"],
-                    "message":    "Account created. Patient verified and ready to book."
-                }
-            else:
-                result = {"status": "ERROR", "message": r.get("message", "Could not create account.")}
-
-        elif function_name == "check_slot_availability":
-            result = check_dentist_availability(
-                date_str=arguments.get("date", ""),
-                time_str=arguments.get("time", ""),
-                dentist_name=arguments.get("dentist_name", "")
-            )
-
-        elif function_name == "find_any_available_dentist":
-            result = find_available_dentist(
-                date_str=arguments.get("date", ""),
-                time_str=arguments.get("time", "")
-            )
-
-        elif function_name == "book_appointment":
-            if not session.get("verified") or not session.get("patient_data"):
-                result = {"status": "ERROR", "message": "Patient must be verified first."}
-            else:
-                p = session["patient_data"]
-                r = book_appointment(
-                    patient_id=p["patient_id"],
-                    first_name=p["first_name"],
-                    last_name=p["last_name"],
-                    date_of_birth=p["date_of_birth"],
-                    contact_number=p["contact_number"],
-                    preferred_treatment=arguments.get("preferred_treatment", ""),
-                    preferred_date=arguments.get("preferred_date", ""),
-                    preferred_time=arguments.get("preferred_time", ""),
-                    preferred_dentist=arguments.get("preferred_dentist", "")
-                )
-                if r["status"] == "BOOKED":
-                    result = {
-                        "status":    "BOOKED",
-                        "treatment": r["treatment"],
-                        "date":      r["date"],
-                        "time":      r["time"],
-                        "dentist":   r["dentist"]
-                    }
-                else:
-                    result = {"status": "ERROR", "message": r.get("message", "Booking failed.")}
+_STATIC_SESSION      = get_session_config()["session"]
+_SESSION_FIELDS_JSON = {
+    key: f"{_compact(key)}:{_compact(value)}"
+    for key, value in _STATIC_SESSION.items() if key != "instructions"
+}
+# '"You are Sarah...' — the instructions string WITHOUT its closing quote.
+_INSTRUCTIONS_OPEN   = _compact(_STATIC_SESSION["instructions"])[:-1]
 
-        elif function_name == "get_my_appointments":
-            if not session.get("verified"):
-                result = {"status": "ERROR", "message": "Patient not verified."}
-            else:
-                r = get_patient_appointments(session["patient_data"]["patient_id"])
-                if r["status"] == "SUCCESS":
-                    appts = r["appointments"]
-                    session["fetched_appointments"] = appts
-                    result = {
-                        "status": "SUCCESS",
-                        "appointments": [
-                            {"index": i, "treatment": a["treatment"], "date": a["date"],
-                             "time": a["time"], "dentist": a["dentist"], "status": a["status"]}
-                            for i, a in enumerate(appts, 1)
-                        ],
-                        "count": len(appts)
-                    }
-                else:
-                    result = {"status": r["status"], "message": r.get("message", "")}
+_KEEPALIVE_PAYLOAD   = _compact({
+    "type": "session.update",
+    "session": {"turn_detection": _STATIC_SESSION["turn_detection"]}
+})
 
-        elif function_name == "update_my_appointment":
-            if not session.get("verified"):
-                result = {"status": "ERROR", "message": "Patient not verified."}
-            else:
-                idx   = arguments.get("appointment_index", 1) - 1
-                appts = session.get("fetched_appointments", [])
-                if not appts:
-                    r2 = get_patient_appointments(session["patient_data"]["patient_id"])
-                    if r2["status"] == "SUCCESS":
-                        appts = r2["appointments"]
-                        session["fetched_appointments"] = appts
-                if 0 <= idx < len(appts):
-                    fields = {}
-                    if arguments.get("new_treatment"): fields["preferred_treatment"] = arguments["new_treatment"]
-                    if arguments.get("new_date"):      fields["preferred_date"]      = arguments["new_date"]
-                    if arguments.get("new_time"):      fields["preferred_time"]      = arguments["new_time"]
-                    if arguments.get("new_dentist"):   fields["preferred_dentist"]   = arguments["new_dentist"]
-                    r = update_appointment(appts[idx]["_id"], fields)
-                    if r["status"] == "UPDATED":
-                        session["fetched_appointments"] = []
-                        result = {"status": "UPDATED", "treatment": r["treatment"],
-                                  "date": r["date"], "time": r["time"], "dentist": r["dentist"]}
-                    else:
-                        result = {"status": "ERROR", "message": r.get("message", "Update failed.")}
-                else:
-                    result = {"status": "ERROR", "message": "Invalid index. Call get_my_appointments first."}
 
-        elif function_name == "cancel_my_appointment":
-            if not session.get("verified"):
-                result = {"status": "ERROR", "message": "Patient not verified."}
-            else:
-                idx   = arguments.get("appointment_index", 1) - 1
-                appts = session.get("fetched_appointments", [])
-                if not appts:
-                    r2 = get_patient_appointments(session["patient_data"]["patient_id"])
-                    if r2["status"] == "SUCCESS":
-                        appts = r2["appointments"]
-                        session["fetched_appointments"] = appts
-                if 0 <= idx < len(appts):
-                    r = cancel_appointment(appts[idx]["_id"], arguments.get("reason"))
-                    if r["status"] == "CANCELLED":
-                        session["fetched_appointments"] = []
-                        result = {"status": "CANCELLED", "treatment": r["treatment"],
-                                  "date": r["date"], "time": r["time"], "dentist": r["dentist"]}
-                    else:
-                        result = {"status": "ERROR", "message": r.get("message", "Cancel failed.")}
-                else:
-                    result = {"status": "ERROR", "message": "Invalid index. Call get_my_appointments first."}
+def call_context_instructions() -> str:
+    """Dynamic text appended to SYSTEM_INSTRUCTIONS for this call."""
+    return f"\n\nCALL CONTEXT:\nToday is {date.today():%A, %d %B %Y}."
 
-        elif function_name == "file_complaint":
-            category = arguments.get("complaint_category", "general").lower()
-            if category == "treatment":
-                if not session.get("verified") or not session.get("patient_data"):
-                    result = {"status": "ERROR", "message": "Patient must be verified for a treatment complaint."}
-                else:
-                    p = session["patient_data"]
-                    appt_id = arguments.get("appointment_id")
-                    r = save_complaint(
-                        complaint_category="treatment",
-                        complaint_text=arguments.get("complaint_text", ""),
-                        first_name=p["first_name"],
-                        last_name=p["last_name"],
-                        contact_number=p.get("contact_number"),
-                        patient_id=p["patient_id"],
-                        appointment_id=appt_id,
-                        date_of_birth=p.get("date_of_birth"),
-                        treatment_name=arguments.get("treatment_name"),
-                        dentist_name=arguments.get("dentist_name"),
-                        treatment_date=arguments.get("treatment_date"),
-                        treatment_time=arguments.get("treatment_time"),
-                        additional_info=arguments.get("additional_info"),
-                    )
-                    result = r if r["status"] != "SAVED" else {"status": "SAVED", "message": r["message"]}
-            else:
-                r = save_complaint(
-                    complaint_category="general",
-                    complaint_text=arguments.get("complaint_text", ""),
-                    first_name=arguments.get("first_name"),
-                    last_name=arguments.get("last_name"),
-                    contact_number=arguments.get("contact_number"),
-                )
-                result = r if r["status"] != "SAVED" else {"status": "SAVED", "message": r["message"]}
-
-        elif function_name == "get_business_information":
-            r = handle_business_info(user_input=arguments.get("query", ""), session=session)
-            result = {"status": r.get("status", "SUCCESS"), "response": r.get("response", "")}
-
-        elif function_name == "get_insurance_information":
-            r = handle_insurance_query(user_input=arguments.get("query", ""), session=session)
-            result = {"status": r.get("status", "SUCCESS"), "response": r.get("response", "")}
-
-        elif function_name == "get_warranty_information":
-            r = handle_warranty_query(user_input=arguments.get("query", ""), session=session)
-            result = {"status": r.get("status", "SUCCESS"), "response": r.get("response", "")}
-
-        elif function_name == "answer_dental_question":
-            r = handle_kb_query(user_input=arguments.get("query", ""), session=session)
-            result = {"status": r.get("source", "kb"), "response": r.get("response", "")}
-
-        elif function_name == "get_my_order_status":
-            if not session.get("verified"):
-                result = {"status": "ERROR", "message": "Patient not verified."}
-            else:
-                r = get_patient_orders(session["patient_data"]["patient_id"])
-                if r["status"] == "SUCCESS":
-                    result = {
-                        "status": "SUCCESS",
-                        "orders": [{"product": o["product_name"], "status": o["order_status"],
-                                    "notes": o.get("notes", "")} for o in r["orders"]],
-                        "count": r["count"]
-                    }
-                else:
-                    result = {"status": r["status"], "message": r.get("message", "No orders found.")}
 
-        elif function_name == "get_my_upcoming_appointments":
-            if not session.get("verified"):
-                result = {"status": "ERROR", "message": "Patient not verified."}
-            else:
-                r = get_upcoming_appointments(session["patient_data"]["patient_id"])
-                if r["status"] == "SUCCESS":
-                    result = {
-                        "status": "SUCCESS",
-                        "appointments": [{"treatment": a["treatment"], "date": a["date"],
-                                          "time": a["time"], "dentist": a["dentist"]}
-                                         for a in r["appointments"]],
-                        "count": r["count"]
-                    }
-                else:
-                    result = {"status": r["status"], "message": r.get("message", "None found.")}
+def caller_id_context_item(count: int) -> dict:
+    """System note for the model when the caller's number matched patient accounts."""
+    accounts = "a registered patient account" if count == 1 else f"{count} registered patient accounts"
+    return {
+        "type": "conversation.item.create",
+        "item": {
+            "type":    "message",
+            "role":    "system",
+            "content": [{"type": "input_text", "text": (
+                f"CALL CONTEXT: The caller's phone number matches {accounts}. "
+                "If verification is needed, use the CALLER ID SHORTCUT."
+            )}]
+        }
+    }
 
-        elif function_name == "get_my_treatment_history":
-            if not session.get("verified"):
-                result = {"status": "ERROR", "message": "Patient not verified."}
-            else:
-                r = get_past_appointments(session["patient_data"]["patient_id"])
-                if r["status"] == "SUCCESS":
-                    result = {
-                        "status": "SUCCESS",
-                        "appointments": [{"treatment": a["treatment"], "date": a["date"],
-                                          "dentist": a["dentist"]}
-                                         for a in r["appointments"][:5]],
-                        "count": r["count"]
-                    }
-                else:
-                    result = {"status": r["status"], "message": r.get("message", "None found.")}
-
-        elif function_name == "check_known_supplier":
-            company_name = arguments.get("company_name", "")
-            r = check_supplier(company_name)
-            if r["status"] == "FOUND":
-                session["supplier_context"]["company_name"]      = r["supplier"]["company_name"]
-                session["supplier_context"]["is_known_supplier"] = True
-                result = {
-                    "status":       "FOUND",
-                    "company_name": r["supplier"]["company_name"],
-                    "specialty":    r["supplier"]["specialty"],
-                    "message":      f"Verified supplier: {r['supplier']['company_name']}."
-                }
-            else:
-                session["supplier_context"]["is_known_supplier"] = False
-                result = {"status": "NOT_FOUND", "message": r["message"]}
-
-        elif function_name == "update_supplier_order":
-            patient_id   = arguments.get("patient_id")
-            last_name    = arguments.get("patient_last_name")
-            product_name = arguments.get("product_name", "")
-            if patient_id:
-                r = update_order_by_patient_id(
-                    patient_id=int(patient_id), product_name=product_name,
-                    new_status="ready",
-                    notes=f"Supplier confirmed — {session['supplier_context'].get('company_name','')}"
-                )
-            elif last_name:
-                r = update_order_status_by_patient_name(
-                    patient_name=last_name, product_name=product_name,
-                    new_status="ready",
-                    notes=f"Supplier confirmed — {session['supplier_context'].get('company_name','')}"
-                )
-            else:
-                r = {"status": "ERROR", "message": "Need patient_id or patient_last_name."}
-            result = r
-
-        elif function_name == "log_supplier_call":
-            ctx = session.get("supplier_context", {})
-            caller_name    = arguments.get("caller_name")    or ctx.get("caller_name")
-            company_name   = arguments.get("company_name")   or ctx.get("company_name")
-            contact_number = arguments.get("contact_number") or ctx.get("contact_number")
-            if arguments.get("caller_name"):
-                session["supplier_context"]["caller_name"]    = arguments["caller_name"]
-            if arguments.get("company_name"):
-                session["supplier_context"]["company_name"]   = arguments["company_name"]
-            if arguments.get("contact_number"):
-                session["supplier_context"]["contact_number"] = arguments["contact_number"]
-            log_business_call(
-                caller_name=caller_name, company_name=company_name,
-                contact_number=contact_number, purpose=arguments.get("purpose"),
-                full_notes=json.dumps(arguments)
-            )
-            result = {
-                "status":  "LOGGED",
-                "message": f"Call from {caller_name or 'caller'} ({company_name or 'unknown'}) logged."
-            }
-
-        else:
-            result = {"error": f"Unknown function: {function_name}"}
 
-    except Exception as e:
-        print("========== FUNCTION ERROR ==========")
-        traceback.print_exc()
-        print("====================================")
-        result = {"status": "ERROR", "message": str(e)}
+def build_session_update(extra_instructions: str = "", **overrides) -> str:
+    """
+    Ready-to-send session.update JSON.
+    extra_instructions is appended to SYSTEM_INSTRUCTIONS; overrides replace or
+    add top-level session fields (only those get serialized here).
+    """
+    # JSON escaping is per-character, so '"<instructions>' + '<extra>"' is valid
+    parts = [f'"instructions":{_INSTRUCTIONS_OPEN}{_compact(extra_instructions)[1:]}']
+    for key, field_json in _SESSION_FIELDS_JSON.items():
+        if key in overrides:
+            field_json = f"{_compact(key)}:{_compact(overrides[key])}"
+        parts.append(field_json)
+    for key, value in overrides.items():
+        if key not in _SESSION_FIELDS_JSON and key != "instructions":
+            parts.append(f"{_compact(key)}:{_compact(value)}")
+    return '{"type":"session.update","session":{' + ",".join(parts) + "}}"
 
-    if disarm_fn:
-        disarm_fn()
 
-    await safe_openai_send(openai_ws, {
-        "type": "conversation.item.create",
-        "item": {"type": "function_call_output", "call_id": call_id,
-                 "output": json.dumps(result)}
-    })
-    await safe_openai_send(openai_ws, {"type": "response.create"})
-    print(f"[RESULT] {json.dumps(result, indent=2)}")
+# ---------------------------------------------------------------------------
+# FUNCTION CALL HANDLER
+# Tools live in tools/handlers.py; dispatch() looks the spec up by name and
+# applies its timeout / retry / fallback, so a hung query or slow LLM call
+# still produces a function_call_output promptly. Read-only tools in a
+# response start as soon as their arguments are complete and run side by
+# side; verification and write tools wait for the calls before them (and
+# later calls wait for those). receive_from_openai gathers them at
+# response.done and posts the outputs together.
+# ---------------------------------------------------------------------------
+
+async def run_function_call(function_name, arguments, session, play_hold=None) -> dict:
+    log.info("[FUNCTION] %s args=%s", function_name, arguments)
+    started = time.perf_counter()
+    spec    = get_tool(function_name)
+    hold    = None
+    if play_hold and spec and spec.hold_prompt:
+        hold = asyncio.create_task(play_hold(HOLD_PROMPT_AFTER_S))
+
+    try:
+        result = await dispatch(function_name, arguments, session)
+    finally:
+        if hold:
+            hold.cancel()
+
+    TOOL_DURATION.observe(time.perf_counter() - started, tool=function_name,
+                          status=str(result.get("status", "OK")))
+    log.info("[RESULT] %s status=%s", function_name, result.get("status"))
+    log.debug("[RESULT] %s %s", function_name, result)
+    return result
+
+
+async def post_function_outputs(openai_ws, outputs, respond: bool = True):
+    """
+    outputs: [(call_id, result)] for every function call of ONE model response.
+    All outputs go in first, then a single response.create — one reply that
+    uses every result, instead of one (possibly overlapping) reply per tool.
+    """
+    for call_id, result in outputs:
+        await safe_openai_send(openai_ws, {
+            "type": "conversation.item.create",
+            "item": {"type": "function_call_output", "call_id": call_id,
+                     "output": json_codec.dumps(result)}
+        })
+    if respond:
+        await safe_openai_send(openai_ws, {"type": "response.create"})
+
+
+# ---------------------------------------------------------------------------
+# OPENAI REALTIME CONNECTION
+# ---------------------------------------------------------------------------
+
+async def open_realtime_session(wait_ready: bool = False):
+    """
+    Connect to OpenAI Realtime and send the session.update.
+    wait_ready=True (pre-warm) also waits for session.updated -> (ws, True).
+    Closes the socket if anything fails or the caller cancels.
+    """
+    connect_started = time.perf_counter()
+    ws = await websockets.connect(
+        OPENAI_REALTIME_URL,
+        additional_headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "OpenAI-Beta":   "realtime=v1"
+        }
+    )
+    OPENAI_CONNECT.observe(time.perf_counter() - connect_started)
+
+    async def _until_session_updated():
+        async for raw in ws:
+            event = json_codec.loads(raw)
+            if event.get("type") == "session.updated":
+                return
+            if event.get("type") == "error":
+                raise ConnectionError(event.get("error", {}).get("message", "session.update failed"))
+        raise ConnectionError("socket closed before session.updated")
+
+    try:
+        await ws.send(build_session_update(call_context_instructions()))
+        if not wait_ready:
+            return ws, False
+        await asyncio.wait_for(_until_session_updated(), SESSION_READY_TIMEOUT_S)
+        return ws, True
+    except BaseException:
+        await ws.close()
+        raise
 
 
 # ---------------------------------------------------------------------------
 # TWILIO WEBHOOK
+# Kicks off the OpenAI connection speculatively (keyed by CallSid) so it is
+# ready by the time Twilio opens /media-stream.
 # ---------------------------------------------------------------------------
 
+async def _twilio_params(request: Request) -> dict:
+    # Twilio posts application/x-www-form-urlencoded; parse it directly
+    # rather than pulling in python-multipart for request.form().
+    if request.method == "POST":
+        body = (await request.body()).decode("utf-8", "replace")
+        return {k: v[0] for k, v in parse_qs(body).items()}
+    return dict(request.query_params)
+
+
 @app.api_route("/voice", methods=["GET", "POST"])
 async def voice(request: Request):
+    params   = await _twilio_params(request)
+    call_sid = params.get("CallSid")
+    if call_sid:
+        prewarm.start_prewarm(call_sid, lambda: open_realtime_session(wait_ready=True))
+        caller_id.start_lookup(call_sid, params.get("From"))
+
     twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
     <Connect>
@@ -1028,41 +609,89 @@ async def voice(request: Request):
 # MAIN WEBSOCKET
 # ---------------------------------------------------------------------------
 
+async def _wait_for_twilio_start(websocket: WebSocket) -> dict:
+    """Consume Twilio's "connected" event and return the "start" payload."""
+    while True:
+        data = json_codec.loads(await websocket.receive_text())
+        if data.get("event") == "start":
+            return data["start"]
+
+
 @app.websocket("/media-stream")
 async def handle_media_stream(websocket: WebSocket):
-    import time
-    print("=" * 70)
-    print("[CALL START] New WebSocket connection")
-    print("=" * 70)
+    bind_call()
+    log.info("[CALL START] New WebSocket connection")
     await websocket.accept()
-
-    call_sid    = None
-    stream_sid  = None
-    session     = None
-    openai_ws   = None
-    call_active = {"running": True}
-
+    CALLS_TOTAL.inc()
+    ACTIVE_CALLS.inc()
+
+    call_sid     = None
+    stream_sid   = None
+    media_frames = None
+    session      = None
+    openai_ws    = None
+    openai_ready = False
+    call_active  = {"running": True}
+    announce     = None
+    sampler      = EventSampler()
+    gate         = InboundGate()   # drops line silence before input_audio_buffer.append
+
+    # ── Twilio "start" carries the CallSid that keys the pre-warmed socket ──
     try:
-        openai_ws = await websockets.connect(
-            OPENAI_REALTIME_URL,
-            additional_headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "OpenAI-Beta":   "realtime=v1"
-            }
-        )
-        print("[OpenAI] WebSocket connected")
+        start = await asyncio.wait_for(_wait_for_twilio_start(websocket), TWILIO_START_TIMEOUT_S)
     except Exception as e:
-        print(f"[OpenAI] Connection FAILED: {e}")
-        await websocket.close()
+        log.error("[Twilio] No start event: %s", type(e).__name__)
+        ACTIVE_CALLS.dec()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
         return
 
+    stream_sid   = start["streamSid"]
+    call_sid     = start.get("callSid", stream_sid)
+    media_frames = TwilioMediaFrames(stream_sid)
+    session      = make_new_session(call_sid)
+    session["stream_sid"] = stream_sid
+    # Caller ID (looked up on /voice) resolves in the background; only
+    # announce_caller_id and verify_caller_dob wait for it
+    session["caller_lookup"] = asyncio.create_task(caller_id.claim(call_sid))
+    update_call(call_sid=call_sid, stream_sid=stream_sid)
+    log.info("[Twilio] Connected | Stream: %s", stream_sid)
+
+    async def play_cached(clip):
+        playback = session["playback"]
+        mark     = playback.on_sent(None, clip.duration_ms) or playback.mark_now()
+        await cached_audio.play_clip(websocket, media_frames, clip, mark=mark)
+        update_history(session, "assistant", clip.text)
+        log.info("[BOT]  (cached %s) %s", clip.name, clip.text)
+
+    async def announce_caller_id():
+        # DOB-only verification if the number matched — told to the model as
+        # soon as the lookup lands, without holding up the call
+        candidates = await caller_id.resolve(session)
+        if candidates:
+            await safe_openai_send(openai_ws, caller_id_context_item(len(candidates)))
+
+    # Twilio's 20 ms frames → one input_audio_buffer.append per INBOUND_COALESCE_MS
+    inbound = InboundCoalescer(lambda message: safe_openai_send(openai_ws, message))
+
     async def receive_from_openai():
         nonlocal session
-        pending_fn      = None
-        pending_call_id = None
-        pending_args    = ""
+        fn_names       = {}    # call_id -> function name (from output_item.added)
+        response_calls = {}    # response_id -> [(call_id, task, read_only)] started in that response
+        # owed_response: outputs of a barge-in-cancelled response were posted
+        # after the caller's new response had already started without them
+        turn = {"user_speaking": False, "owed_response": False}
 
         wd = {"task": None, "armed": False}
+        tool_tasks = set()
+
+        def spawn(coro):
+            task = asyncio.create_task(coro)
+            tool_tasks.add(task)
+            task.add_done_callback(tool_tasks.discard)
+            return task
 
         async def watchdog():
             await asyncio.sleep(1.5)
@@ -1070,11 +699,11 @@ async def handle_media_stream(websocket: WebSocket):
                 return
             if session and session.get("is_speaking"):
                 return
-            print("[WATCHDOG] Bot silent — nudge")
+            log.info("[WATCHDOG] Bot silent — nudge")
             try:
                 await safe_openai_send(openai_ws, {"type": "response.create"})
             except Exception as e:
-                print(f"[WATCHDOG ERROR] {e}")
+                log.warning("[WATCHDOG ERROR] %s", e)
             wd["armed"] = False
 
         def arm_watchdog():
@@ -1089,57 +718,107 @@ async def handle_media_stream(websocket: WebSocket):
             wd["armed"] = False
             wd["task"]  = None
 
+        async def play_hold(delay_s):
+            await asyncio.sleep(delay_s)
+            clip = cached_audio.hold_clip()
+            if clip and not session.get("is_speaking") and not session["playback"].playing:
+                # shielded: once started, a clip is never cut off mid-frame-burst
+                await asyncio.shield(play_cached(clip))
+
+        async def run_in_order(fn, args, earlier):
+            # earlier: tasks this call must wait for (finished, whatever the outcome)
+            if earlier:
+                await asyncio.wait(earlier)
+            return await run_function_call(fn, args, session, play_hold)
+
+        def start_call(response_id, call_id, fn, args):
+            spec      = get_tool(fn)
+            read_only = bool(spec and spec.read_only)
+            calls     = response_calls.setdefault(response_id, [])
+            # reads run alongside reads but after any verification / write before
+            # them; verification / writes wait for everything before them
+            earlier   = [task for _, task, ro in calls if not (read_only and ro)]
+            task      = spawn(run_in_order(fn, args, earlier))
+            calls.append((call_id, task, read_only))
+
+        async def finish_response_calls(calls, respond):
+            results = await asyncio.gather(*(task for _, task, _ in calls), return_exceptions=True)
+            outputs = [
+                (call_id, r if isinstance(r, dict) else {"status": "ERROR", "message": "Tool failed."})
+                for (call_id, _, _), r in zip(calls, results)
+            ]
+            disarm_watchdog()
+            if not respond:
+                # Cancelled by barge-in. While the caller is still talking, the
+                # server-VAD response for their new turn hasn't started and will
+                # include these outputs. Otherwise it may already be running (or
+                # done) without them — ask for one more response after it.
+                if turn["user_speaking"]:
+                    pass
+                elif session.get("current_response_id") is not None:
+                    turn["owed_response"] = True
+                else:
+                    respond = True
+            await post_function_outputs(openai_ws, outputs, respond)
+
+        async def send_greeting():
+            # Live fallback when the cached greeting clip is not available
+            if session and not session.get("greeting_sent"):
+                session["greeting_sent"] = True
+                await safe_openai_send(openai_ws, {
+                    "type": "conversation.item.create",
+                    "item": {
+                        "type": "message", "role": "user",
+                        "content": [{"type": "input_text", "text": "[CALL_STARTED]"}]
+                    }
+                })
+                await safe_openai_send(openai_ws, {"type": "response.create"})
+
         try:
-            await safe_openai_send(openai_ws, get_session_config())
-            print("[OpenAI] Session config sent", flush=True)
+            if openai_ready:
+                await send_greeting()
 
             async for message in openai_ws:
-                data       = json.loads(message)
+                data       = json_codec.loads(message)
                 event_type = data.get("type", "")
-                print(f"[OpenAI EVENT] {event_type}", flush=True)
+                if sampler.should_log(event_type):
+                    log.debug("[OpenAI EVENT] %s", event_type)
 
                 try:
                     # ── Session ready → send greeting trigger ─────────────────
                     if event_type == "session.updated":
-                        if session and not session.get("greeting_sent"):
-                            session["greeting_sent"] = True
-                            await safe_openai_send(openai_ws, {
-                                "type": "conversation.item.create",
-                                "item": {
-                                    "type": "message", "role": "user",
-                                    "content": [{"type": "input_text", "text": "[CALL_STARTED]"}]
-                                }
-                            })
-                            await safe_openai_send(openai_ws, {"type": "response.create"})
+                        await send_greeting()
 
                     elif event_type == "response.output_item.added":
-                        if session:
-                            session["last_assistant_item_id"] = data.get("item", {}).get("id")
-                            session["audio_start_time"]       = None
-                            session["elapsed_ms"]             = 0
-                            session["audio_queue"].clear()
+                        item = data.get("item", {})
+                        if item.get("type") == "function_call":
+                            fn_names[item.get("call_id")] = item.get("name")
+                        elif session:
+                            session["last_assistant_item_id"] = item.get("id")
 
                     elif event_type == "response.audio.delta":
                         disarm_watchdog()
-                        if stream_sid and "delta" in data:
+                        if media_frames and "delta" in data:
+                            await websocket.send_text(media_frames.media(data["delta"]))
                             if session:
                                 session["is_speaking"] = True
-                                session["audio_queue"].append(data["delta"])
-                                if session["audio_start_time"] is None:
-                                    session["audio_start_time"] = time.time()
-                            await websocket.send_json({
-                                "event":     "media",
-                                "streamSid": stream_sid,
-                                "media":     {"payload": data["delta"]}
-                            })
+                                mark = session["playback"].on_sent(
+                                    data.get("item_id") or session["last_assistant_item_id"],
+                                    audio_ms(data["delta"])
+                                )
+                                if mark:
+                                    await websocket.send_text(media_frames.mark(mark))
+                            if session and session["speech_stopped_at"] is not None:
+                                TURN_LATENCY.observe(time.monotonic() - session["speech_stopped_at"])
+                                session["speech_stopped_at"] = None
 
                     elif event_type == "response.audio.done":
                         if session:
-                            session["is_speaking"]      = False
-                            session["audio_queue"]      = []
-                            session["audio_start_time"] = None
-                            session["elapsed_ms"]       = 0
-                        print("[BOT] Done speaking")
+                            session["is_speaking"] = False
+                            mark = session["playback"].mark_now()
+                            if mark and media_frames:
+                                await websocket.send_text(media_frames.mark(mark))
+                        log.debug("[BOT] Done speaking")
                         try:
                             await safe_openai_send(openai_ws, {"type": "input_audio_buffer.clear"})
                         except Exception:
@@ -1152,132 +831,135 @@ async def handle_media_stream(websocket: WebSocket):
                     elif event_type == "response.done":
                         if session:
                             session["current_response_id"] = None  # ✅ FIX C: clear after done
+                        response = data.get("response", {})
+                        calls = response_calls.pop(response.get("id"), None) or response_calls.pop(None, None)
+                        cancelled = response.get("status") == "cancelled"
+                        if calls:
+                            # cancelled (barge-in): outputs still posted; see finish_response_calls
+                            if not cancelled:
+                                turn["owed_response"] = False   # its response.create sees every output
+                            spawn(finish_response_calls(calls, not cancelled))
+                        elif turn["owed_response"] and not cancelled:
+                            # this response ran without the late tool outputs — answer them now
+                            turn["owed_response"] = False
+                            await safe_openai_send(openai_ws, {"type": "response.create"})
 
                     # ✅ FIX C — BARGE-IN: trigger on ANY active response, not just is_speaking
                     elif event_type == "input_audio_buffer.speech_started":
+                        turn["user_speaking"] = True
+                        turn["owed_response"] = False   # the coming VAD response sees every output
+                        await inbound.flush()
                         if session:
+                            playback = session["playback"]
                             # Interrupt if bot is currently speaking OR has an active response
                             should_interrupt = (
-                                session.get("is_speaking")
+                                playback.playing
+                                or session.get("is_speaking")
                                 or session.get("current_response_id") is not None
                                 or session.get("last_assistant_item_id") is not None
                             )
                             if should_interrupt:
-                                print("[BARGE-IN] User interrupted — stopping bot immediately")
-                                # Calculate elapsed audio sent so far
-                                if session["audio_start_time"] is not None:
-                                    session["elapsed_ms"] = int(
-                                        (time.time() - session["audio_start_time"]) * 1000
-                                    )
-                                else:
-                                    session["elapsed_ms"] = 0
+                                log.info("[BARGE-IN] User interrupted — stopping bot immediately")
+                                # Stop Twilio playing what it has buffered; truncate at
+                                # what the caller actually heard (from mark echoes)
+                                played_item = playback.item_id
+                                played_ms   = playback.played_ms()
+                                if playback.playing and media_frames:
+                                    await websocket.send_text(media_frames.clear())
+                                dropped_ms = playback.reset()
+                                log.info("[BARGE-IN] Heard %d ms, dropped %d ms", played_ms, dropped_ms)
                                 # Cancel the current response
                                 try:
                                     await safe_openai_send(openai_ws, {"type": "response.cancel"})
                                 except Exception:
                                     pass
                                 # Truncate audio already streamed to Twilio
-                                if session["last_assistant_item_id"]:
+                                if played_item:
                                     try:
                                         await safe_openai_send(openai_ws, {
                                             "type":          "conversation.item.truncate",
-                                            "item_id":       session["last_assistant_item_id"],
+                                            "item_id":       played_item,
                                             "content_index": 0,
-                                            "audio_end_ms":  session["elapsed_ms"]
+                                            "audio_end_ms":  played_ms
                                         })
                                     except Exception:
                                         pass
                                 # Reset state
-                                session["audio_queue"].clear()
                                 session["last_assistant_item_id"] = None
                                 session["current_response_id"]    = None
-                                session["audio_start_time"]       = None
-                                session["elapsed_ms"]             = 0
                                 session["is_speaking"]            = False
                             else:
-                                print("[USER] Speaking — bot already silent, no interrupt needed")
+                                log.debug("[USER] Speaking — bot already silent, no interrupt needed")
 
                     elif event_type == "input_audio_buffer.speech_stopped":
+                        turn["user_speaking"] = False
                         if session:
                             session["interruption_pending"] = False
+                            session["speech_stopped_at"]    = time.monotonic()
 
                     elif event_type == "input_audio_buffer.cleared":
                         pass
 
-                    elif event_type == "response.function_call_arguments.start":
-                        pending_fn      = data.get("name")
-                        pending_call_id = data.get("call_id")
-                        pending_args    = ""
-
-                    elif event_type == "response.function_call_arguments.delta":
-                        pending_args += data.get("delta", "")
-
                     elif event_type == "response.function_call_arguments.done":
-                        fn  = data.get("name")      or pending_fn
-                        cid = data.get("call_id")   or pending_call_id
-                        raw = data.get("arguments") or pending_args
+                        cid = data.get("call_id")
+                        fn  = data.get("name") or fn_names.pop(cid, None)
                         try:
-                            args = json.loads(raw or "{}")
-                        except json.JSONDecodeError:
+                            args = json_codec.loads(data.get("arguments") or "{}")
+                        except ValueError:
                             args = {}
                         if fn:
-                            await handle_function_call(fn, args, cid, session, openai_ws, disarm_watchdog)
-                        pending_fn = pending_call_id = None
-                        pending_args = ""
+                            # Start now (read-only calls side by side, the rest in
+                            # order); outputs are posted together at response.done.
+                            start_call(data.get("response_id"), cid, fn, args)
 
                     elif event_type == "conversation.item.input_audio_transcription.completed":
                         transcript = data.get("transcript", "")
                         if transcript and session:
-                            print(f"[USER] {transcript}")
+                            log.info("[USER] %s", transcript)
                             update_history(session, "user", transcript)
 
                     elif event_type == "response.audio_transcript.done":
                         transcript = data.get("transcript", "")
                         if transcript and session:
-                            print(f"[BOT]  {transcript}")
+                            log.info("[BOT]  %s", transcript)
                             update_history(session, "assistant", transcript)
 
                     elif event_type == "error":
                         err = data.get("error", {})
-                        print(f"[OpenAI ERROR] {err.get('type')}: {err.get('message')}", flush=True)
+                        log.error("[OpenAI ERROR] %s: %s", err.get("type"), err.get("message"))
 
                 except Exception as inner_e:
-                    print(f"[LOOP ERROR] Failed handling '{event_type}': {inner_e}")
-                    traceback.print_exc()
+                    log.exception("[LOOP ERROR] Failed handling '%s': %s", event_type, inner_e)
                     continue
 
         except websockets.exceptions.ConnectionClosed as e:
-            print(f"[OpenAI] Connection closed — Code: {e.code} Reason: {e.reason}", flush=True)
+            log.info("[OpenAI] Connection closed — Code: %s Reason: %s", e.code, e.reason)
         except Exception as e:
-            print(f"[OpenAI RECEIVE ERROR] {type(e).__name__}: {e}", flush=True)
-            traceback.print_exc()
+            log.exception("[OpenAI RECEIVE ERROR] %s: %s", type(e).__name__, e)
         finally:
             disarm_watchdog()
+            for task in tool_tasks:
+                task.cancel()
 
     async def receive_from_twilio():
-        nonlocal call_sid, stream_sid, session
         try:
             async for message in websocket.iter_text():
-                data       = json.loads(message)
+                data       = json_codec.loads(message)
                 event_type = data.get("event", "")
+                log_event  = sampler.should_log(event_type)
 
-                if event_type == "start":
-                    stream_sid = data["start"]["streamSid"]
-                    call_sid   = data["start"].get("callSid", stream_sid)
-                    session    = make_new_session(call_sid)
-                    session["stream_sid"] = stream_sid
-                    print(f"[Twilio] Connected | Stream: {stream_sid}")
-
-                elif event_type == "media":
+                if event_type == "media":
                     if openai_ws and data.get("media", {}).get("payload"):
-                        await safe_openai_send(openai_ws, {
-                            "type":  "input_audio_buffer.append",
-                            "audio": data["media"]["payload"]
-                        })
+                        for frame in gate.process(data["media"]["payload"]):
+                            await inbound.add(frame)
+
+                elif event_type == "mark":
+                    session["playback"].on_mark(data.get("mark", {}).get("name", ""))
 
                 elif event_type == "stop":
-                    print("[Twilio] Call ended")
+                    log.info("[Twilio] Call ended")
                     call_active["running"] = False
+                    await inbound.flush()
                     if openai_ws:
                         try:
                             await openai_ws.close()
@@ -1286,10 +968,11 @@ async def handle_media_stream(websocket: WebSocket):
                     break
 
                 else:
-                    print(f"[Twilio] Unknown event ignored: {event_type}")
+                    if log_event:
+                        log.debug("[Twilio] Unknown event ignored: %s", event_type)
 
         except WebSocketDisconnect:
-            print("[Twilio] Caller disconnected")
+            log.info("[Twilio] Caller disconnected")
             call_active["running"] = False
             if openai_ws:
                 try:
@@ -1297,8 +980,7 @@ async def handle_media_stream(websocket: WebSocket):
                 except Exception:
                     pass
         except Exception as e:
-            print(f"[Twilio RECEIVE ERROR] {e}")
-            traceback.print_exc()
+            log.exception("[Twilio RECEIVE ERROR] %s", e)
 
     async def keep_alive():
         try:
@@ -1309,28 +991,42 @@ async def handle_media_stream(websocket: WebSocket):
                 if not openai_ws:
                     continue
                 try:
-                    await safe_openai_send(openai_ws, {
-                        "type": "session.update",
-                        "session": {
-                            "turn_detection": {
-                                "type":                "server_vad",
-                                "threshold":           VAD_THRESHOLD,
-                                "prefix_padding_ms":   PREFIX_PADDING_MS,
-                                "silence_duration_ms": SILENCE_DURATION_MS
-                            }
-                        }
-                    })
-                    print("[KEEPALIVE] Ping sent")
+                    await safe_openai_send(openai_ws, _KEEPALIVE_PAYLOAD)
+                    log.debug("[KEEPALIVE] Ping sent")
                 except websockets.exceptions.ConnectionClosed:
-                    print("[KEEPALIVE] OpenAI WS closed — stopping")
+                    log.info("[KEEPALIVE] OpenAI WS closed — stopping")
                     break
                 except Exception as e:
-                    print("[KEEPALIVE ERROR]", e)
+                    log.warning("[KEEPALIVE ERROR] %s", e)
                     break
         except asyncio.CancelledError:
-            print("[KEEPALIVE] cancelled")
+            log.debug("[KEEPALIVE] cancelled")
 
+    # Everything from here on is inside the try: a caller hanging up during the
+    # greeting, or a failed send, still releases ACTIVE_CALLS and the sockets
     try:
+        # ── Cached greeting: plays while the OpenAI socket is still being adopted ──
+        greeting = cached_audio.get_clip("greeting")
+        if greeting:
+            session["greeting_sent"] = True
+            await play_cached(greeting)
+
+        try:
+            claimed = await prewarm.claim(call_sid)
+            if claimed:
+                openai_ws, openai_ready = claimed
+                log.info("[OpenAI] Adopted pre-warmed WebSocket (session ready=%s)", openai_ready)
+            else:
+                openai_ws, _ = await open_realtime_session()
+                log.info("[OpenAI] WebSocket connected")
+        except Exception as e:
+            log.error("[OpenAI] Connection FAILED: %s", e)
+            return
+
+        if greeting:
+            await safe_openai_send(openai_ws, greeting.transcript_item)
+
+        announce = asyncio.create_task(announce_caller_id())
         tasks = [
             asyncio.create_task(receive_from_twilio()),
             asyncio.create_task(receive_from_openai()),
@@ -1340,17 +1036,27 @@ async def handle_media_stream(websocket: WebSocket):
         for task in pending:
             task.cancel()
     except Exception as e:
-        print(f"[HANDLER ERROR] {e}")
-        traceback.print_exc()
+        log.exception("[HANDLER ERROR] %s", e)
     finally:
         call_active["running"] = False
-        print("[CALL END] Cleaning up...")
+        ACTIVE_CALLS.dec()
+        log.info("[CALL END] Cleaning up... events: %s", sampler.summary())
+        inbound.close()
+        session["cache"].close()
+        for task in (announce, session["caller_lookup"]):
+            if task is not None:
+                task.cancel()
+        log.info("[CALL END] Inbound audio gate: %s | coalescer: %s", gate.summary(), inbound.summary())
         if openai_ws:
             try:
                 await openai_ws.close()
             except Exception:
                 pass
-        print("[CALL END] Done\n")
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+        log.info("[CALL END] Done")
 
 
 # ---------------------------------------------------------------------------
@@ -1359,7 +1065,27 @@ async def handle_media_stream(websocket: WebSocket):
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok", "db_pool": get_pool_stats(), "async_db_pool": get_async_pool_stats()}
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.on_event("startup")
+async def startup():
+    cached_audio.load_clips()
+    await slot_index.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await prewarm.close_all()
+    caller_id.close_all()
+    await slot_index.close()
+    shutdown_tool_executor()
+    await close_async_pool()
 
 
 if __name__ == "__main__":
@@ -17,6 +17,7 @@ Sections:
 """
 
 import os
+import re
 from flask import (
     Flask, render_template_string, request,
     redirect, url_for, session, flash, jsonify
@@ -27,7 +28,7 @@ from functools import wraps
 
 from db.db_connection import db_cursor
 from utils.text_utils import title_case
-from utils.phone_utils import normalize_phone, format_phone_for_speech
+from utils.phone_utils import normalize_phone, format_phone_for_speech, to_e164
 
 load_dotenv()
 
@@ -327,7 +328,7 @@ def index():
 def dashboard():
     conn   = db_cursor()
     cursor = conn.cursor()
-    today  = date.today().strftime("%Y-%m-%d")
+    today  = date.today()
 
     # Stats
     cursor.execute("SELECT COUNT(*) FROM patients")
@@ -404,7 +405,7 @@ def dashboard():
                 <td>{title_case(r[0])} {title_case(r[1])}</td>
                 <td>{format_phone_for_speech(r[2])}</td>
                 <td>{r[3]}</td>
-                <td>{r[4]}</td>
+                <td>{str(r[4])[:5]}</td>
                 <td>{r[5]}</td>
                 <td><span class="badge {status_class}">{r[6]}</span></td>
             </tr>"""
@@ -585,7 +586,7 @@ def appointments():
             <td>{format_phone_for_speech(r[3])}</td>
             <td>{r[4]}</td>
             <td>{r[5]}</td>
-            <td>{r[6]}</td>
+            <td>{str(r[6])[:5]}</td>
             <td>{r[7]}</td>
             <td><span class="badge {s_class}">{r[8]}</span></td>
             <td>{str(r[9])[:10]}</td>
@@ -689,7 +690,19 @@ def patients():
     conn   = db_cursor()
     cursor = conn.cursor()
 
-    if search:
+    if search and re.fullmatch(r"[\d\s()+-]+", search):
+        # phone: prefix match on the normalized column (idx_patients_contact_e164)
+        cursor.execute("""
+            SELECT
+                patient_id, first_name, last_name,
+                date_of_birth, contact_number,
+                insurance_info, created_at
+            FROM patients
+            WHERE contact_e164 LIKE %s
+            ORDER BY created_at DESC
+            LIMIT 100
+        """, (to_e164(search) + "%",))
+    elif search:
         cursor.execute("""
             SELECT
                 patient_id, first_name, last_name,
@@ -698,10 +711,9 @@ def patients():
             FROM patients
             WHERE LOWER(first_name) LIKE LOWER(%s)
                OR LOWER(last_name)  LIKE LOWER(%s)
-               OR contact_number    LIKE %s
             ORDER BY created_at DESC
             LIMIT 100
-        """, (f"%{search}%", f"%{search}%", f"%{search}%"))
+        """, (f"%{search}%", f"%{search}%"))
     else:
         cursor.execute("""
             SELECT
@@ -785,7 +797,7 @@ def patient_detail(patient_id):
                preferred_dentist, status, created_at
         FROM appointments
         WHERE patient_id = %s
-        ORDER BY preferred_date DESC
+        ORDER BY preferred_date DESC, preferred_time DESC
     """, (patient_id,))
     appts = cursor.fetchall()
 
@@ -816,7 +828,7 @@ def patient_detail(patient_id):
                    "completed": "badge-gray"}.get(a[4], "badge-blue")
         appt_rows += f"""
         <tr>
-            <td>{a[0]}</td><td>{a[1]}</td><td>{a[2]}</td>
+            <td>{a[0]}</td><td>{a[1]}</td><td>{str(a[2])[:5]}</td>
             <td>{a[3]}</td>
             <td><span class="badge {s_class}">{a[4]}</span></td>
             <td>{str(a[5])[:10]}</td>
@@ -0,0 +1,239 @@
+"""
+realtime/cached_audio.py — DentalBot v2
+
+Pre-rendered g711 μ-law clips for lines that never change.
+
+The greeting used to be generated live ([CALL_STARTED] + response.create) on
+every call — model time and realtime tokens for the same sentence each time.
+Now it is rendered once, stored on disk and streamed straight to Twilio:
+
+- Clips are raw 8 kHz mono μ-law (<name>.ulaw in CACHED_AUDIO_DIR) — exactly
+  what Twilio Media Streams carries, so playback is slice → base64 → send
+- load_clips() mmaps every file once at startup (read-only, shared page cache)
+- play_clip() sends 160-byte / 20 ms frames followed by a Twilio mark
+  (the caller's playback-ledger mark, else "clip:<name>"); Twilio buffers
+  and plays them in order, "clear" stops them
+- Each clip carries a pre-serialized assistant conversation.item.create so
+  the model's context shows it already said the line
+- Missing files are skipped with a warning; callers fall back to live audio
+
+Hold prompts ("One moment while I check that for you.") play while slow tools
+run. They are NOT inserted into the conversation: an item between a
+function_call and its output would split the tool turn.
+
+Render / refresh the files with the Realtime API itself (same voice):
+    python -m realtime.cached_audio render [--voice coral] [name ...]
+"""
+
+import os
+import sys
+import mmap
+import base64
+import random
+import asyncio
+
+from utils import json_codec
+from utils.logger import get_logger
+from utils.metrics import REGISTRY
+
+log = get_logger("cached_audio")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────────────────────────────────────
+
+CACHED_AUDIO_DIR = os.getenv(
+    "CACHED_AUDIO_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "audio")
+)
+
+FRAME_BYTES = 160       # 20 ms of 8 kHz μ-law
+BYTES_PER_MS = 8
+
+GREETING_TEXT = (
+    "Hello! Thank you for calling Green Diodes Dental Clinic. "
+    "I'm Sarah, how may I assist you today?"
+)
+
+# name -> exact spoken text (the render prompt and the transcript item)
+CLIP_TEXT = {
+    "greeting":    GREETING_TEXT,
+    "hold_check":  "One moment while I check that for you.",
+    "hold_lookup": "Let me just look that up for you.",
+}
+
+HOLD_CLIPS = ("hold_check", "hold_lookup")
+
+CLIP_PLAYS = REGISTRY.counter(
+    "dentalbot_cached_audio_plays_total",
+    "Cached audio clips streamed to Twilio.",
+    labelnames=("clip",)
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLIPS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class Clip:
+    __slots__ = ("name", "text", "audio", "transcript_item", "_mm")
+
+    def __init__(self, name: str, text: str, mm: mmap.mmap):
+        self.name  = name
+        self.text  = text
+        self._mm   = mm
+        self.audio = memoryview(mm)
+        self.transcript_item = json_codec.dumps({
+            "type": "conversation.item.create",
+            "item": {
+                "type":    "message",
+                "role":    "assistant",
+                "content": [{"type": "text", "text": text}]
+            }
+        })
+
+    @property
+    def duration_ms(self) -> int:
+        return len(self.audio) // BYTES_PER_MS
+
+    def frames_b64(self):
+        audio = self.audio
+        for offset in range(0, len(audio), FRAME_BYTES):
+            yield base64.b64encode(audio[offset:offset + FRAME_BYTES]).decode("ascii")
+
+    def close(self):
+        self.audio.release()
+        self._mm.close()
+
+
+_clips = {}
+
+
+def load_clips(directory: str = None) -> dict:
+    """mmap every clip in CLIP_TEXT that exists on disk. Safe to call again."""
+    directory = directory or CACHED_AUDIO_DIR
+    close_clips()
+    for name, text in CLIP_TEXT.items():
+        path = os.path.join(directory, f"{name}.ulaw")
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:      # ValueError: empty file
+            log.warning("[AUDIO] Clip '%s' unavailable (%s) — live audio fallback", name, e)
+            continue
+        _clips[name] = Clip(name, text, mm)
+    log.info("[AUDIO] Loaded %d cached clip(s): %s", len(_clips), ", ".join(sorted(_clips)) or "-")
+    return _clips
+
+
+def close_clips():
+    for clip in _clips.values():
+        clip.close()
+    _clips.clear()
+
+
+def get_clip(name: str):
+    return _clips.get(name)
+
+
+def hold_clip():
+    """A random available hold prompt, or None."""
+    available = [_clips[n] for n in HOLD_CLIPS if n in _clips]
+    return random.choice(available) if available else None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PLAYBACK
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def play_clip(websocket, media_frames, clip: Clip, mark: str = None) -> int:
+    """
+    Stream `clip` to Twilio as 20 ms media frames, then a mark (`mark`, or
+    "clip:<name>"). Returns the clip duration in ms.
+    """
+    for payload in clip.frames_b64():
+        await websocket.send_text(media_frames.media(payload))
+    await websocket.send_text(media_frames.mark(mark or f"clip:{clip.name}"))
+    CLIP_PLAYS.inc(clip=clip.name)
+    return clip.duration_ms
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RENDER  (offline — python -m realtime.cached_audio render)
+# ─────────────────────────────────────────────────────────────────────────────
+
+RENDER_URL = os.getenv(
+    "CACHED_AUDIO_RENDER_URL",
+    "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview"
+)
+
+
+async def render_clip(name: str, voice: str, directory: str) -> str:
+    import websockets
+
+    text = CLIP_TEXT[name]
+    async with websockets.connect(
+        RENDER_URL,
+        additional_headers={
+            "Authorization": f"Bearer {os.environ['OPENAI_API_KEY']}",
+            "OpenAI-Beta":   "realtime=v1"
+        }
+    ) as ws:
+        await ws.send(json_codec.dumps({
+            "type": "session.update",
+            "session": {
+                "modalities":          ["text", "audio"],
+                "voice":               voice,
+                "output_audio_format": "g711_ulaw",
+                "turn_detection":      None,
+                "instructions": (
+                    "You are a friendly dental receptionist. Read the user's text "
+                    "aloud word for word, warmly and naturally. Say nothing else."
+                )
+            }
+        }))
+        await ws.send(json_codec.dumps({
+            "type": "conversation.item.create",
+            "item": {"type": "message", "role": "user",
+                     "content": [{"type": "input_text", "text": text}]}
+        }))
+        await ws.send(json_codec.dumps({"type": "response.create"}))
+
+        audio = bytearray()
+        async for raw in ws:
+            event = json_codec.loads(raw)
+            if event.get("type") == "response.audio.delta":
+                audio += base64.b64decode(event["delta"])
+            elif event.get("type") == "response.done":
+                break
+            elif event.get("type") == "error":
+                raise RuntimeError(event.get("error", {}).get("message", "render failed"))
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.ulaw")
+    tmp  = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(audio)
+    os.replace(tmp, path)
+    return path
+
+
+async def _render_main(argv):
+    voice = "coral"
+    if "--voice" in argv:
+        i = argv.index("--voice")
+        voice = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+    names = argv or list(CLIP_TEXT)
+    for name in names:
+        path = await render_clip(name, voice, CACHED_AUDIO_DIR)
+        print(f"{name:12s} -> {path} ({os.path.getsize(path) // BYTES_PER_MS} ms)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["render"]:
+        sys.exit("usage: python -m realtime.cached_audio render [--voice coral] [name ...]")
+    from dotenv import load_dotenv
+    load_dotenv()
+    asyncio.run(_render_main(sys.argv[2:]))
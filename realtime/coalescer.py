@@ -0,0 +1,122 @@
+"""
+realtime/coalescer.py — DentalBot v2
+
+Joins inbound Twilio audio into fewer input_audio_buffer.append messages.
+
+Twilio sends a 20 ms / 160-byte μ-law frame 50 times a second; forwarding
+each one costs a JSON message + WebSocket send per frame. InboundCoalescer
+buffers the raw bytes for up to INBOUND_COALESCE_MS and sends them as one
+append:
+
+- Joined at the byte level (bytearray) and base64-encoded once per flush —
+  a 160-byte frame encodes with "==" padding, so base64 strings can't simply
+  be concatenated
+- Flushes when the window is full, when the window timer fires (latency is
+  bounded even if frames stop arriving, e.g. the VAD gate closes), and
+  early on Twilio "stop" / server speech_started. The timer's flush task is
+  held on the instance (asyncio keeps only weak references), its errors are
+  logged, and close() cancels it
+- INBOUND_COALESCE_MS=0 sends every frame immediately (old behaviour)
+
+Per-call frames in vs messages out are logged at call end; the
+dentalbot_inbound_* counters give the fleet-wide messages/s saved.
+"""
+
+import os
+import time
+import base64
+import asyncio
+
+from utils.json_codec import input_audio_append
+from utils.logger import get_logger
+from utils.metrics import REGISTRY
+
+log = get_logger("coalescer")
+
+
+INBOUND_COALESCE_MS = int(os.getenv("INBOUND_COALESCE_MS", "80"))
+
+BYTES_PER_MS = 8        # 8 kHz μ-law
+
+INBOUND_FRAMES = REGISTRY.counter(
+    "dentalbot_inbound_audio_frames_total",
+    "Inbound audio frames accepted for OpenAI (after the VAD gate)."
+)
+INBOUND_MESSAGES = REGISTRY.counter(
+    "dentalbot_inbound_append_messages_total",
+    "input_audio_buffer.append messages sent to OpenAI.",
+    labelnames=("reason",)      # full | timer | flush
+)
+
+
+class InboundCoalescer:
+    """
+    send_fn: async callable taking the ready-to-send append JSON string.
+    """
+
+    __slots__ = (
+        "send_fn", "window_bytes", "window_s", "_buf", "_timer", "_timer_flushes",
+        "_lock", "frames_in", "messages_out", "started"
+    )
+
+    def __init__(self, send_fn, window_ms: int = INBOUND_COALESCE_MS):
+        self.send_fn         = send_fn
+        self.window_bytes    = window_ms * BYTES_PER_MS
+        self.window_s        = window_ms / 1000
+        self._buf            = bytearray()
+        self._timer          = None
+        self._timer_flushes  = set()    # strong refs — asyncio only keeps weak ones
+        self._lock           = asyncio.Lock()
+        self.frames_in       = 0
+        self.messages_out    = 0
+        self.started         = time.monotonic()
+
+    async def add(self, ulaw: bytes):
+        self.frames_in += 1
+        INBOUND_FRAMES.inc()
+        self._buf += ulaw
+        if len(self._buf) >= self.window_bytes:
+            await self.flush("full")
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_s, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        if self._buf:
+            task = asyncio.ensure_future(self.flush("timer"))
+            self._timer_flushes.add(task)
+            task.add_done_callback(self._timer_flush_done)
+
+    def _timer_flush_done(self, task):
+        self._timer_flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("[COALESCER] Timer flush failed: %s: %s",
+                        type(task.exception()).__name__, task.exception())
+
+    async def flush(self, reason: str = "flush"):
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buf:
+                return
+            payload = base64.b64encode(self._buf).decode("ascii")
+            self._buf = bytearray()
+            self.messages_out += 1
+            INBOUND_MESSAGES.inc(reason=reason)
+            await self.send_fn(input_audio_append(payload))
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in list(self._timer_flushes):
+            task.cancel()
+        self._timer_flushes.clear()
+        self._buf = bytearray()
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        saved   = self.frames_in - self.messages_out
+        return (f"{self.frames_in} frames → {self.messages_out} appends, "
+                f"{saved / elapsed:.1f} msgs/s saved")
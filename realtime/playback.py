@@ -0,0 +1,141 @@
+"""
+realtime/playback.py — DentalBot v2
+
+Tracks how much outbound audio Twilio has actually played, using Twilio
+"mark" events.
+
+OpenAI streams response audio faster than real time, so "wall-clock since the
+first delta" over-counts what the caller heard, and the
+conversation.item.truncate offset sent on barge-in was wrong. Instead:
+
+- Every MARK_EVERY_MS of audio sent to Twilio is followed by a mark "p<seq>";
+  Twilio echoes each mark back once playback reaches it
+- The ledger keeps (seq, item_id, end_ms) for unacknowledged marks in a
+  fixed-size deque — no per-delta audio is retained
+- played_ms() = last acknowledged offset + time since that ack, capped at the
+  next unacknowledged mark, so it is accurate to well under MARK_EVERY_MS
+- reset() on barge-in drops the ledger; marks Twilio returns after "clear"
+  no longer match and are ignored
+
+Cached clips (realtime.cached_audio) go through the same ledger with
+item_id=None, so "is anything still playing?" has one answer.
+"""
+
+import os
+import time
+from collections import deque
+
+from utils.metrics import REGISTRY
+
+
+MARK_EVERY_MS = int(os.getenv("PLAYBACK_MARK_EVERY_MS", "200"))
+LEDGER_SIZE   = int(os.getenv("PLAYBACK_LEDGER_SIZE", "512"))   # × MARK_EVERY_MS of buffered audio
+
+BYTES_PER_MS = 8        # 8 kHz μ-law
+
+BARGE_IN_DROPPED = REGISTRY.histogram(
+    "dentalbot_barge_in_dropped_audio_seconds",
+    "Audio already sent to Twilio but not yet played when the caller barged in.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+)
+
+
+def audio_ms(audio_b64: str) -> float:
+    """Duration of a base64 μ-law chunk without decoding it."""
+    n = len(audio_b64)
+    padding = 2 if audio_b64.endswith("==") else 1 if audio_b64.endswith("=") else 0
+    return ((n * 3) // 4 - padding) / BYTES_PER_MS
+
+
+class PlaybackLedger:
+    __slots__ = (
+        "mark_every_ms", "_pending", "_seq",
+        "_item_id", "_sent_ms", "_marked_ms", "_acked_ms", "_clock"
+    )
+
+    def __init__(self, size: int = LEDGER_SIZE, mark_every_ms: int = MARK_EVERY_MS):
+        self.mark_every_ms = mark_every_ms
+        self._pending      = deque(maxlen=size)   # (name, item_id, end_ms) not yet played
+        self._seq          = 0
+        self._start_item(None)
+
+    def _start_item(self, item_id):
+        self._item_id   = item_id
+        self._sent_ms   = 0.0
+        self._marked_ms = 0.0
+        self._acked_ms  = 0.0
+        # Playback position of the current item is known "as of" _clock. If
+        # nothing is queued ahead of it, it starts playing right away.
+        self._clock     = None if self._pending else time.monotonic()
+
+    # ── outbound ────────────────────────────────────────────────────────────
+
+    def _mark(self) -> str:
+        self._seq += 1
+        name = f"p{self._seq}"
+        self._pending.append((name, self._item_id, self._sent_ms))
+        self._marked_ms = self._sent_ms
+        return name
+
+    def on_sent(self, item_id, ms: float):
+        """Record `ms` of audio sent for item_id. Returns a mark name to send, or None."""
+        if item_id != self._item_id:
+            self._start_item(item_id)
+        self._sent_ms += ms
+        if self._sent_ms - self._marked_ms >= self.mark_every_ms:
+            return self._mark()
+        return None
+
+    def mark_now(self):
+        """Mark for any audio sent since the last mark (end of response / clip)."""
+        if self._sent_ms > self._marked_ms:
+            return self._mark()
+        return None
+
+    # ── inbound (Twilio "mark" echo) ────────────────────────────────────────
+
+    def on_mark(self, name: str):
+        pending = self._pending
+        if not any(entry[0] == name for entry in pending):
+            return      # from before reset(), or not ours
+        now = time.monotonic()
+        while pending:
+            entry_name, item_id, end_ms = pending.popleft()
+            if item_id == self._item_id:
+                self._acked_ms = end_ms
+                self._clock    = now
+            elif not pending or pending[0][1] == self._item_id:
+                self._clock    = now      # previous item finished → current starts now
+            if entry_name == name:
+                break
+
+    # ── queries ─────────────────────────────────────────────────────────────
+
+    @property
+    def playing(self) -> bool:
+        return bool(self._pending) or self._sent_ms > self._marked_ms
+
+    def played_ms(self) -> int:
+        """Best estimate of how much of the current item the caller has heard."""
+        if self._clock is None:
+            return int(self._acked_ms)
+        estimate = self._acked_ms + (time.monotonic() - self._clock) * 1000
+        cap = self._sent_ms
+        for _, item_id, end_ms in self._pending:
+            if item_id == self._item_id:
+                cap = end_ms
+                break
+        return int(min(estimate, cap))
+
+    @property
+    def item_id(self):
+        return self._item_id
+
+    def reset(self) -> int:
+        """Forget everything queued (after Twilio "clear"). Returns ms dropped."""
+        dropped = max(0, int(self._sent_ms - self.played_ms())) if self._item_id else 0
+        if self._pending or dropped:
+            BARGE_IN_DROPPED.observe(dropped / 1000)
+        self._pending.clear()
+        self._start_item(None)
+        return dropped
@@ -0,0 +1,111 @@
+"""
+realtime/prewarm.py — DentalBot v2
+
+Speculative OpenAI Realtime connections, keyed by Twilio CallSid.
+
+The /voice webhook fires ~1 s before Twilio opens /media-stream. Starting the
+TLS handshake + session.update there means the media-stream handler adopts a
+socket whose session is already configured, and the greeting can start as
+soon as Twilio's "start" event arrives.
+
+    start_prewarm(call_sid, open_fn)   # from /voice — never blocks the webhook
+    claimed = await claim(call_sid)    # from /media-stream — (ws, ready) or None
+
+- open_fn() -> (ws, ready) opens and configures the socket; it owns closing
+  the socket if it is cancelled half-way
+- Sockets nobody claims within PREWARM_TTL_S are closed
+- At most PREWARM_MAX in flight, so a webhook flood can't open unbounded sockets
+- Per-process: only helps when /voice and /media-stream hit the same instance
+"""
+
+import os
+import asyncio
+
+from utils.logger import get_logger
+from utils.metrics import REGISTRY
+
+log = get_logger("prewarm")
+
+PREWARM_TTL_S           = float(os.getenv("PREWARM_TTL_S", "20"))
+PREWARM_CLAIM_TIMEOUT_S = float(os.getenv("PREWARM_CLAIM_TIMEOUT_S", "5"))
+PREWARM_MAX             = int(os.getenv("PREWARM_MAX", "50"))
+
+PREWARM_TOTAL = REGISTRY.counter(
+    "dentalbot_prewarm_total",
+    "Pre-warmed OpenAI Realtime connections by outcome.",
+    labelnames=("outcome",)     # started | skipped | hit | miss | failed | expired
+)
+
+_pending = {}   # call_sid -> _Prewarm
+
+
+class _Prewarm:
+    __slots__ = ("call_sid", "task", "expiry")
+
+    def __init__(self, call_sid, task):
+        self.call_sid = call_sid
+        self.task     = task
+        self.expiry   = None
+
+
+async def _discard(entry: _Prewarm):
+    if not entry.task.done():
+        entry.task.cancel()
+        return
+    try:
+        ws, _ = entry.task.result()
+        await ws.close()
+    except BaseException:
+        pass
+
+
+async def _expire(call_sid: str):
+    await asyncio.sleep(PREWARM_TTL_S)
+    entry = _pending.pop(call_sid, None)
+    if entry is not None:
+        PREWARM_TOTAL.inc(outcome="expired")
+        log.info("[PREWARM] Unclaimed socket closed | %s", call_sid)
+        await _discard(entry)
+
+
+def start_prewarm(call_sid: str, open_fn):
+    if not call_sid or call_sid in _pending:
+        return
+    if len(_pending) >= PREWARM_MAX:
+        PREWARM_TOTAL.inc(outcome="skipped")
+        return
+
+    entry        = _Prewarm(call_sid, asyncio.create_task(open_fn()))
+    entry.expiry = asyncio.create_task(_expire(call_sid))
+    _pending[call_sid] = entry
+    PREWARM_TOTAL.inc(outcome="started")
+
+
+async def claim(call_sid: str, timeout: float = PREWARM_CLAIM_TIMEOUT_S):
+    """Adopt the pre-warmed socket for call_sid: (ws, ready) or None."""
+    entry = _pending.pop(call_sid, None) if call_sid else None
+    if entry is None:
+        PREWARM_TOTAL.inc(outcome="miss")
+        return None
+
+    entry.expiry.cancel()
+    try:
+        ws, ready = await asyncio.wait_for(asyncio.shield(entry.task), timeout)
+    except BaseException as e:
+        PREWARM_TOTAL.inc(outcome="failed")
+        log.warning("[PREWARM] Pre-warmed socket unusable (%s) — connecting fresh", type(e).__name__)
+        await _discard(entry)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        return None
+
+    PREWARM_TOTAL.inc(outcome="hit")
+    return ws, ready
+
+
+async def close_all():
+    entries = list(_pending.values())
+    _pending.clear()
+    for entry in entries:
+        entry.expiry.cancel()
+        await _discard(entry)
@@ -0,0 +1,129 @@
+"""
+realtime/vad.py — DentalBot v2
+
+Local energy gate in front of input_audio_buffer.append.
+
+Twilio streams 50 frames/s for the whole call, including long stretches of
+line silence while callers look up a date or read a card number. Every one
+of those frames was forwarded to OpenAI (bandwidth + billed input audio).
+
+InboundGate.process(payload_b64) decides per 20 ms frame:
+- Energy: μ-law bytes → linear power via a 256-entry numpy lookup table
+  (utils.audio_codec.ULAW_TO_PCM16 squared), mean over the frame, compared
+  against VAD_GATE_DBFS
+- Hangover: after the last voiced frame keep forwarding for
+  VAD_GATE_HANGOVER_MS. This MUST exceed the server VAD silence_duration_ms,
+  otherwise OpenAI never sees the silence that ends the caller's turn
+- Pre-roll: the last VAD_GATE_PREROLL_MS of dropped frames are kept in a
+  ring buffer and flushed ahead of the first voiced frame, so server VAD
+  still sees the speech onset (prefix_padding_ms)
+
+process() returns the decoded μ-law frames to forward; realtime.coalescer
+joins them into fewer, larger appends.
+Per-call counters (frames / bytes in vs forwarded) are logged at call end and
+aggregated in dentalbot_vad_* metrics.
+"""
+
+import os
+import base64
+from collections import deque
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+from utils.audio_codec import ULAW_TO_PCM16
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────────────────────────────────────
+
+VAD_GATE_ENABLED     = os.getenv("VAD_GATE_ENABLED", "1") == "1"
+VAD_GATE_DBFS        = float(os.getenv("VAD_GATE_DBFS", "-45"))
+VAD_GATE_HANGOVER_MS = int(os.getenv("VAD_GATE_HANGOVER_MS", "1200"))   # > SILENCE_DURATION_MS (700)
+VAD_GATE_PREROLL_MS  = int(os.getenv("VAD_GATE_PREROLL_MS", "300"))     # = PREFIX_PADDING_MS
+
+FRAME_MS = 20           # Twilio media frame: 160 bytes of 8 kHz μ-law
+
+VAD_FRAMES = REGISTRY.counter(
+    "dentalbot_vad_frames_total",
+    "Inbound Twilio audio frames by gate decision.",
+    labelnames=("decision",)    # forwarded | dropped
+)
+VAD_BYTES_SAVED = REGISTRY.counter(
+    "dentalbot_vad_bytes_saved_total",
+    "μ-law audio bytes not sent to OpenAI because the frame was silent."
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# μ-LAW → POWER LOOKUP
+# ─────────────────────────────────────────────────────────────────────────────
+
+ULAW_POWER = ULAW_TO_PCM16.astype(np.float64) ** 2      # per-byte squared amplitude
+
+
+def dbfs_to_power(dbfs: float) -> float:
+    return (32768.0 * 10 ** (dbfs / 20)) ** 2
+
+
+def frame_power(ulaw: bytes) -> float:
+    """Mean squared linear amplitude of a μ-law frame."""
+    return float(ULAW_POWER[np.frombuffer(ulaw, dtype=np.uint8)].mean()) if ulaw else 0.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GATE
+# ─────────────────────────────────────────────────────────────────────────────
+
+class InboundGate:
+    __slots__ = (
+        "enabled", "threshold", "hangover_frames", "_preroll", "_hangover",
+        "frames_in", "frames_out", "bytes_in", "bytes_out"
+    )
+
+    def __init__(self, dbfs: float = VAD_GATE_DBFS,
+                 hangover_ms: int = VAD_GATE_HANGOVER_MS,
+                 preroll_ms: int = VAD_GATE_PREROLL_MS,
+                 enabled: bool = VAD_GATE_ENABLED):
+        self.enabled         = enabled
+        self.threshold       = dbfs_to_power(dbfs)
+        self.hangover_frames = max(1, hangover_ms // FRAME_MS)
+        self._preroll        = deque(maxlen=max(0, preroll_ms // FRAME_MS))
+        self._hangover       = 0
+        self.frames_in = self.frames_out = self.bytes_in = self.bytes_out = 0
+
+    def process(self, payload_b64: str) -> list:
+        """Decoded μ-law frames to forward for this Twilio payload — possibly none."""
+        ulaw = base64.b64decode(payload_b64)
+        self.frames_in += 1
+        self.bytes_in  += len(ulaw)
+
+        if not self.enabled or frame_power(ulaw) >= self.threshold:
+            self._hangover = self.hangover_frames
+            out = [*self._preroll, ulaw]
+            self._preroll.clear()
+        elif self._hangover > 0:
+            self._hangover -= 1
+            out = [ulaw]
+        else:
+            preroll = self._preroll
+            if len(preroll) == preroll.maxlen:
+                # oldest buffered frame (or this one, with no pre-roll) is dropped for good
+                dropped = preroll.popleft() if preroll.maxlen else ulaw
+                VAD_FRAMES.inc(decision="dropped")
+                VAD_BYTES_SAVED.inc(len(dropped))
+            if preroll.maxlen:
+                preroll.append(ulaw)
+            return []
+
+        self.frames_out += len(out)
+        self.bytes_out  += sum(map(len, out))
+        VAD_FRAMES.inc(len(out), decision="forwarded")
+        return out
+
+    def summary(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        pct   = 100.0 * saved / self.bytes_in if self.bytes_in else 0.0
+        return (f"frames {self.frames_out}/{self.frames_in} forwarded, "
+                f"{saved} bytes saved ({pct:.0f}%)")
@@ -0,0 +1,208 @@
+"""
+tests/test_appointment_booking.py — DentalBot v2
+
+book_appointment / update_appointment against a scripted cursor: each
+execute() must be the statement expected next, and gets back the rows (or
+the error) a real database would give in that race.
+
+- Booking a taken slot: the insert returns nothing → SLOT_TAKEN with the
+  nearest free alternatives
+- Rescheduling: the NOT EXISTS guard, the single retry on 23505 and the
+  SLOT_TAKEN answer when the re-run finds the target held
+
+    python -m pytest tests/
+"""
+
+from datetime import date, time
+from contextlib import contextmanager
+
+import pytest
+
+from appointment import executor
+from appointment.executor import (
+    _BOOK_SQL, _ALTERNATIVES_SQL, _APPOINTMENT_SLOT_SQL, _alternatives_params
+)
+
+DAY  = date(2030, 3, 5)
+TEN  = time(10, 0)
+BOOK = (101, "Ann", "Lee", "1990-06-15", "0462361789", "Cleaning",
+        "2030-03-05", "10:00", "Dr. Emily Carter")
+
+
+class SlotConflict(Exception):
+    sqlstate = "23505"
+
+
+class ScriptedDB:
+    """db_cursor() stand-in; script = [(sql, rows | exception)] in order."""
+
+    def __init__(self, script):
+        self.script   = list(script)
+        self.executed = []
+
+    @contextmanager
+    def cursor(self):
+        yield self, None
+
+    def execute(self, sql, params=None):
+        assert self.script, f"unexpected statement: {sql}"
+        expected, result = self.script.pop(0)
+        if expected is not None:
+            assert sql == expected
+        self.executed.append((sql, params))
+        if isinstance(result, Exception):
+            raise result
+        self.rows = result
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.fixture
+def db(monkeypatch):
+    def install(script):
+        scripted = ScriptedDB(script)
+        monkeypatch.setattr(executor, "db_cursor", scripted.cursor)
+        return scripted
+    return install
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BOOKING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_book_free_slot(db):
+    scripted = db([(_BOOK_SQL, [(55,)])])
+
+    result = executor.book_appointment(*BOOK)
+
+    assert result["status"] == "BOOKED"
+    assert result["appointment_id"] == 55
+    # typed DATE / TIME values go to the insert, never the spoken strings
+    assert scripted.executed[0][1][6:9] == (DAY, TEN, "Dr. Emily Carter")
+    assert not scripted.script
+
+
+def test_book_taken_slot_offers_alternatives(db):
+    scripted = db([
+        (_BOOK_SQL, []),                                   # ON CONFLICT DO NOTHING → no row
+        (_ALTERNATIVES_SQL, [("Dr. Emily Carter", time(10, 30)),
+                             ("Dr. James Nguyen", TEN),
+                             ("Dr. Emily Carter", time(9, 30))]),
+    ])
+
+    result = executor.book_appointment(*BOOK)
+
+    assert result["status"] == "SLOT_TAKEN"
+    assert (result["dentist"], result["date"], result["time"]) == ("Dr. Emily Carter", "2030-03-05", "10:00")
+    assert result["alternatives"] == [
+        {"dentist": "Dr. Emily Carter", "date": "2030-03-05", "time": "10:30"},
+        {"dentist": "Dr. James Nguyen", "date": "2030-03-05", "time": "10:00"},
+        {"dentist": "Dr. Emily Carter", "date": "2030-03-05", "time": "09:30"},
+    ]
+    assert "10:30 with Dr. Emily Carter" in result["message"]
+    assert scripted.executed[1][1] == _alternatives_params("Dr. Emily Carter", DAY, TEN)
+
+
+def test_book_taken_slot_with_no_alternatives(db):
+    db([(_BOOK_SQL, []), (_ALTERNATIVES_SQL, [])])
+
+    result = executor.book_appointment(*BOOK)
+
+    assert result["status"] == "SLOT_TAKEN"
+    assert result["alternatives"] == []
+    assert "no other free times" in result["message"]
+
+
+def test_alternatives_cover_the_bookable_grid():
+    params = _alternatives_params("Dr. Emily Carter", DAY, TEN)
+
+    assert params["open"] == time(9, 0)
+    assert params["last"] == time(17, 30)      # last slot that still ends by closing
+    assert params["step"] == 30
+    assert params["limit"] == executor.MAX_ALTERNATIVES
+
+
+def test_unparseable_slot_never_reaches_the_db(db):
+    db([])
+
+    result = executor.book_appointment(*BOOK[:6], "next week", "lunchtime", "Dr. Emily Carter")
+
+    assert result["status"] == "INVALID_DATETIME"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESCHEDULE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_update_guard_compares_unchanged_columns_with_the_row():
+    sql, values = executor._prepare_update(7, {"preferred_time": "10:00"})
+
+    assert "NOT EXISTS" in sql
+    assert "b.preferred_dentist = a.preferred_dentist" in sql
+    assert "b.preferred_date = a.preferred_date" in sql
+    assert "b.preferred_time = %s" in sql
+    assert values == [TEN, 7, TEN]       # SET, WHERE id, guard
+
+
+def test_update_without_slot_change_has_no_guard():
+    sql, values = executor._prepare_update(7, {"preferred_treatment": "Filling"})
+
+    assert "NOT EXISTS" not in sql
+    assert values == ["Filling", 7]
+
+
+def test_update_to_held_slot_is_slot_taken(db):
+    db([
+        (None, []),                                        # guard blocks the UPDATE
+        (_APPOINTMENT_SLOT_SQL, [("Dr. Emily Carter", DAY, time(9, 0))]),
+        (_ALTERNATIVES_SQL, [("Dr. Emily Carter", time(10, 30))]),
+    ])
+
+    result = executor.update_appointment(7, {"preferred_time": "10:00"})
+
+    assert result["status"] == "SLOT_TAKEN"
+    assert (result["dentist"], result["time"]) == ("Dr. Emily Carter", "10:00")
+    assert result["alternatives"] == [
+        {"dentist": "Dr. Emily Carter", "date": "2030-03-05", "time": "10:30"}]
+
+
+def test_update_that_loses_the_race_retries_once(db):
+    scripted = db([
+        (None, SlotConflict("duplicate key")),             # a booking committed mid-statement
+        (None, []),                                        # re-run: the guard now sees it
+        (_APPOINTMENT_SLOT_SQL, [("Dr. Emily Carter", DAY, time(9, 0))]),
+        (_ALTERNATIVES_SQL, []),
+    ])
+
+    result = executor.update_appointment(7, {"preferred_time": "10:00"})
+
+    assert result["status"] == "SLOT_TAKEN"
+    assert scripted.executed[0] == scripted.executed[1]   # same statement, same values
+    assert not scripted.script
+
+
+def test_update_conflict_twice_is_an_error(db):
+    db([(None, SlotConflict("duplicate key")), (None, SlotConflict("duplicate key"))])
+
+    result = executor.update_appointment(7, {"preferred_time": "10:00"})
+
+    assert result["status"] == "ERROR"
+
+
+def test_update_other_errors_are_not_retried(db):
+    db([(None, RuntimeError("connection lost"))])
+
+    assert executor.update_appointment(7, {"preferred_time": "10:00"})["status"] == "ERROR"
+
+
+def test_update_moves_free_slot(db):
+    db([(None, [("Cleaning", DAY, TEN, "Dr. Emily Carter")])])
+
+    result = executor.update_appointment(7, {"preferred_time": "10:00"})
+
+    assert result == {"status": "UPDATED", "treatment": "Cleaning",
+                      "date": "2030-03-05", "time": "10:00", "dentist": "Dr. Emily Carter"}
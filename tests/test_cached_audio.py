@@ -0,0 +1,55 @@
+"""
+tests/test_cached_audio.py — DentalBot v2
+
+load_clips() on a populated directory, then play_clip() through a fake
+Twilio socket: the frames that go out must be the file's bytes, in 20 ms
+(160-byte) slices, followed by the mark.
+
+    python -m pytest tests/
+"""
+
+import base64
+import asyncio
+
+from realtime import cached_audio
+from utils import json_codec
+from utils.json_codec import TwilioMediaFrames
+
+
+class FakeTwilioSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json_codec.loads(text))
+
+
+def test_load_and_play_clip(tmp_path):
+    audio = bytes(range(256)) + bytes(224)                 # 480 bytes = 3 frames, 60 ms
+    (tmp_path / "greeting.ulaw").write_bytes(audio)
+    (tmp_path / "hold_check.ulaw").write_bytes(b"")        # empty → skipped
+
+    try:
+        clips = cached_audio.load_clips(str(tmp_path))
+        assert set(clips) == {"greeting"}
+
+        clip = cached_audio.get_clip("greeting")
+        assert clip.duration_ms == 60
+        assert cached_audio.hold_clip() is None
+
+        ws     = FakeTwilioSocket()
+        played = asyncio.run(cached_audio.play_clip(ws, TwilioMediaFrames("MZ1"), clip))
+        assert played == 60
+
+        media, mark = ws.sent[:-1], ws.sent[-1]
+        assert [m["event"] for m in media] == ["media"] * 3
+        assert all(m["streamSid"] == "MZ1" for m in ws.sent)
+        assert b"".join(base64.b64decode(m["media"]["payload"]) for m in media) == audio
+        assert mark == {"event": "mark", "streamSid": "MZ1", "mark": {"name": "clip:greeting"}}
+    finally:
+        cached_audio.close_clips()
+
+
+def test_missing_directory_loads_nothing(tmp_path):
+    assert cached_audio.load_clips(str(tmp_path / "absent")) == {}
+    assert cached_audio.get_clip("greeting") is None
@@ -0,0 +1,36 @@
+"""
+tests/test_json_codec.py — DentalBot v2
+
+The pre-built frames must match the stdlib encoding byte for byte, and the
+active backend must round-trip to the same objects as stdlib.
+
+    python -m pytest tests/
+"""
+
+import json
+
+from utils import json_codec
+from utils.json_codec import TwilioMediaFrames, input_audio_append, stdlib_dumps
+
+AUDIO = "f/9+/35+fn5+f39/AA=="
+SID   = 'MZ"odd\\sid ✓'     # quotes, backslash and non-ASCII all need escaping
+
+
+def test_frames_match_stdlib_bytes():
+    frames = TwilioMediaFrames(SID)
+
+    assert input_audio_append(AUDIO) == stdlib_dumps(
+        {"type": "input_audio_buffer.append", "audio": AUDIO})
+    assert frames.media(AUDIO) == stdlib_dumps(
+        {"event": "media", "streamSid": SID, "media": {"payload": AUDIO}})
+    assert frames.clear() == stdlib_dumps({"event": "clear", "streamSid": SID})
+    assert frames.mark("resp_1:7 ✓") == stdlib_dumps(
+        {"event": "mark", "streamSid": SID, "mark": {"name": "resp_1:7 ✓"}})
+
+
+def test_dumps_semantically_identical_to_stdlib():
+    payload = {"type": "session.update", "n": 3, "x": 1e20, "f": 0.1,
+               "ok": True, "none": None, "text": "café ✓", "items": [1, "a", {}]}
+
+    assert json.loads(json_codec.dumps(payload)) == payload
+    assert json_codec.loads(stdlib_dumps(payload)) == payload
@@ -0,0 +1,84 @@
+"""
+tests/test_patient_phone.py — DentalBot v2
+
+contact_e164 as written by create_new_patient must be the value the
+caller-ID / contact lookups search for, however the number was spoken.
+The DB is a fake cursor over an in-memory patients list.
+
+    python -m pytest tests/
+"""
+
+import importlib
+from contextlib import contextmanager
+
+import pytest
+
+from verification import verification_executor as ve
+
+SPELLINGS = ["+61 462 361 789", "0462 361 789", "+61462361789"]
+
+
+class FakePatients:
+    def __init__(self):
+        self.rows = []      # (patient_id, first, last, dob, contact_number, insurance, contact_e164)
+
+    @contextmanager
+    def cursor(self):
+        yield FakeCursor(self), None
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db     = db
+        self.result = []
+
+    def execute(self, sql, params):
+        if sql.lstrip().startswith("INSERT INTO patients"):
+            first, last, dob, contact, e164, insurance = params
+            pid = len(self.db.rows) + 1
+            self.db.rows.append((pid, first, last, dob, contact, insurance, e164))
+            self.result = [(pid,)]
+        elif "WHERE contact_e164 = %s" in sql:
+            e164, limit = params
+            self.result = [r[:6] for r in self.db.rows if r[6] == e164][:limit]
+        else:
+            raise AssertionError(f"unexpected SQL: {sql}")
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+@pytest.fixture
+def patients(monkeypatch):
+    db = FakePatients()
+    monkeypatch.setattr(ve, "db_cursor", db.cursor)
+    return db
+
+
+@pytest.mark.parametrize("spoken", SPELLINGS)
+def test_stored_e164_ignores_spelling(spoken):
+    params, _, _ = ve._prepare_new_patient("ann", "lee", "15 Jun 1990", spoken, None)
+    assert params[4] == "+61462361789"
+
+
+@pytest.mark.parametrize("spoken", SPELLINGS)
+def test_created_patient_found_by_every_spelling(patients, spoken):
+    result = ve.create_new_patient("ann", "lee", "15 Jun 1990", spoken)
+    assert result["status"] == "CREATED"
+
+    for caller in SPELLINGS:
+        found = ve.find_patients_by_phone(caller)
+        assert found["status"] == "FOUND", caller
+        assert [c["patient_id"] for c in found["candidates"]] == [result["patient_id"]]
+
+
+def test_backfill_skips_truncated_numbers():
+    migration = importlib.import_module("db.migrations.001_patients_contact_e164")
+
+    assert migration._backfill_e164("0462361789")      == "+61462361789"
+    assert migration._backfill_e164("+61 462 361 789") == "+61462361789"
+    assert migration._backfill_e164("6146236178")      == ""    # cut from +61 462 361 789
+    assert migration._backfill_e164("")                == ""
@@ -0,0 +1,186 @@
+"""
+tests/test_session_cache.py — DentalBot v2
+
+SessionCache races: shared in-flight loads, a write landing while a load is
+pending, and cancellation of either side of a shared load.
+
+    python -m pytest tests/
+"""
+
+import asyncio
+
+from tools.session_cache import SessionCache
+
+KEY  = ("patient_appointments", 101)
+TAGS = ("appointments",)
+
+
+class Loader:
+    """Loader that blocks until release(), counting how often it ran."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls   = 0
+        self.gate    = asyncio.Event()
+
+    def release(self):
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        result = self.results[min(self.calls, len(self.results)) - 1]
+        await self.gate.wait()
+        return result
+
+
+def ok(n):
+    return {"status": "SUCCESS", "appointments": [n]}
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_readers_share_one_load():
+    async def main():
+        cache  = SessionCache()
+        loader = Loader(ok(1))
+        a = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        b = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        await settle()
+        loader.release()
+        assert await a == await b == ok(1)
+        assert loader.calls == 1
+        assert await cache.get_or_load(KEY, loader, TAGS) == ok(1)    # now a hit
+        assert loader.calls == 1
+
+    asyncio.run(main())
+
+
+def test_write_during_load_is_not_cached():
+    async def main():
+        cache  = SessionCache()
+        before = Loader(ok("before write"))
+        a = asyncio.create_task(cache.get_or_load(KEY, before, TAGS))
+        await settle()
+
+        cache.invalidate("appointments")       # the write commits mid-load
+
+        after = Loader(ok("after write"))
+        b = asyncio.create_task(cache.get_or_load(KEY, after, TAGS))
+        await settle()
+        assert after.calls == 1                # didn't join the pre-write load
+
+        after.release()
+        assert await b == ok("after write")
+        before.release()                       # the stale load finishes last
+        assert await a == ok("before write")   # its own caller still gets an answer
+
+        again = Loader(ok("third"))
+        assert await cache.get_or_load(KEY, again, TAGS) == ok("after write")
+        assert again.calls == 0
+
+    asyncio.run(main())
+
+
+def test_stale_load_finishing_last_does_not_overwrite():
+    async def main():
+        cache  = SessionCache()
+        before = Loader(ok("before write"))
+        a = asyncio.create_task(cache.get_or_load(KEY, before, TAGS))
+        await settle()
+        cache.invalidate()                     # no tags: everything is stale
+
+        after = Loader(ok("after write"))
+        after.release()
+        assert await cache.get_or_load(KEY, after, TAGS) == ok("after write")
+
+        before.release()
+        await a
+        assert await cache.get_or_load(KEY, Loader(ok("x")), TAGS) == ok("after write")
+
+    asyncio.run(main())
+
+
+def test_unrelated_tag_does_not_detach_load():
+    async def main():
+        cache  = SessionCache()
+        loader = Loader(ok(1))
+        a = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        await settle()
+        cache.invalidate("orders")
+        loader.release()
+        await a
+        assert await cache.get_or_load(KEY, Loader(ok(2)), TAGS) == ok(1)
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_poison_shared_load():
+    async def main():
+        cache  = SessionCache()
+        loader = Loader(ok(1))
+        leader = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        waiter = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        other  = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        await settle()
+
+        waiter.cancel()
+        await settle()
+        assert waiter.cancelled()
+
+        loader.release()
+        assert await leader == await other == ok(1)
+        assert loader.calls == 1
+
+    asyncio.run(main())
+
+
+def test_waiter_reloads_when_leader_is_cancelled():
+    async def main():
+        cache  = SessionCache()
+        first  = Loader(ok(1))
+        leader = asyncio.create_task(cache.get_or_load(KEY, first, TAGS))
+        await settle()
+
+        second = Loader(ok(2))
+        second.release()
+        waiter = asyncio.create_task(cache.get_or_load(KEY, second, TAGS))
+        await settle()
+
+        leader.cancel()                        # e.g. close() cancelling a prefetch
+        assert await waiter == ok(2)
+        assert leader.cancelled()
+        assert second.calls == 1
+
+    asyncio.run(main())
+
+
+def test_waiter_cancelled_with_its_leader_stays_cancelled():
+    async def main():
+        cache  = SessionCache()
+        loader = Loader(ok(1))
+        leader = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        waiter = asyncio.create_task(cache.get_or_load(KEY, loader, TAGS))
+        await settle()
+
+        leader.cancel()                        # call end cancels both
+        waiter.cancel()
+        await settle()
+        assert leader.cancelled() and waiter.cancelled()
+        assert loader.calls == 1               # the waiter didn't start a load of its own
+
+    asyncio.run(main())
+
+
+def test_errors_are_shared_but_not_cached():
+    async def main():
+        cache  = SessionCache()
+        loader = Loader({"status": "ERROR", "message": "db down"}, ok(1))
+        loader.release()
+        assert (await cache.get_or_load(KEY, loader, TAGS))["status"] == "ERROR"
+        assert await cache.get_or_load(KEY, loader, TAGS) == ok(1)
+        assert loader.calls == 2
+
+    asyncio.run(main())
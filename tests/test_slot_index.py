@@ -0,0 +1,166 @@
+"""
+tests/test_slot_index.py — DentalBot v2
+
+The in-memory slot index without a database: the bit grid, applying
+appointment_slots notifications, and every case that must answer None so
+the caller falls back to the DB.
+
+    python -m pytest tests/
+"""
+
+import asyncio
+from datetime import date, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from appointment import slot_index
+from utils import json_codec
+
+DENTISTS = ("Dr. Emily Carter", "Dr. James Nguyen", "Dr. Sarah Mitchell")
+DAY      = date(2030, 3, 5)
+TEN      = time(10, 0)
+
+
+def notify(old=None, new=None, **extra):
+    return json_codec.dumps(dict({"old": old, "new": new}, **extra))
+
+
+def slot(dentist, day, t):
+    return [dentist, day.isoformat(), t.isoformat()]
+
+
+@pytest.fixture
+def live(monkeypatch):
+    """A loaded index covering DAY … DAY + 30, nothing booked."""
+    monkeypatch.setattr(slot_index, "_occupied", {})
+    monkeypatch.setattr(slot_index, "_dentists", DENTISTS)
+    monkeypatch.setattr(slot_index, "_window", (DAY, DAY + timedelta(days=30)))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GRID
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_bits_follow_the_slot_grid():
+    assert slot_index._bit(time(9, 0)) == 1
+    assert slot_index._bit(time(9, 30)) == 2
+    assert slot_index._bit(time(17, 30)) == 1 << (slot_index.SLOTS_PER_DAY - 1)
+
+
+@pytest.mark.parametrize("t", [time(8, 30), time(18, 0), time(10, 15), time(10, 0, 30)])
+def test_off_grid_times_have_no_bit(t):
+    assert slot_index._bit(t) is None
+
+
+def test_mark_sets_and_clears():
+    occupied = {}
+    slot_index._mark(occupied, "Dr. Emily Carter", DAY, TEN, True)
+    slot_index._mark(occupied, "Dr. Emily Carter", DAY, time(10, 30), True)
+    assert occupied == {("Dr. Emily Carter", DAY): 0b1100}
+
+    slot_index._mark(occupied, "Dr. Emily Carter", DAY, TEN, False)
+    slot_index._mark(occupied, "Dr. Emily Carter", DAY, time(10, 30), False)
+    assert occupied == {}       # empty days don't linger
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOOKUPS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_lookups_when_live(live):
+    slot_index._mark(slot_index._occupied, "Dr. James Nguyen", DAY, TEN, True)
+
+    assert slot_index.is_taken("Dr. James Nguyen", DAY, TEN) is True
+    assert slot_index.is_taken("Dr. Emily Carter", DAY, TEN) is False
+    assert slot_index.free_dentists(DAY, TEN) == ["Dr. Emily Carter", "Dr. Sarah Mitchell"]
+
+
+@pytest.mark.parametrize("day, t", [
+    (DAY - timedelta(days=1), TEN),          # before the window
+    (DAY + timedelta(days=31), TEN),         # after it
+    (DAY, time(10, 15)),                     # off the grid
+    (DAY, time(7, 0)),                       # before opening
+])
+def test_unsure_lookups_return_none(live, day, t):
+    assert slot_index.is_taken("Dr. Emily Carter", day, t) is None
+    assert slot_index.free_dentists(day, t) is None
+
+
+def test_dark_index_returns_none(live):
+    slot_index._go_dark()
+    assert slot_index.is_taken("Dr. Emily Carter", DAY, TEN) is None
+    assert slot_index.free_dentists(DAY, TEN) is None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# NOTIFICATIONS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_booking_then_move_then_cancel(live):
+    booked = slot("Dr. Emily Carter", DAY, TEN)
+    moved  = slot("Dr. Sarah Mitchell", DAY, time(11, 0))
+
+    assert slot_index._apply(notify(new=booked)) is False
+    assert slot_index.is_taken("Dr. Emily Carter", DAY, TEN) is True
+
+    assert slot_index._apply(notify(old=booked, new=moved)) is False
+    assert slot_index.is_taken("Dr. Emily Carter", DAY, TEN) is False
+    assert slot_index.is_taken("Dr. Sarah Mitchell", DAY, time(11, 0)) is True
+
+    assert slot_index._apply(notify(old=moved)) is False
+    assert slot_index._occupied == {}
+
+
+def test_replayed_notification_is_harmless(live):
+    booked = slot("Dr. Emily Carter", DAY, TEN)
+    slot_index._apply(notify(new=booked))
+    slot_index._apply(notify(new=booked))
+    assert slot_index._occupied == {("Dr. Emily Carter", DAY): slot_index._bit(TEN)}
+
+
+def test_truncate_asks_for_reload(live):
+    assert slot_index._apply(json_codec.dumps({"reload": True})) is True
+
+
+@pytest.mark.parametrize("payload", [
+    "not json",
+    notify(new=["Dr. Emily Carter", "someday", "10:00:00"]),
+    notify(new=["Dr. Emily Carter", "2030-03-05"]),
+])
+def test_bad_payload_asks_for_reload(live, payload):
+    assert slot_index._apply(payload) is True
+
+
+class FakeListenConn:
+    """notifies() yields the queued payloads once, then behaves like a quiet line."""
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.pings    = 0
+
+    async def notifies(self, timeout=None):
+        payloads, self.payloads = self.payloads, []
+        for p in payloads:
+            yield SimpleNamespace(payload=p)
+
+    async def execute(self, sql):
+        self.pings += 1
+        raise OSError("connection dropped")
+
+
+def test_follow_returns_for_reload_on_bad_payload(live):
+    booked = slot("Dr. Emily Carter", DAY, TEN)
+    conn   = FakeListenConn([notify(new=booked), "garbage", notify(old=booked)])
+
+    asyncio.run(slot_index._follow(conn))      # back to _listen, which reloads
+
+    assert slot_index.is_taken("Dr. Emily Carter", DAY, TEN) is True   # stopped at the bad one
+    assert conn.pings == 0
+
+
+def test_follow_raises_when_ping_fails(live):
+    conn = FakeListenConn([])
+    with pytest.raises(OSError):
+        asyncio.run(slot_index._follow(conn))  # _listen goes dark and reconnects
+    assert conn.pings == 1
@@ -0,0 +1,45 @@
+"""
+tests/test_tool_executor.py — DentalBot v2
+
+A run_tool() caller that times out must not free its tool's permit while
+the worker thread is still running: timeouts and retries can't push a tool
+past its TOOL_CONCURRENCY share of the pool.
+
+    python -m pytest tests/
+"""
+
+import time
+import asyncio
+import threading
+
+from utils import tool_executor
+
+
+def test_timed_out_calls_keep_their_permit(monkeypatch):
+    monkeypatch.setitem(tool_executor.TOOL_CONCURRENCY, "slow_tool", 2)
+    monkeypatch.setattr(tool_executor, "_semaphores", {})
+
+    lock    = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def work():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.1)
+        with lock:
+            running["now"] -= 1
+        return "done"
+
+    async def call():
+        try:
+            await asyncio.wait_for(tool_executor.run_tool("slow_tool", work), 0.02)
+        except asyncio.TimeoutError:
+            pass
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(6)))
+        return await tool_executor.run_tool("slow_tool", work)
+
+    assert asyncio.run(main()) == "done"
+    assert running["peak"] == 2
@@ -0,0 +1,765 @@
+"""
+tools/handlers.py — DentalBot v2
+
+Every Realtime function-call tool: schema + handler + timeout/retry/fallback.
+Importing this module registers them (see tools/registry.py); the order
+here is the order of the session.update tool list.
+
+Handlers take (args, session) and return the function_call_output dict.
+Hot DB executors are awaited natively (a-prefixed, adb_cursor()); every other
+blocking executor / OpenAI call goes through run_tool() so it runs on the
+tool thread pool and never stalls the audio loops of live calls.
+
+Patient reads go through the call's SessionCache (_cached_read); write tools
+declare which cache tags they make stale (invalidates=).
+"""
+
+from verification.verification_executor import (
+    averify_by_lastname_dob, averify_by_lastname_dob_contact, acreate_new_patient,
+    verify_caller_id_dob
+)
+from verification import caller_id
+from appointment.executor import (
+    acheck_dentist_availability, afind_available_dentist, abook_appointment,
+    aget_patient_appointments, aupdate_appointment, acancel_appointment
+)
+from complaint.complaint_executor import save_complaint
+from business.business_controller import (
+    handle_business_info, handle_insurance_query, handle_warranty_query
+)
+from business.business_executor import (
+    log_business_call, update_order_by_patient_id,
+    update_order_status_by_patient_name, check_supplier
+)
+from general_enquiry.enquiry_executor import (
+    aget_patient_orders, aget_upcoming_appointments, aget_past_appointments
+)
+from knowledge_base.kb_controller import handle_kb_query
+from utils.phone_utils import extract_phone_from_text, format_phone_for_speech
+from utils.date_time_utils import normalize_dob
+from utils.tool_executor import run_tool
+from utils import json_codec
+from tools.registry import tool
+
+
+DB_TIMEOUT_S  = 5       # single Postgres round-trip (+ pool wait)
+LLM_TIMEOUT_S = 12      # gpt-4o-mini chat completion on the tool pool
+
+NOT_VERIFIED = {"status": "ERROR", "message": "Patient not verified."}
+
+# session-cache tags
+APPOINTMENTS = "appointments"
+ORDERS       = "orders"
+
+FALLBACK_VERIFY = (
+    "I'm sorry, I'm having trouble looking up your account right now. "
+    "Could you give me a moment and we'll try again?"
+)
+FALLBACK_BOOKING = (
+    "I'm sorry, our booking system isn't responding right now. Please don't "
+    "worry — nothing has been changed yet. Shall we try again in a moment?"
+)
+FALLBACK_WRITE = (
+    "I'm sorry, our system is slow to respond right now, so I can't confirm "
+    "that went through. Let me check again in a moment before we go further."
+)
+FALLBACK_INFO = (
+    "I'm sorry, I can't pull that information up right now. "
+    "Is there anything else I can help you with in the meantime?"
+)
+FALLBACK_RECORDS = (
+    "I'm sorry, I can't load your records right now. "
+    "Could we try that again in a moment?"
+)
+
+
+async def _cached_read(session, loader, patient_id, tag):
+    """loader(patient_id) through the call's SessionCache, keyed by (loader, patient_id)."""
+    cache = session.get("cache")
+    if cache is None:
+        return await loader(patient_id)
+    return await cache.get_or_load((loader.__name__, patient_id),
+                                   lambda: loader(patient_id), tags=(tag,))
+
+
+# What a verified caller almost always asks about next
+PREFETCH_AFTER_VERIFY = (
+    (aget_patient_appointments,  APPOINTMENTS),
+    (aget_upcoming_appointments, APPOINTMENTS),
+    (aget_past_appointments,     APPOINTMENTS),
+    (aget_patient_orders,        ORDERS),
+)
+
+
+def _prefetch_patient_context(session, patient_id):
+    """Warm the session cache in the background; never delays the VERIFIED result."""
+    cache = session.get("cache")
+    if cache is None:
+        return
+    for loader, tag in PREFETCH_AFTER_VERIFY:
+        cache.prefetch((loader.__name__, patient_id),
+                       lambda loader=loader: loader(patient_id), tags=(tag,))
+
+
+def _query_schema() -> dict:
+    return {
+        "type": "object",
+        "properties": {"query": {"type": "string"}},
+        "required": ["query"]
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# VERIFICATION
+# ─────────────────────────────────────────────────────────────────────────────
+
+@tool(
+    "verify_existing_patient",
+    description=(
+        "Verify existing patient by last name and date of birth. "
+        "ONLY call after user has confirmed DOB in DD-MON-YYYY format."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "last_name":     {"type": "string"},
+            "date_of_birth": {"type": "string",
+                              "description": "DD-MON-YYYY e.g. 15 Jun 1990"}
+        },
+        "required": ["last_name", "date_of_birth"]
+    },
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_VERIFY
+)
+async def verify_existing_patient(args, session):
+    r = await averify_by_lastname_dob(
+        last_name=args.get("last_name", ""),
+        dob=normalize_dob(args.get("date_of_birth", ""))
+    )
+    if r["status"] == "VERIFIED":
+        session["patient_data"] = r
+        session["verified"]     = True
+        _prefetch_patient_context(session, r["patient_id"])
+        return {
+            "status":         "VERIFIED",
+            "first_name":     r["first_name"],
+            "last_name":      r["last_name"],
+            "date_of_birth":  r["date_of_birth"],
+            "contact_spoken": format_phone_for_speech(r.get("contact_number", ""))
+        }
+    if r["status"] == "MULTIPLE_FOUND":
+        return {"status": "MULTIPLE_FOUND", "message": r["message"]}
+    return {"status": "NOT_FOUND", "message": r.get("message", "No account found.")}
+
+
+@tool(
+    "verify_with_contact_number",
+    description="Disambiguate when multiple patients share last name + DOB.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "last_name":      {"type": "string"},
+            "date_of_birth":  {"type": "string"},
+            "contact_number": {"type": "string"}
+        },
+        "required": ["last_name", "date_of_birth", "contact_number"]
+    },
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_VERIFY
+)
+async def verify_with_contact_number(args, session):
+    phone = extract_phone_from_text(args.get("contact_number", ""))
+    r = await averify_by_lastname_dob_contact(
+        last_name=args.get("last_name", ""),
+        dob=normalize_dob(args.get("date_of_birth", "")),
+        contact_number=phone
+    )
+    if r["status"] == "VERIFIED":
+        session["patient_data"] = r
+        session["verified"]     = True
+        _prefetch_patient_context(session, r["patient_id"])
+        return {"status": "VERIFIED",
+                "first_name": r["first_name"], "last_name": r["last_name"]}
+    return {"status": "NOT_FOUND", "message": r.get("message", "Could not verify.")}
+
+
+@tool(
+    "verify_caller_dob",
+    description=(
+        "Verify an existing patient calling from their registered number "
+        "(CALL CONTEXT says caller ID matched) by date of birth only. "
+        "ONLY call after user has confirmed DOB in DD-MON-YYYY format. "
+        "One attempt — on NOT_FOUND use verify_existing_patient()."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "date_of_birth": {"type": "string",
+                              "description": "DD-MON-YYYY e.g. 15 Jun 1990"}
+        },
+        "required": ["date_of_birth"]
+    },
+    timeout_s=DB_TIMEOUT_S
+)
+async def verify_caller_dob(args, session):
+    # Candidates came from the caller-ID lookup on /voice — no DB round trip.
+    # Cleared after any attempt so a wrong DOB can't be retried against them.
+    await caller_id.resolve(session)
+    candidates = session.pop("caller_candidates", None)
+    if not candidates:
+        return {"status": "NOT_FOUND",
+                "message": "No account is linked to this number. Use last name and DOB."}
+
+    r = verify_caller_id_dob(candidates, args.get("date_of_birth", ""))
+    if r["status"] == "VERIFIED":
+        session["patient_data"] = r
+        session["verified"]     = True
+        _prefetch_patient_context(session, r["patient_id"])
+        return {
+            "status":         "VERIFIED",
+            "first_name":     r["first_name"],
+            "last_name":      r["last_name"],
+            "date_of_birth":  r["date_of_birth"],
+            "contact_spoken": format_phone_for_speech(r.get("contact_number", ""))
+        }
+    return {"status": "NOT_FOUND", "message": r.get("message", "Could not verify.")}
+
+
+@tool(
+    "create_new_patient",
+    description=(
+        "Register a new patient. Call immediately after collecting "
+        "first_name, last_name, DOB, contact. "
+        "Do NOT say account ready before this returns status=CREATED."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "first_name":     {"type": "string"},
+            "last_name":      {"type": "string"},
+            "date_of_birth":  {"type": "string"},
+            "contact_number": {"type": "string"},
+            "insurance_info": {"type": "string"}
+        },
+        "required": ["first_name", "last_name", "date_of_birth", "contact_number"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE
+)
+async def create_new_patient(args, session):
+    phone = extract_phone_from_text(args.get("contact_number", ""))
+    r = await acreate_new_patient(
+        first_name=args.get("first_name", ""),
+        last_name=args.get("last_name", ""),
+        dob=normalize_dob(args.get("date_of_birth", "")),
+        contact_number=phone,
+        insurance_info=args.get("insurance_info")
+    )
+    if r["status"] == "CREATED":
+        session["patient_data"] = r
+        session["verified"]     = True
+        return {
+            "status":     "CREATED",
+            "first_name": r["first_name"],
+            "last_name":  r["last_name"],
+            "message":    "Account created. Patient verified and ready to book."
+        }
+    return {"status": "ERROR", "message": r.get("message", "Could not create account.")}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# APPOINTMENTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+@tool(
+    "check_slot_availability",
+    description="Check if a specific dentist is available at a given date/time.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "date":         {"type": "string"},
+            "time":         {"type": "string"},
+            "dentist_name": {
+                "type": "string",
+                "description": "MUST be exact: Dr. Emily Carter | Dr. James Nguyen | Dr. Sarah Mitchell"
+            }
+        },
+        "required": ["date", "time", "dentist_name"]
+    },
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_BOOKING, read_only=True
+)
+async def check_slot_availability(args, session):
+    return await acheck_dentist_availability(
+        date_str=args.get("date", ""),
+        time_str=args.get("time", ""),
+        dentist_name=args.get("dentist_name", "")
+    )
+
+
+@tool(
+    "find_any_available_dentist",
+    description="Find any available dentist when patient has no preference.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "date": {"type": "string"},
+            "time": {"type": "string"}
+        },
+        "required": ["date", "time"]
+    },
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_BOOKING, read_only=True
+)
+async def find_any_available_dentist(args, session):
+    return await afind_available_dentist(
+        date_str=args.get("date", ""),
+        time_str=args.get("time", "")
+    )
+
+
+@tool(
+    "book_appointment",
+    description=(
+        "Book appointment ONLY after patient says YES to full confirmation. "
+        "preferred_dentist MUST be exact full name with Dr. prefix. "
+        "preferred_treatment MUST be from the 18-item SERVICES list exactly."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "preferred_treatment": {"type": "string"},
+            "preferred_date":      {"type": "string"},
+            "preferred_time":      {"type": "string"},
+            "preferred_dentist":   {"type": "string"}
+        },
+        "required": ["preferred_treatment", "preferred_date",
+                     "preferred_time", "preferred_dentist"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE, invalidates=(APPOINTMENTS,)
+)
+async def book_appointment(args, session):
+    if not session.get("verified") or not session.get("patient_data"):
+        return {"status": "ERROR", "message": "Patient must be verified first."}
+    p = session["patient_data"]
+    r = await abook_appointment(
+        patient_id=p["patient_id"],
+        first_name=p["first_name"],
+        last_name=p["last_name"],
+        date_of_birth=p["date_of_birth"],
+        contact_number=p["contact_number"],
+        preferred_treatment=args.get("preferred_treatment", ""),
+        preferred_date=args.get("preferred_date", ""),
+        preferred_time=args.get("preferred_time", ""),
+        preferred_dentist=args.get("preferred_dentist", "")
+    )
+    if r["status"] == "BOOKED":
+        return {
+            "status":    "BOOKED",
+            "treatment": r["treatment"],
+            "date":      r["date"],
+            "time":      r["time"],
+            "dentist":   r["dentist"]
+        }
+    if r["status"] == "SLOT_TAKEN":
+        return r
+    return {"status": "ERROR", "message": r.get("message", "Booking failed.")}
+
+
+async def _patient_appointments(session) -> dict:
+    """The list get_my_appointments showed — appointment_index points into it."""
+    return await _cached_read(session, aget_patient_appointments,
+                              session["patient_data"]["patient_id"], APPOINTMENTS)
+
+
+async def _appointment_by_index(session, args):
+    r = await _patient_appointments(session)
+    appts = r["appointments"] if r["status"] == "SUCCESS" else []
+    idx   = args.get("appointment_index", 1) - 1
+    return appts[idx] if 0 <= idx < len(appts) else None
+
+
+@tool(
+    "get_my_appointments",
+    description="Get all confirmed appointments. ALWAYS call before update/cancel.",
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_RECORDS, read_only=True
+)
+async def get_my_appointments(args, session):
+    if not session.get("verified"):
+        return NOT_VERIFIED
+    r = await _patient_appointments(session)
+    if r["status"] != "SUCCESS":
+        return {"status": r["status"], "message": r.get("message", "")}
+    appts = r["appointments"]
+    return {
+        "status": "SUCCESS",
+        "appointments": [
+            {"index": i, "treatment": a["treatment"], "date": a["date"],
+             "time": a["time"], "dentist": a["dentist"], "status": a["status"]}
+            for i, a in enumerate(appts, 1)
+        ],
+        "count": len(appts)
+    }
+
+
+@tool(
+    "update_my_appointment",
+    description="Update appointment using appointment_index from get_my_appointments.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "appointment_index": {"type": "integer"},
+            "new_treatment":     {"type": "string"},
+            "new_date":          {"type": "string"},
+            "new_time":          {"type": "string"},
+            "new_dentist":       {"type": "string"}
+        },
+        "required": ["appointment_index"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE, invalidates=(APPOINTMENTS,)
+)
+async def update_my_appointment(args, session):
+    if not session.get("verified"):
+        return NOT_VERIFIED
+    appt = await _appointment_by_index(session, args)
+    if appt is None:
+        return {"status": "ERROR", "message": "Invalid index. Call get_my_appointments first."}
+
+    fields = {}
+    if args.get("new_treatment"): fields["preferred_treatment"] = args["new_treatment"]
+    if args.get("new_date"):      fields["preferred_date"]      = args["new_date"]
+    if args.get("new_time"):      fields["preferred_time"]      = args["new_time"]
+    if args.get("new_dentist"):   fields["preferred_dentist"]   = args["new_dentist"]
+    r = await aupdate_appointment(appt["_id"], fields)
+    if r["status"] == "UPDATED":
+        return {"status": "UPDATED", "treatment": r["treatment"],
+                "date": r["date"], "time": r["time"], "dentist": r["dentist"]}
+    if r["status"] == "SLOT_TAKEN":
+        return r
+    return {"status": "ERROR", "message": r.get("message", "Update failed.")}
+
+
+@tool(
+    "cancel_my_appointment",
+    description="Cancel appointment after patient says YES.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "appointment_index": {"type": "integer"},
+            "reason":            {"type": "string"}
+        },
+        "required": ["appointment_index"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE, invalidates=(APPOINTMENTS,)
+)
+async def cancel_my_appointment(args, session):
+    if not session.get("verified"):
+        return NOT_VERIFIED
+    appt = await _appointment_by_index(session, args)
+    if appt is None:
+        return {"status": "ERROR", "message": "Invalid index. Call get_my_appointments first."}
+
+    r = await acancel_appointment(appt["_id"], args.get("reason"))
+    if r["status"] == "CANCELLED":
+        return {"status": "CANCELLED", "treatment": r["treatment"],
+                "date": r["date"], "time": r["time"], "dentist": r["dentist"]}
+    return {"status": "ERROR", "message": r.get("message", "Cancel failed.")}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# COMPLAINTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+@tool(
+    "file_complaint",
+    description=(
+        "Save a complaint.\n"
+        "TYPE 1 (general): NO verification needed. "
+        "Required: complaint_text, complaint_category=general, "
+        "first_name, last_name, contact_number.\n"
+        "TYPE 2 (treatment): patient MUST be verified. "
+        "Required: complaint_text, complaint_category=treatment, "
+        "treatment_name, dentist_name, treatment_date. "
+        "patient_id comes from verified session.\n"
+        "NEVER ask for DOB for a general complaint."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "complaint_text":     {"type": "string"},
+            "complaint_category": {"type": "string", "enum": ["general", "treatment"]},
+            "first_name":         {"type": "string"},
+            "last_name":          {"type": "string"},
+            "contact_number":     {"type": "string"},
+            "treatment_name":     {"type": "string"},
+            "dentist_name":       {"type": "string"},
+            "treatment_date":     {"type": "string"},
+            "treatment_time":     {"type": "string"},
+            "additional_info":    {"type": "string"},
+            "appointment_id":     {"type": "integer"}
+        },
+        "required": ["complaint_text", "complaint_category"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE
+)
+async def file_complaint(args, session):
+    category = args.get("complaint_category", "general").lower()
+    if category == "treatment":
+        if not session.get("verified") or not session.get("patient_data"):
+            return {"status": "ERROR", "message": "Patient must be verified for a treatment complaint."}
+        p = session["patient_data"]
+        r = await run_tool(
+            "file_complaint", save_complaint,
+            complaint_category="treatment",
+            complaint_text=args.get("complaint_text", ""),
+            first_name=p["first_name"],
+            last_name=p["last_name"],
+            contact_number=p.get("contact_number"),
+            patient_id=p["patient_id"],
+            appointment_id=args.get("appointment_id"),
+            date_of_birth=p.get("date_of_birth"),
+            treatment_name=args.get("treatment_name"),
+            dentist_name=args.get("dentist_name"),
+            treatment_date=args.get("treatment_date"),
+            treatment_time=args.get("treatment_time"),
+            additional_info=args.get("additional_info"),
+        )
+    else:
+        r = await run_tool(
+            "file_complaint", save_complaint,
+            complaint_category="general",
+            complaint_text=args.get("complaint_text", ""),
+            first_name=args.get("first_name"),
+            last_name=args.get("last_name"),
+            contact_number=args.get("contact_number"),
+        )
+    return r if r["status"] != "SAVED" else {"status": "SAVED", "message": r["message"]}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GENERAL ENQUIRY
+# ─────────────────────────────────────────────────────────────────────────────
+
+@tool(
+    "get_business_information",
+    description="Get pricing, hours, payment options, offers, dentist info.",
+    parameters=_query_schema(),
+    timeout_s=LLM_TIMEOUT_S, retries=1, fallback=FALLBACK_INFO, hold_prompt=True, read_only=True
+)
+async def get_business_information(args, session):
+    r = await run_tool("get_business_information", handle_business_info,
+                       user_input=args.get("query", ""), session=session)
+    return {"status": r.get("status", "SUCCESS"), "response": r.get("response", "")}
+
+
+@tool(
+    "get_insurance_information",
+    description="Get health insurance info.",
+    parameters=_query_schema(),
+    timeout_s=LLM_TIMEOUT_S, retries=1, fallback=FALLBACK_INFO, hold_prompt=True, read_only=True
+)
+async def get_insurance_information(args, session):
+    r = await run_tool("get_insurance_information", handle_insurance_query,
+                       user_input=args.get("query", ""), session=session)
+    return {"status": r.get("status", "SUCCESS"), "response": r.get("response", "")}
+
+
+@tool(
+    "get_warranty_information",
+    description="Get dental warranty policy.",
+    parameters=_query_schema(),
+    timeout_s=LLM_TIMEOUT_S, retries=1, fallback=FALLBACK_INFO, hold_prompt=True, read_only=True
+)
+async def get_warranty_information(args, session):
+    r = await run_tool("get_warranty_information", handle_warranty_query,
+                       user_input=args.get("query", ""), session=session)
+    return {"status": r.get("status", "SUCCESS"), "response": r.get("response", "")}
+
+
+@tool(
+    "answer_dental_question",
+    description=(
+        "Answer questions about dental procedures, pre/post care, recovery. "
+        "Uses ONLY internal knowledge base. NOT for pricing. "
+        "NEVER suggest 'consultation'. "
+        "ONLY reference treatments from the clinic's 18-item SERVICES list."
+    ),
+    parameters=_query_schema(),
+    timeout_s=LLM_TIMEOUT_S, retries=1, fallback=FALLBACK_INFO, hold_prompt=True, read_only=True
+)
+async def answer_dental_question(args, session):
+    r = await run_tool("answer_dental_question", handle_kb_query,
+                       user_input=args.get("query", ""), session=session)
+    return {"status": r.get("source", "kb"), "response": r.get("response", "")}
+
+
+@tool(
+    "get_my_order_status",
+    description="Check status of patient's dental order.",
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_RECORDS, read_only=True
+)
+async def get_my_order_status(args, session):
+    if not session.get("verified"):
+        return NOT_VERIFIED
+    r = await _cached_read(session, aget_patient_orders,
+                           session["patient_data"]["patient_id"], ORDERS)
+    if r["status"] != "SUCCESS":
+        return {"status": r["status"], "message": r.get("message", "No orders found.")}
+    return {
+        "status": "SUCCESS",
+        "orders": [{"product": o["product_name"], "status": o["order_status"],
+                    "notes": o.get("notes", "")} for o in r["orders"]],
+        "count": r["count"]
+    }
+
+
+@tool(
+    "get_my_upcoming_appointments",
+    description="Get upcoming appointments for verified patient.",
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_RECORDS, read_only=True
+)
+async def get_my_upcoming_appointments(args, session):
+    if not session.get("verified"):
+        return NOT_VERIFIED
+    r = await _cached_read(session, aget_upcoming_appointments,
+                           session["patient_data"]["patient_id"], APPOINTMENTS)
+    if r["status"] != "SUCCESS":
+        return {"status": r["status"], "message": r.get("message", "None found.")}
+    return {
+        "status": "SUCCESS",
+        "appointments": [{"treatment": a["treatment"], "date": a["date"],
+                          "time": a["time"], "dentist": a["dentist"]}
+                         for a in r["appointments"]],
+        "count": r["count"]
+    }
+
+
+@tool(
+    "get_my_treatment_history",
+    description="Get past treatment history for verified patient.",
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_RECORDS, read_only=True
+)
+async def get_my_treatment_history(args, session):
+    if not session.get("verified"):
+        return NOT_VERIFIED
+    r = await _cached_read(session, aget_past_appointments,
+                           session["patient_data"]["patient_id"], APPOINTMENTS)
+    if r["status"] != "SUCCESS":
+        return {"status": r["status"], "message": r.get("message", "None found.")}
+    return {
+        "status": "SUCCESS",
+        "appointments": [{"treatment": a["treatment"], "date": a["date"],
+                          "dentist": a["dentist"]}
+                         for a in r["appointments"][:5]],
+        "count": r["count"]
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SUPPLIER
+# ─────────────────────────────────────────────────────────────────────────────
+
+@tool(
+    "check_known_supplier",
+    description=(
+        "Check if calling company is an authorised supplier. "
+        "ALWAYS call first when a business caller mentions a company. "
+        "Returns FOUND or NOT_FOUND."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "company_name": {"type": "string"}
+        },
+        "required": ["company_name"]
+    },
+    timeout_s=DB_TIMEOUT_S, retries=1, fallback=FALLBACK_VERIFY
+)
+async def check_known_supplier(args, session):
+    r = await run_tool("check_known_supplier", check_supplier, args.get("company_name", ""))
+    if r["status"] == "FOUND":
+        session["supplier_context"]["company_name"]      = r["supplier"]["company_name"]
+        session["supplier_context"]["is_known_supplier"] = True
+        return {
+            "status":       "FOUND",
+            "company_name": r["supplier"]["company_name"],
+            "specialty":    r["supplier"]["specialty"],
+            "message":      f"Verified supplier: {r['supplier']['company_name']}."
+        }
+    session["supplier_context"]["is_known_supplier"] = False
+    return {"status": "NOT_FOUND", "message": r["message"]}
+
+
+@tool(
+    "update_supplier_order",
+    description=(
+        "Mark a patient order as ready after a VERIFIED supplier confirms. "
+        "Use patient_id when available, else patient_last_name. "
+        "Also call log_supplier_call() for the same call."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "patient_id":        {"type": "integer"},
+            "patient_last_name": {"type": "string"},
+            "product_name":      {"type": "string"}
+        },
+        "required": ["product_name"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE, invalidates=(ORDERS,)
+)
+async def update_supplier_order(args, session):
+    patient_id   = args.get("patient_id")
+    last_name    = args.get("patient_last_name")
+    product_name = args.get("product_name", "")
+    notes        = f"Supplier confirmed — {session['supplier_context'].get('company_name','')}"
+    if patient_id:
+        return await run_tool(
+            "update_supplier_order", update_order_by_patient_id,
+            patient_id=int(patient_id), product_name=product_name,
+            new_status="ready", notes=notes
+        )
+    if last_name:
+        return await run_tool(
+            "update_supplier_order", update_order_status_by_patient_name,
+            patient_name=last_name, product_name=product_name,
+            new_status="ready", notes=notes
+        )
+    return {"status": "ERROR", "message": "Need patient_id or patient_last_name."}
+
+
+@tool(
+    "log_supplier_call",
+    description=(
+        "Log a call from a supplier, agent, or business. "
+        "For TYPE 2 agent calls. Also call alongside update_supplier_order. "
+        "NEVER for patient calls."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "caller_name":    {"type": "string"},
+            "company_name":   {"type": "string"},
+            "contact_number": {"type": "string"},
+            "purpose":        {"type": "string"}
+        },
+        "required": ["purpose"]
+    },
+    timeout_s=DB_TIMEOUT_S, fallback=FALLBACK_WRITE
+)
+async def log_supplier_call(args, session):
+    ctx = session.get("supplier_context", {})
+    caller_name    = args.get("caller_name")    or ctx.get("caller_name")
+    company_name   = args.get("company_name")   or ctx.get("company_name")
+    contact_number = args.get("contact_number") or ctx.get("contact_number")
+    if args.get("caller_name"):
+        session["supplier_context"]["caller_name"]    = args["caller_name"]
+    if args.get("company_name"):
+        session["supplier_context"]["company_name"]   = args["company_name"]
+    if args.get("contact_number"):
+        session["supplier_context"]["contact_number"] = args["contact_number"]
+    await run_tool(
+        "log_supplier_call", log_business_call,
+        caller_name=caller_name, company_name=company_name,
+        contact_number=contact_number, purpose=args.get("purpose"),
+        full_notes=json_codec.dumps(args)
+    )
+    return {
+        "status":  "LOGGED",
+        "message": f"Call from {caller_name or 'caller'} ({company_name or 'unknown'}) logged."
+    }
@@ -0,0 +1,153 @@
+"""
+tools/registry.py — DentalBot v2
+
+Name → ToolSpec registry for the Realtime function calls.
+
+Each tool is declared once (tools/handlers.py) with everything the bridge
+needs to know about it:
+
+    @tool("get_my_appointments",
+          description="...", parameters={...},      # → session.update "tools"
+          timeout_s=5, retries=1,                   # per attempt / extra attempts
+          fallback="I couldn't load your appointments just now...")
+    async def get_my_appointments(args, session): ...
+
+- tool_definitions() builds the session.update tool list from the same specs,
+  so the schema the model sees and the handler that runs can't drift apart
+- dispatch() is a dict lookup, then asyncio.wait_for per attempt. A timeout
+  or exception returns {"status": "TIMEOUT"|"ERROR", "message": fallback}
+  promptly — the model always gets a spoken-safe result instead of dead air
+- Only set retries on idempotent tools: a timed-out write may have committed.
+  Work already handed to the tool thread pool (run_tool) can't be interrupted;
+  the timeout stops *waiting* for it, and the thread keeps its tool's
+  concurrency permit until it finishes
+- Write tools list the session-cache tags they make stale (invalidates=);
+  dispatch() drops those entries after the write, whatever its outcome
+- read_only=True marks tools that change neither the database nor the
+  session: the bridge runs those concurrently within a response; every
+  other tool (verification, writes) runs after the calls before it
+- Every invocation is counted by outcome and timed per attempt
+"""
+
+import os
+import time
+import asyncio
+
+from utils.logger import get_logger
+from utils.metrics import REGISTRY
+
+log = get_logger("tools")
+
+
+DEFAULT_TOOL_TIMEOUT_S = float(os.getenv("TOOL_TIMEOUT_S", "6"))
+
+DEFAULT_FALLBACK = (
+    "I'm sorry, I'm having trouble with our system right now. "
+    "Could we try that again in a moment?"
+)
+
+TOOL_INVOCATIONS = REGISTRY.counter(
+    "dentalbot_tool_invocations_total",
+    "Tool dispatches by final outcome.",
+    labelnames=("tool", "outcome")      # ok | timeout | error | unknown
+)
+TOOL_ATTEMPT_SECONDS = REGISTRY.histogram(
+    "dentalbot_tool_attempt_seconds",
+    "Duration of each tool handler attempt (retries observed separately).",
+    labelnames=("tool", "outcome")
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SPECS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ToolSpec:
+    __slots__ = (
+        "name", "handler", "description", "parameters",
+        "timeout_s", "retries", "fallback", "hold_prompt", "invalidates", "read_only"
+    )
+
+    def __init__(self, name, handler, description, parameters=None,
+                 timeout_s=DEFAULT_TOOL_TIMEOUT_S, retries=0,
+                 fallback=DEFAULT_FALLBACK, hold_prompt=False, invalidates=(),
+                 read_only=False):
+        self.name        = name
+        self.handler     = handler
+        self.description = description
+        self.parameters  = parameters or {"type": "object", "properties": {}}
+        self.timeout_s   = timeout_s
+        self.retries     = retries
+        self.fallback    = fallback
+        self.hold_prompt = hold_prompt      # slow enough to cover with a cached hold clip
+        self.invalidates = tuple(invalidates)   # session-cache tags this tool makes stale
+        self.read_only   = read_only            # safe to run alongside other calls
+
+    def definition(self) -> dict:
+        return {
+            "type":        "function",
+            "name":        self.name,
+            "description": self.description,
+            "parameters":  self.parameters
+        }
+
+
+_tools = {}     # insertion order = order in session.update
+
+
+def tool(name: str, **spec):
+    """Decorator: register `async def handler(args, session) -> dict` as `name`."""
+    def register(handler):
+        if name in _tools:
+            raise ValueError(f"tool '{name}' registered twice")
+        _tools[name] = ToolSpec(name, handler, **spec)
+        return handler
+    return register
+
+
+def get_tool(name: str):
+    return _tools.get(name)
+
+
+def tool_definitions() -> list:
+    return [spec.definition() for spec in _tools.values()]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DISPATCH
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def dispatch(name: str, arguments: dict, session: dict) -> dict:
+    spec = _tools.get(name)
+    if spec is None:
+        TOOL_INVOCATIONS.inc(tool="unknown", outcome="unknown")
+        return {"status": "ERROR", "message": f"Unknown function: {name}"}
+
+    try:
+        return await _run(spec, arguments, session)
+    finally:
+        if spec.invalidates and session.get("cache") is not None:
+            session["cache"].invalidate(*spec.invalidates)
+
+
+async def _run(spec: ToolSpec, arguments: dict, session: dict) -> dict:
+    name    = spec.name
+    outcome = "error"
+    for attempt in range(spec.retries + 1):
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(spec.handler(arguments, session), spec.timeout_s)
+            TOOL_ATTEMPT_SECONDS.observe(time.perf_counter() - started, tool=name, outcome="ok")
+            TOOL_INVOCATIONS.inc(tool=name, outcome="ok")
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            log.warning("[TOOL] %s timed out after %.1fs (attempt %d/%d)",
+                        name, spec.timeout_s, attempt + 1, spec.retries + 1)
+        except Exception:
+            outcome = "error"
+            log.exception("[TOOL] %s failed (attempt %d/%d)", name, attempt + 1, spec.retries + 1)
+        TOOL_ATTEMPT_SECONDS.observe(time.perf_counter() - started, tool=name, outcome=outcome)
+
+    TOOL_INVOCATIONS.inc(tool=name, outcome=outcome)
+    return {"status": "TIMEOUT" if outcome == "timeout" else "ERROR", "message": spec.fallback}
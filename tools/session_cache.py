@@ -0,0 +1,146 @@
+"""
+tools/session_cache.py — DentalBot v2
+
+Per-call read-through cache for the read-only executors.
+
+Within one call the model often asks for the same thing twice ("what were my
+appointments again?"), and update/cancel need the list it just read. Each
+session gets a SessionCache (session["cache"]):
+
+    r = await cache.get_or_load(("patient_appointments", patient_id),
+                                lambda: aget_patient_appointments(patient_id),
+                                tags=("appointments",))
+
+- Entries expire after SESSION_CACHE_TTL_S; only status=SUCCESS results are
+  stored, errors always go back to the database
+- Concurrent loads of the same key (parallel tool calls) share one query
+- Write tools declare invalidates=(...) on their ToolSpec; dispatch() drops
+  every entry carrying one of those tags after the write runs — even on
+  timeout, since the write may have committed. It also bumps each tag's
+  generation and detaches in-flight loads carrying it: a load that started
+  before the write still answers its own callers but is never cached, and
+  later callers start a fresh query
+- A shared load whose leader was cancelled (a prefetch at call end) is not
+  the waiters' cancellation — they retry and load for themselves. Telling
+  the two apart uses Task.cancelling(), so Python ≥ 3.11 (runtime.txt)
+- prefetch() starts the same load in the background (e.g. right after
+  verification), so the later tool call is a hit or joins the in-flight
+  query; close() at call end cancels whatever is still running
+"""
+
+import os
+import time
+import asyncio
+
+from utils.metrics import REGISTRY
+
+
+SESSION_CACHE_TTL_S = float(os.getenv("SESSION_CACHE_TTL_S", "60"))
+
+SESSION_CACHE = REGISTRY.counter(
+    "dentalbot_session_cache_total",
+    "Per-call read cache lookups.",
+    labelnames=("result",)      # hit | miss | shared | prefetch
+)
+
+
+class SessionCache:
+    __slots__ = ("ttl_s", "_entries", "_inflight", "_tasks", "_generations", "_epoch")
+
+    def __init__(self, ttl_s: float = SESSION_CACHE_TTL_S):
+        self.ttl_s        = ttl_s
+        self._entries     = {}     # key -> (expires_at, tags, result)
+        self._inflight    = {}     # key -> (Future, tags)
+        self._tasks       = set()  # background prefetches
+        self._generations = {}     # tag -> times invalidated
+        self._epoch       = 0      # times invalidate() dropped everything
+
+    def _generation(self, tags) -> tuple:
+        return (self._epoch, *(self._generations.get(t, 0) for t in tags))
+
+    async def get_or_load(self, key: tuple, loader, tags=()):
+        tags = frozenset(tags)
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    SESSION_CACHE.inc(result="hit")
+                    return entry[2]
+                del self._entries[key]
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            SESSION_CACHE.inc(result="shared")
+            try:
+                return await asyncio.shield(pending[0])
+            except asyncio.CancelledError:
+                if not pending[0].cancelled() or asyncio.current_task().cancelling():
+                    raise       # we were cancelled, not the leader
+                # leader cancelled — look again: cached, another leader, or load ourselves
+
+        SESSION_CACHE.inc(result="miss")
+        generation = self._generation(tags)
+        future     = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (future, tags)
+        try:
+            result = await loader()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()      # mark retrieved — waiters re-raise it themselves
+            raise
+        finally:
+            if self._inflight.get(key, (None,))[0] is future:
+                del self._inflight[key]
+
+        # a write invalidated these tags while we loaded — don't cache the pre-write answer
+        if (isinstance(result, dict) and result.get("status") == "SUCCESS"
+                and self._generation(tags) == generation):
+            self._entries[key] = (time.monotonic() + self.ttl_s, tags, result)
+        future.set_result(result)
+        return result
+
+    def prefetch(self, key: tuple, loader, tags=()):
+        """Warm `key` in the background unless it is already cached or loading."""
+        if key in self._inflight:
+            return
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return
+        SESSION_CACHE.inc(result="prefetch")
+        task = asyncio.ensure_future(self._prefetch(key, loader, tags))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prefetch(self, key, loader, tags):
+        try:
+            await self.get_or_load(key, loader, tags)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass        # the real tool call will query again and report the error
+
+    def close(self):
+        """Call end: cancel in-flight prefetches and drop everything."""
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+        self._entries.clear()
+
+    def invalidate(self, *tags):
+        """Drop entries and detach in-flight loads carrying any of `tags` (all if none given)."""
+        if not tags:
+            self._epoch += 1
+            self._entries.clear()
+            self._inflight.clear()
+            return
+        doomed = set(tags)
+        for tag in doomed:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        for key in [k for k, (_, entry_tags, _) in self._entries.items() if entry_tags & doomed]:
+            del self._entries[key]
+        for key in [k for k, (_, load_tags) in self._inflight.items() if load_tags & doomed]:
+            del self._inflight[key]
@@ -0,0 +1,165 @@
+"""
+utils/audio_codec.py — DentalBot v2
+
+G.711 μ-law / A-law ⇄ PCM16 and 8 kHz ⇄ 24 kHz resampling, table-driven numpy.
+
+The bridge passes g711_ulaw through untouched, but level metering, the
+inbound VAD gate, call recording and pcm16 input to OpenAI all need samples.
+audioop (the stdlib answer) is removed in Python 3.13.
+
+- Decode: one 256-entry int16 table per law, indexed by the encoded bytes
+- Encode: one 65536-entry uint8 table per law, indexed by the sample's
+  uint16 bit pattern — a single gather, no per-sample branching
+- Inputs may be bytes / bytearray / memoryview / mmap (np.frombuffer, no
+  copy) or numpy arrays; pass out= to reuse a buffer across frames
+- Tables follow the reference G.711 implementation (Sun g711.c), so output
+  is identical to audioop.lin2ulaw / ulaw2lin etc.
+- resample(): soxr when installed (VHQ, and a streaming Resampler keeps
+  filter state across 20 ms chunks); linear interpolation otherwise
+
+Benchmark: python -m benchmarks.bench_audio_codec
+"""
+
+import numpy as np
+
+try:
+    import soxr
+except ImportError:      # optional — linear interpolation fallback below
+    soxr = None
+
+
+TWILIO_RATE = 8000
+OPENAI_PCM_RATE = 24000
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TABLES
+# ─────────────────────────────────────────────────────────────────────────────
+
+_BIAS = 0x84
+_SEG_UEND = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], dtype=np.int32)
+_SEG_AEND = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF], dtype=np.int32)
+
+# every int16 value, ordered by its uint16 bit pattern (index = sample.view(uint16))
+_ALL_SAMPLES = np.arange(65536, dtype=np.uint32).astype(np.uint16).view(np.int16).astype(np.int32)
+
+
+def _ulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0x0F) << 3) + _BIAS) << ((u & 0x70) >> 4)
+    return np.where(u & 0x80, _BIAS - t, t - _BIAS).astype(np.int16)
+
+
+def _alaw_decode_table() -> np.ndarray:
+    a   = np.arange(256, dtype=np.int32) ^ 0x55
+    seg = (a & 0x70) >> 4
+    t   = (a & 0x0F) << 4
+    t   = np.where(seg == 0, t + 8, (t + 0x108) << np.maximum(seg - 1, 0))
+    return np.where(a & 0x80, t, -t).astype(np.int16)
+
+
+def _ulaw_encode_table() -> np.ndarray:
+    pcm  = _ALL_SAMPLES >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    pcm  = np.minimum(np.abs(pcm), 8159) + (_BIAS >> 2)
+    seg  = np.searchsorted(_SEG_UEND, pcm)          # first segment with end >= pcm
+    uval = (seg << 4) | ((pcm >> (seg + 1)) & 0x0F)
+    return (np.where(seg >= 8, 0x7F, uval) ^ mask).astype(np.uint8)
+
+
+def _alaw_encode_table() -> np.ndarray:
+    pcm  = _ALL_SAMPLES >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    pcm  = np.where(pcm >= 0, pcm, -pcm - 1)
+    seg  = np.searchsorted(_SEG_AEND, pcm)
+    aval = (seg << 4) | np.where(seg < 2, (pcm >> 1) & 0x0F, (pcm >> np.maximum(seg, 1)) & 0x0F)
+    return (np.where(seg >= 8, 0x7F, aval) ^ mask).astype(np.uint8)
+
+
+ULAW_TO_PCM16 = _ulaw_decode_table()
+ALAW_TO_PCM16 = _alaw_decode_table()
+PCM16_TO_ULAW = _ulaw_encode_table()
+PCM16_TO_ALAW = _alaw_encode_table()
+
+for _table in (ULAW_TO_PCM16, ALAW_TO_PCM16, PCM16_TO_ULAW, PCM16_TO_ALAW):
+    _table.flags.writeable = False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONVERSION
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _as_u8(buf) -> np.ndarray:
+    return buf if isinstance(buf, np.ndarray) else np.frombuffer(buf, dtype=np.uint8)
+
+
+def _as_u16(pcm) -> np.ndarray:
+    if isinstance(pcm, np.ndarray):
+        return pcm.view(np.uint16)
+    return np.frombuffer(pcm, dtype=np.uint16)       # little-endian PCM16 bytes
+
+
+def ulaw_to_pcm16(buf, out: np.ndarray = None) -> np.ndarray:
+    """μ-law bytes → int16 samples."""
+    return np.take(ULAW_TO_PCM16, _as_u8(buf), out=out)
+
+
+def alaw_to_pcm16(buf, out: np.ndarray = None) -> np.ndarray:
+    """A-law bytes → int16 samples."""
+    return np.take(ALAW_TO_PCM16, _as_u8(buf), out=out)
+
+
+def pcm16_to_ulaw(pcm, out: np.ndarray = None) -> np.ndarray:
+    """int16 samples (array or little-endian bytes) → μ-law uint8 array (.tobytes() to send)."""
+    return np.take(PCM16_TO_ULAW, _as_u16(pcm), out=out)
+
+
+def pcm16_to_alaw(pcm, out: np.ndarray = None) -> np.ndarray:
+    """int16 samples (array or little-endian bytes) → A-law uint8 array."""
+    return np.take(PCM16_TO_ALAW, _as_u16(pcm), out=out)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESAMPLING  (8 kHz Twilio ⇄ 24 kHz OpenAI pcm16)
+# ─────────────────────────────────────────────────────────────────────────────
+
+RESAMPLER = "soxr" if soxr is not None else "linear"
+
+
+def _linear_resample(pcm: np.ndarray, in_rate: int, out_rate: int) -> np.ndarray:
+    n_out = (len(pcm) * out_rate) // in_rate
+    if n_out == 0:
+        return np.zeros(0, dtype=np.int16)
+    positions = np.arange(n_out, dtype=np.float64) * (in_rate / out_rate)
+    return np.interp(positions, np.arange(len(pcm)), pcm).astype(np.int16)
+
+
+def resample(pcm: np.ndarray, in_rate: int, out_rate: int) -> np.ndarray:
+    """One-shot int16 resample (whole clip). For live 20 ms chunks use Resampler."""
+    if in_rate == out_rate:
+        return pcm
+    if soxr is not None:
+        return soxr.resample(pcm, in_rate, out_rate, quality="VHQ")
+    return _linear_resample(pcm, in_rate, out_rate)
+
+
+class Resampler:
+    """
+    Streaming int16 resampler for one direction of one call. soxr keeps its
+    filter state between chunks; the linear fallback is stateless per chunk.
+    """
+
+    __slots__ = ("in_rate", "out_rate", "_stream")
+
+    def __init__(self, in_rate: int = TWILIO_RATE, out_rate: int = OPENAI_PCM_RATE):
+        self.in_rate  = in_rate
+        self.out_rate = out_rate
+        self._stream  = (
+            soxr.ResampleStream(in_rate, out_rate, 1, dtype="int16", quality="HQ")
+            if soxr is not None else None
+        )
+
+    def process(self, pcm: np.ndarray, last: bool = False) -> np.ndarray:
+        if self._stream is not None:
+            return self._stream.resample_chunk(pcm, last=last)
+        return _linear_resample(pcm, self.in_rate, self.out_rate)
@@ -8,6 +8,7 @@ import re
 
 CLINIC_START = dt_time(9, 0)    # 9:00 AM
 CLINIC_END   = dt_time(18, 0)   # 6:00 PM
+SLOT_MINUTES = 30               # booking grid: 9:00, 9:30 … 17:30
 
 WEEKDAY_NAMES = {
     "monday": 0, "tuesday": 1, "wednesday": 2,
@@ -133,6 +134,11 @@ def format_date_for_speech(d: date) -> str:
     return d.strftime("%A, %d %B %Y")
 
 
+def format_time_hhmm(t: dt_time) -> str:
+    """Returns: '16:30' — a TIME column value as the executors report it."""
+    return t.strftime("%H:%M") if t is not None else ""
+
+
 def format_time_for_speech(t: dt_time) -> str:
     """Returns: '4:30 PM' — spoken to user."""
     return t.strftime("%I:%M %p").lstrip("0")
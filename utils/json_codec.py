@@ -0,0 +1,93 @@
+"""
+utils/json_codec.py — DentalBot v2
+
+JSON codec for the Twilio <-> OpenAI WebSocket hot path.
+
+- dumps()/loads(): orjson when installed, stdlib otherwise. The stdlib
+  fallback uses compact separators and ensure_ascii=False so the two
+  backends are semantically identical — they decode to the same objects —
+  but not always byte-identical: floats can be written differently
+  (orjson 1e20, stdlib 1e+20)
+- The pre-built frames below are exact: they carry only strings, so they
+  match the stdlib encoding byte for byte (tests/test_json_codec.py)
+- Audio frames skip the encoder entirely: base64 payloads never need JSON
+  escaping, so Twilio "media" frames and OpenAI input_audio_buffer.append
+  messages are built by concatenating pre-encoded templates
+
+Benchmark: python -m benchmarks.bench_json_codec
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:      # optional — stdlib fallback below
+    orjson = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GENERIC ENCODE / DECODE
+# ─────────────────────────────────────────────────────────────────────────────
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    loads = orjson.loads
+
+else:
+    BACKEND = "json"
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(obj) -> str:
+        return _encoder.encode(obj)
+
+    loads = json.loads
+
+
+def stdlib_dumps(obj) -> str:
+    """The fallback encoding, importable for parity checks and benchmarks."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PRE-ENCODED AUDIO FRAMES
+# ─────────────────────────────────────────────────────────────────────────────
+
+_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_APPEND_SUFFIX = '"}'
+
+
+def input_audio_append(audio_b64: str) -> str:
+    """OpenAI input_audio_buffer.append message for a base64 audio chunk."""
+    return _APPEND_PREFIX + audio_b64 + _APPEND_SUFFIX
+
+
+class TwilioMediaFrames:
+    """
+    Builds Twilio outbound "media" frames for one stream:
+        {"event":"media","streamSid":"MZ...","media":{"payload":"<b64>"}}
+    The streamSid part is encoded once per call; each frame is two concats.
+    """
+
+    __slots__ = ("stream_sid", "_prefix", "_clear", "_mark_prefix")
+
+    _SUFFIX = '"}}'
+
+    def __init__(self, stream_sid: str):
+        self.stream_sid   = stream_sid
+        sid_json          = dumps(stream_sid)
+        self._prefix      = '{"event":"media","streamSid":' + sid_json + ',"media":{"payload":"'
+        self._clear       = '{"event":"clear","streamSid":' + sid_json + '}'
+        self._mark_prefix = '{"event":"mark","streamSid":' + sid_json + ',"mark":{"name":'
+
+    def media(self, payload_b64: str) -> str:
+        return self._prefix + payload_b64 + self._SUFFIX
+
+    def clear(self) -> str:
+        return self._clear
+
+    def mark(self, name: str) -> str:
+        return self._mark_prefix + dumps(name) + "}}"
@@ -0,0 +1,140 @@
+"""
+utils/logger.py — DentalBot v2
+
+Logging for the realtime event loop.
+
+- Non-blocking: every "dentalbot.*" logger writes to a QueueHandler; a single
+  QueueListener thread does the actual stdout I/O, so a slow/flushed stdout
+  never stalls an audio loop
+- Call context: bind_call() stores call_sid / stream_sid for the current
+  call; every record logged from that call's tasks (and tool threads started
+  via utils.tool_executor) carries them
+- Sampling: EventSampler counts every OpenAI/Twilio event type but only logs
+  1-in-N of the noisy ones; audio deltas are counted, never logged, and the
+  per-call totals are logged once at call end
+
+LOG_LEVEL env var sets the level (default INFO).
+"""
+
+import os
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+import contextvars
+
+
+LOG_LEVEL  = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)-5s [%(call_sid)s] %(message)s"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CALL CONTEXT
+# One mutable dict per call, set in handle_media_stream *before* its tasks are
+# created — every task copies the contextvar, so they all share the same dict
+# and see call_sid/stream_sid once Twilio's "start" event fills them in.
+# ─────────────────────────────────────────────────────────────────────────────
+
+_call_context = contextvars.ContextVar("dentalbot_call_context", default=None)
+
+
+def bind_call(call_sid: str = None, stream_sid: str = None) -> dict:
+    ctx = {"call_sid": call_sid, "stream_sid": stream_sid}
+    _call_context.set(ctx)
+    return ctx
+
+
+def update_call(**fields):
+    ctx = _call_context.get()
+    if ctx is None:
+        ctx = bind_call()
+    ctx.update({k: v for k, v in fields.items() if v is not None})
+
+
+def current_call() -> dict:
+    return _call_context.get() or {}
+
+
+class _CallContextFilter(logging.Filter):
+    def filter(self, record):
+        ctx = _call_context.get() or {}
+        record.call_sid   = ctx.get("call_sid")   or "-"
+        record.stream_sid = ctx.get("stream_sid") or "-"
+        return True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# QUEUE-BASED SETUP
+# ─────────────────────────────────────────────────────────────────────────────
+
+_listener = None
+
+
+def setup_logging():
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_CallContextFilter())   # read context in the emitting task
+
+    root = logging.getLogger("dentalbot")
+    root.setLevel(LOG_LEVEL)
+    root.handlers[:] = [queue_handler]
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    setup_logging()
+    return logging.getLogger(f"dentalbot.{name}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PER-EVENT-TYPE SAMPLING
+# ─────────────────────────────────────────────────────────────────────────────
+
+# 0 = count only, never log. N = log every Nth occurrence. Unlisted = log all.
+EVENT_SAMPLE_EVERY = {
+    "response.audio.delta":                               0,
+    "response.audio_transcript.delta":                    0,
+    "response.function_call_arguments.delta":             0,
+    "conversation.item.input_audio_transcription.delta":  0,
+    "media":                                              0,   # Twilio inbound audio
+    "mark":                                               0,
+    "rate_limits.updated":                                10,
+    "response.content_part.added":                        10,
+    "response.content_part.done":                         10,
+}
+
+
+class EventSampler:
+    """Per-call event counter that decides which events are worth a log line."""
+
+    def __init__(self, sample_every: dict = None):
+        self.sample_every = EVENT_SAMPLE_EVERY if sample_every is None else sample_every
+        self.counts       = {}
+
+    def should_log(self, event_type: str) -> bool:
+        n = self.counts.get(event_type, 0) + 1
+        self.counts[event_type] = n
+        every = self.sample_every.get(event_type, 1)
+        return every > 0 and (n - 1) % every == 0
+
+    def summary(self) -> str:
+        return ", ".join(f"{k}={v}" for k, v in sorted(self.counts.items(), key=lambda kv: -kv[1]))
@@ -0,0 +1,208 @@
+"""
+utils/metrics.py — DentalBot v2
+
+Tiny in-process metrics registry rendered in Prometheus text format at /metrics.
+
+    TURN_LATENCY = REGISTRY.histogram("dentalbot_turn_latency_seconds", "...")
+    TURN_LATENCY.observe(0.42)
+    TOOL_DURATION.observe(1.3, tool="answer_dental_question", status="SUCCESS")
+
+- Counter / Gauge / Histogram with optional labels
+- Thread-safe (db_cursor() observes from tool executor threads)
+- Collectors: callables returning ready-made exposition lines, for values
+  that are cheaper to read at scrape time (e.g. DB pool stats)
+"""
+
+import threading
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra: dict = None) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labelvalues)]
+    if extra:
+        pairs += [f'{k}="{_escape(v)}"' for k, v in extra.items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# METRIC TYPES
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name       = name
+        self.doc        = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock      = threading.Lock()
+        self._values    = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}"
+            for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}"
+            for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            state["count"] += 1
+            state["sum"]   += value
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state["counts"][i] += 1
+                    break
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(k, dict(v, counts=list(v["counts"]))) for k, v in self._values.items()]
+        lines = self.header()
+        for key, state in items:
+            cumulative = {}
+            running    = 0
+            for upper, n in zip(self.buckets, state["counts"]):
+                running += n
+                cumulative[upper] = running
+            cumulative[float("inf")] = state["count"]
+            lines += format_histogram_samples(
+                self.name, cumulative, state["count"], state["sum"],
+                self.labelnames, key
+            )
+        return lines
+
+
+def format_histogram_samples(name, cumulative: dict, count, total,
+                             labelnames=(), labelvalues=()) -> list:
+    """Exposition lines for a histogram given cumulative {upper_bound: count}."""
+    lines = [
+        f"{name}_bucket{_format_labels(labelnames, labelvalues, {'le': _format_number(float(upper))})} {n}"
+        for upper, n in cumulative.items()
+    ]
+    lines.append(f"{name}_sum{_format_labels(labelnames, labelvalues)} {_format_number(float(total))}")
+    lines.append(f"{name}_count{_format_labels(labelnames, labelvalues)} {count}")
+    return lines
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REGISTRY
+# ─────────────────────────────────────────────────────────────────────────────
+
+class Registry:
+
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self._metrics    = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing     # re-import safe (uvicorn --reload)
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, fn):
+        """fn() -> list of exposition lines, called on every scrape."""
+        with self._lock:
+            if fn not in self._collectors:
+                self._collectors.append(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics    = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for m in metrics:
+            lines += m.render()
+        for fn in collectors:
+            try:
+                lines += fn()
+            except Exception as e:
+                lines.append(f"# collector {getattr(fn, '__name__', fn)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -103,6 +103,29 @@ def normalize_phone(phone: str) -> str:
     return re.sub(r"[^\d]", "", str(phone))[:10]
 
 
+DEFAULT_COUNTRY_CODE = "61"     # Australia
+
+
+def to_e164(phone: str, country_code: str = DEFAULT_COUNTRY_CODE) -> str:
+    """
+    E.164 form stored in patients.contact_e164 — one spelling per number.
+    "0462 361 789"  → "+61462361789"
+    "+61462361789"  → "+61462361789"
+    "61462361789"   → "+61462361789"
+    Partial input keeps its prefix ("0462" → "+61462"), so the same rule
+    builds the LIKE 'prefix%' for console search.
+    """
+    raw    = str(phone or "").strip()
+    digits = re.sub(r"[^\d]", "", raw)
+    if not digits:
+        return ""
+    if raw.startswith("+") or (digits.startswith(country_code) and len(digits) > 10):
+        return "+" + digits
+    if digits.startswith("0"):
+        return f"+{country_code}{digits[1:]}"
+    return f"+{country_code}{digits}"
+
+
 def format_phone_for_speech(phone: str) -> str:
     """
     Format 10-digit number for clear spoken readback — digit by digit.
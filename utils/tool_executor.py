@@ -0,0 +1,105 @@
+"""
+utils/tool_executor.py — DentalBot v2
+
+Runs blocking tool work off the asyncio event loop.
+
+The executors (psycopg2) and the KB / business controllers (sync OpenAI chat
+completions) block for 100 ms – 3 s. Awaiting them directly inside
+handle_function_call freezes every live call's Twilio/OpenAI audio loops.
+
+- One dedicated, bounded ThreadPoolExecutor for all tools (TOOL_WORKERS)
+- Per-tool asyncio.Semaphore so a burst of slow KB questions can't take
+  every worker thread away from bookings and verifications. The permit is
+  held until the worker thread finishes, not until the awaiting coroutine
+  gives up: a dispatch() timeout / retry can't stack extra threads
+"""
+
+import os
+import asyncio
+import functools
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────────────────────────────────────
+
+TOOL_WORKERS             = int(os.getenv("TOOL_WORKERS", "8"))
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+
+# Tools not listed here get DEFAULT_TOOL_CONCURRENCY.
+TOOL_CONCURRENCY = {
+    # gpt-4o-mini chat completions — slowest tools, keep them to a share of the pool
+    "answer_dental_question":    2,
+    "get_business_information":  2,
+    "get_insurance_information": 2,
+    "get_warranty_information":  2,
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EXECUTOR + SEMAPHORES
+# ─────────────────────────────────────────────────────────────────────────────
+
+_executor      = None
+_executor_lock = threading.Lock()
+_semaphores    = {}
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=TOOL_WORKERS,
+                    thread_name_prefix="tool"
+                )
+    return _executor
+
+
+def _get_semaphore(tool_name: str) -> asyncio.Semaphore:
+    sem = _semaphores.get(tool_name)
+    if sem is None:
+        sem = asyncio.Semaphore(TOOL_CONCURRENCY.get(tool_name, DEFAULT_TOOL_CONCURRENCY))
+        _semaphores[tool_name] = sem
+    return sem
+
+
+async def run_tool(tool_name: str, fn, *args, **kwargs):
+    """
+    Run a blocking callable for `tool_name` on the tool executor and await it.
+    Waits on the tool's semaphore first, so at most TOOL_CONCURRENCY[tool_name]
+    of the same tool occupy worker threads at once — counting threads still
+    running for a caller that was cancelled or timed out. The caller's
+    contextvars (call_sid for logging) are carried into the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx  = contextvars.copy_context()
+    sem  = _get_semaphore(tool_name)
+    await sem.acquire()
+    try:
+        future = get_tool_executor().submit(ctx.run, functools.partial(fn, *args, **kwargs))
+    except BaseException:
+        sem.release()
+        raise
+    # runs on the worker thread (or here, if cancelled before it started)
+    future.add_done_callback(lambda _: _release_threadsafe(loop, sem))
+    return await asyncio.wrap_future(future, loop=loop)
+
+
+def _release_threadsafe(loop, sem: asyncio.Semaphore):
+    try:
+        loop.call_soon_threadsafe(sem.release)
+    except RuntimeError:    # loop closed at shutdown — nothing left to admit
+        pass
+
+
+def shutdown_tool_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
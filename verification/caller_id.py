@@ -0,0 +1,113 @@
+"""
+verification/caller_id.py — DentalBot v2
+
+Caller-ID lookups started from the /voice webhook, keyed by Twilio CallSid.
+
+Twilio's webhook carries the caller's number ("From") about a second before
+/media-stream opens. Looking it up there means the session knows which
+accounts are registered to the number before the caller says a word, and a
+returning patient can be verified with their date of birth alone
+(verify_caller_dob) instead of last name + DOB + readback.
+
+    start_lookup(call_sid, from_number)      # from /voice — never blocks the webhook
+    session["caller_lookup"] = asyncio.create_task(claim(call_sid))   # /media-stream
+    candidates = await resolve(session)      # only where needed — [] if none
+
+- One indexed query (idx_patients_contact_e164) per call; errors and
+  withheld numbers just mean no candidates — the normal flow still works
+- Lookups nobody claims within CALLER_ID_TTL_S are dropped
+- The claim runs alongside the greeting and the OpenAI handshake; resolve()
+  is awaited only by what needs the answer (the CALL CONTEXT item,
+  verify_caller_dob), so a slow lookup never delays the call's start
+- Per-process, like the pre-warmed sockets (realtime/prewarm.py)
+"""
+
+import os
+import asyncio
+
+from verification.verification_executor import afind_patients_by_phone
+from utils.logger import get_logger
+from utils.metrics import REGISTRY
+
+log = get_logger("caller_id")
+
+CALLER_ID_ENABLED         = os.getenv("CALLER_ID_ENABLED", "1") == "1"
+CALLER_ID_TTL_S           = float(os.getenv("CALLER_ID_TTL_S", "20"))
+CALLER_ID_CLAIM_TIMEOUT_S = float(os.getenv("CALLER_ID_CLAIM_TIMEOUT_S", "1.5"))
+CALLER_ID_MAX_PENDING     = int(os.getenv("CALLER_ID_MAX_PENDING", "200"))
+
+CALLER_ID_TOTAL = REGISTRY.counter(
+    "dentalbot_caller_id_total",
+    "Caller-ID lookups by outcome.",
+    labelnames=("outcome",)     # started | skipped | found | not_found | failed | expired
+)
+
+_pending = {}   # call_sid -> (lookup task, expiry task)
+
+
+async def _expire(call_sid: str):
+    await asyncio.sleep(CALLER_ID_TTL_S)
+    entry = _pending.pop(call_sid, None)
+    if entry is not None:
+        CALLER_ID_TOTAL.inc(outcome="expired")
+        entry[0].cancel()
+
+
+def start_lookup(call_sid: str, from_number: str):
+    if not CALLER_ID_ENABLED or not call_sid or not from_number or call_sid in _pending:
+        return
+    if len(_pending) >= CALLER_ID_MAX_PENDING:
+        CALLER_ID_TOTAL.inc(outcome="skipped")
+        return
+
+    _pending[call_sid] = (
+        asyncio.create_task(afind_patients_by_phone(from_number)),
+        asyncio.create_task(_expire(call_sid))
+    )
+    CALLER_ID_TOTAL.inc(outcome="started")
+
+
+async def claim(call_sid: str, timeout: float = CALLER_ID_CLAIM_TIMEOUT_S) -> list:
+    """Candidate patient dicts for this call's number ([] when none / unknown)."""
+    entry = _pending.pop(call_sid, None) if call_sid else None
+    if entry is None:
+        return []
+
+    lookup, expiry = entry
+    expiry.cancel()
+    try:
+        result = await asyncio.wait_for(lookup, timeout)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        CALLER_ID_TOTAL.inc(outcome="failed")
+        log.warning("[CALLER ID] Lookup unusable (%s) — normal verification", type(e).__name__)
+        return []
+
+    if result["status"] == "ERROR":
+        CALLER_ID_TOTAL.inc(outcome="failed")
+        return []
+
+    candidates = result["candidates"]
+    CALLER_ID_TOTAL.inc(outcome="found" if candidates else "not_found")
+    log.info("[CALLER ID] %d candidate account(s) | %s", len(candidates), call_sid)
+    return candidates
+
+
+async def resolve(session: dict) -> list:
+    """The session's caller-ID candidates, waiting for its claim if still running."""
+    lookup = session.get("caller_lookup")
+    if lookup is not None:
+        candidates = await asyncio.shield(lookup)
+        if session.get("caller_lookup") is lookup:   # first to resolve stores it
+            session["caller_lookup"]     = None
+            session["caller_candidates"] = candidates
+    return session.get("caller_candidates") or []
+
+
+def close_all():
+    entries = list(_pending.values())
+    _pending.clear()
+    for lookup, expiry in entries:
+        lookup.cancel()
+        expiry.cancel()
@@ -1,20 +1,78 @@
 """
 Verification Executor - DentalBot v2
 Old logic + new db_cursor() syntax.
+Async twins (averify_by_lastname_dob, ...) run the same SQL via adb_cursor().
 """
 
-from db.db_connection import db_cursor
-from utils.phone_utils import normalize_phone
+from db.db_connection import db_cursor, adb_cursor
+from utils.phone_utils import normalize_phone, to_e164
 from utils.text_utils import title_case
 from utils.date_time_utils import dob_to_db_format
 from utils.date_time_utils import normalize_dob
-import traceback
+from utils.logger import get_logger
+
+log = get_logger("verification")
+
+
+# WHERE matches idx_patients_lastname_dob (lower(trim(last_name)), date_of_birth)
+# expression-for-expression — change one, change both. The parameter is
+# already stripped + lowercased in Python, so it is compared as-is.
+_PATIENT_BY_LASTNAME_DOB_SQL = """
+    SELECT patient_id, first_name, last_name,
+        date_of_birth, contact_number, insurance_info
+    FROM patients
+    WHERE lower(trim(last_name)) = %s
+    AND date_of_birth = %s::date
+"""
+
+# contact_e164 is written on insert (to_e164) and backfilled by
+# db/migrations/001_patients_contact_e164.py; idx_patients_contact_e164.
+_PATIENT_BY_LASTNAME_DOB_CONTACT_SQL = _PATIENT_BY_LASTNAME_DOB_SQL + """
+    AND contact_e164 = %s
+"""
+
+
+def _patient_row_to_dict(status: str, row) -> dict:
+    return {
+        "status":         status,
+        "patient_id":     row[0],
+        "first_name":     title_case(row[1]),
+        "last_name":      title_case(row[2]),
+        "date_of_birth":  str(row[3]),
+        "contact_number": row[4],
+        "insurance_info": row[5]
+    }
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # VERIFY BY LAST NAME + DOB
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _verify_lastname_dob_result(rows) -> dict:
+    if not rows:
+        return {
+            "status":  "NOT_FOUND",
+            "message": (
+                "I'm sorry, I couldn't find any account with that last name "
+                "and date of birth. Please check your details or let me know "
+                "if you'd like to create a new account."
+            )
+        }
+
+    if len(rows) > 1:
+        return {
+            "status":  "MULTIPLE_FOUND",
+            "message": (
+                "I found more than one account with that name and date of birth. "
+                "Could you please provide your contact number so I can confirm "
+                "which account is yours?"
+            ),
+            "count": len(rows)
+        }
+
+    return _patient_row_to_dict("VERIFIED", rows[0])
+
+
 def verify_by_lastname_dob(last_name: str, dob: str) -> dict:
     if not last_name or not dob:
         return {
@@ -28,50 +86,34 @@ def verify_by_lastname_dob(last_name: str, dob: str) -> dict:
 
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT patient_id, first_name, last_name,
-                    date_of_birth, contact_number, insurance_info
-                FROM patients
-                WHERE TRIM(LOWER(last_name)) = TRIM(%s)
-                AND date_of_birth = %s::date
-            """, (last_name_clean, dob_clean))
+            cursor.execute(_PATIENT_BY_LASTNAME_DOB_SQL, (last_name_clean, dob_clean))
             rows = cursor.fetchall()
+        return _verify_lastname_dob_result(rows)
+
+    except Exception as e:
+        log.exception("[VERIFY] ❌ verify_by_lastname_dob failed")
+        return {"status": "ERROR", "message": str(e)}
+
 
-        if not rows:
-            return {
-                "status":  "NOT_FOUND",
-                "message": (
-                    "I'm sorry, I couldn't find any account with that last name "
-                    "and date of birth. Please check your details or let me know "
-                    "if you'd like to create a new account."
-                )
-            }
-
-        if len(rows) > 1:
-            return {
-                "status":  "MULTIPLE_FOUND",
-                "message": (
-                    "I found more than one account with that name and date of birth. "
-                    "Could you please provide your contact number so I can confirm "
-                    "which account is yours?"
-                ),
-                "count": len(rows)
-            }
-
-        row = rows[0]
+async def averify_by_lastname_dob(last_name: str, dob: str) -> dict:
+    if not last_name or not dob:
         return {
-            "status":         "VERIFIED",
-            "patient_id":     row[0],
-            "first_name":     title_case(row[1]),
-            "last_name":      title_case(row[2]),
-            "date_of_birth":  str(row[3]),
-            "contact_number": row[4],
-            "insurance_info": row[5]
+            "status":  "MISSING_INFO",
+            "message": "Last name and date of birth are both required."
         }
+    dob = normalize_dob(dob)
+
+    dob_clean       = dob_to_db_format(dob)
+    last_name_clean = last_name.strip().lower()
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_PATIENT_BY_LASTNAME_DOB_SQL, (last_name_clean, dob_clean))
+            rows = await cursor.fetchall()
+        return _verify_lastname_dob_result(rows)
 
     except Exception as e:
-        print("[VERIFY] ❌ verify_by_lastname_dob failed:")
-        traceback.print_exc()
+        log.exception("[VERIFY] ❌ averify_by_lastname_dob failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -79,53 +121,176 @@ def verify_by_lastname_dob(last_name: str, dob: str) -> dict:
 # VERIFY WITH CONTACT NUMBER (disambiguation)
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _verify_contact_result(rows) -> dict:
+    # 04xx vs +614xx is settled by contact_e164 — the row already matched
+    if rows:
+        return _patient_row_to_dict("VERIFIED", rows[0])
+
+    return {
+        "status":  "NOT_FOUND",
+        "message": (
+            "I'm sorry, I still couldn't verify your account with those details. "
+            "Please double-check your information or contact us directly for assistance."
+        )
+    }
+
+
 def verify_by_lastname_dob_contact(last_name: str, dob: str, contact_number: str) -> dict:
     dob_clean       = dob_to_db_format(dob)
     last_name_clean = last_name.strip().lower()
-    contact_clean   = normalize_phone(contact_number)   # ✅ normalize before comparing
+    contact_e164    = to_e164(contact_number)   # ✅ same spelling as the stored column
 
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                SELECT patient_id, first_name, last_name,
-                    date_of_birth, contact_number, insurance_info
-                FROM patients
-                WHERE TRIM(LOWER(last_name)) = TRIM(%s)
-                AND date_of_birth = %s::date
-            """, (last_name_clean, dob_clean))
+            cursor.execute(_PATIENT_BY_LASTNAME_DOB_CONTACT_SQL,
+                           (last_name_clean, dob_clean, contact_e164))
             rows = cursor.fetchall()
+        return _verify_contact_result(rows)
 
-        # ✅ Normalize stored number before comparing — handles 04xx vs +614xx
-        for row in rows:
-            if normalize_phone(row[4]) == contact_clean:
-                return {
-                    "status":         "VERIFIED",
-                    "patient_id":     row[0],
-                    "first_name":     title_case(row[1]),
-                    "last_name":      title_case(row[2]),
-                    "date_of_birth":  str(row[3]),
-                    "contact_number": row[4],
-                    "insurance_info": row[5]
-                }
+    except Exception as e:
+        log.exception("[VERIFY] ❌ verify_by_lastname_dob_contact failed")
+        return {"status": "ERROR", "message": str(e)}
 
-        return {
-            "status":  "NOT_FOUND",
-            "message": (
-                "I'm sorry, I still couldn't verify your account with those details. "
-                "Please double-check your information or contact us directly for assistance."
-            )
-        }
+
+async def averify_by_lastname_dob_contact(last_name: str, dob: str, contact_number: str) -> dict:
+    dob_clean       = dob_to_db_format(dob)
+    last_name_clean = last_name.strip().lower()
+    contact_e164    = to_e164(contact_number)
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_PATIENT_BY_LASTNAME_DOB_CONTACT_SQL,
+                                 (last_name_clean, dob_clean, contact_e164))
+            rows = await cursor.fetchall()
+        return _verify_contact_result(rows)
 
     except Exception as e:
-        print("[VERIFY] ❌ verify_by_lastname_dob_contact failed:")
-        traceback.print_exc()
+        log.exception("[VERIFY] ❌ averify_by_lastname_dob_contact failed")
         return {"status": "ERROR", "message": str(e)}
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# CALLER-ID LOOKUP (Twilio "From" → candidate accounts, before the caller speaks)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Twilio sends From in E.164 already — an exact idx_patients_contact_e164 probe
+_PATIENTS_BY_PHONE_SQL = """
+    SELECT patient_id, first_name, last_name,
+        date_of_birth, contact_number, insurance_info
+    FROM patients
+    WHERE contact_e164 = %s
+    ORDER BY patient_id
+    LIMIT %s
+"""
+
+CALLER_ID_MAX_CANDIDATES = 5     # a shared family phone, not a call centre
+
+
+def _caller_id_result(rows) -> dict:
+    if not rows:
+        return {"status": "NOT_FOUND", "candidates": []}
+    return {
+        "status":     "FOUND",
+        "candidates": [_patient_row_to_dict("CANDIDATE", row) for row in rows]
+    }
+
+
+def find_patients_by_phone(caller_number: str) -> dict:
+    caller_e164 = to_e164(caller_number)
+    if not caller_e164:
+        return {"status": "NOT_FOUND", "candidates": []}
+
+    try:
+        with db_cursor() as (cursor, conn):
+            cursor.execute(_PATIENTS_BY_PHONE_SQL, (caller_e164, CALLER_ID_MAX_CANDIDATES))
+            rows = cursor.fetchall()
+        return _caller_id_result(rows)
+
+    except Exception as e:
+        log.exception("[VERIFY] ❌ find_patients_by_phone failed")
+        return {"status": "ERROR", "message": str(e), "candidates": []}
+
+
+async def afind_patients_by_phone(caller_number: str) -> dict:
+    caller_e164 = to_e164(caller_number)
+    if not caller_e164:
+        return {"status": "NOT_FOUND", "candidates": []}
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_PATIENTS_BY_PHONE_SQL, (caller_e164, CALLER_ID_MAX_CANDIDATES))
+            rows = await cursor.fetchall()
+        return _caller_id_result(rows)
+
+    except Exception as e:
+        log.exception("[VERIFY] ❌ afind_patients_by_phone failed")
+        return {"status": "ERROR", "message": str(e), "candidates": []}
+
+
+def verify_caller_id_dob(candidates: list, dob: str) -> dict:
+    """
+    Confirm one caller-ID candidate by date of birth alone — no DB round trip.
+    Same VERIFIED shape as verify_by_lastname_dob().
+    """
+    dob_clean = dob_to_db_format(normalize_dob(dob)) if dob else ""
+    if not dob_clean:
+        return {"status": "MISSING_INFO", "message": "Date of birth is required."}
+
+    matches = [
+        c for c in candidates
+        if dob_to_db_format(normalize_dob(c["date_of_birth"])) == dob_clean
+    ]
+    if len(matches) == 1:
+        return dict(matches[0], status="VERIFIED")
+    return {
+        "status":  "NOT_FOUND",
+        "message": (
+            "I couldn't match that date of birth to the account for this number. "
+            "Let's verify you with your last name instead."
+        )
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CREATE NEW PATIENT
 # ─────────────────────────────────────────────────────────────────────────────
 
+_CREATE_PATIENT_SQL = """
+    INSERT INTO patients
+        (first_name, last_name, date_of_birth, contact_number, contact_e164, insurance_info)
+    VALUES (%s, %s, %s::date, %s, %s, %s)
+    RETURNING patient_id
+"""
+
+
+def _prepare_new_patient(first_name, last_name, dob, contact_number, insurance_info):
+    dob_clean     = dob_to_db_format(dob)
+    contact_clean = normalize_phone(contact_number)   # ✅ normalize before storing
+    params = (
+        title_case(first_name),
+        title_case(last_name),
+        dob_clean,
+        contact_clean,
+        # from the raw number, as the lookups are: normalize_phone() keeps 10
+        # digits, which cuts "+61 462 361 789" to 6146236178
+        to_e164(contact_number),
+        insurance_info
+    )
+    return params, dob_clean, contact_clean
+
+
+def _created_result(patient_id, first_name, last_name, dob_clean, contact_clean, insurance_info):
+    return {
+        "status":         "CREATED",
+        "patient_id":     patient_id,
+        "first_name":     title_case(first_name),
+        "last_name":      title_case(last_name),
+        "date_of_birth":  dob_clean,
+        "contact_number": contact_clean,
+        "insurance_info": insurance_info
+    }
+
+
 def create_new_patient(first_name: str, last_name: str, dob: str,
                        contact_number: str, insurance_info: str = None) -> dict:
     if not all([first_name, last_name, dob, contact_number]):
@@ -134,38 +299,45 @@ def create_new_patient(first_name: str, last_name: str, dob: str,
             "message": "First name, last name, date of birth, and contact number are all required."
         }
 
-    dob_clean     = dob_to_db_format(dob)
-    contact_clean = normalize_phone(contact_number)   # ✅ normalize before storing
+    params, dob_clean, contact_clean = _prepare_new_patient(
+        first_name, last_name, dob, contact_number, insurance_info
+    )
 
     try:
         with db_cursor() as (cursor, conn):
-            cursor.execute("""
-                INSERT INTO patients
-                    (first_name, last_name, date_of_birth, contact_number, insurance_info)
-                VALUES (%s, %s, %s::date, %s, %s)
-                RETURNING patient_id
-            """, (
-                title_case(first_name),
-                title_case(last_name),
-                dob_clean,
-                contact_clean,
-                insurance_info
-            ))
+            cursor.execute(_CREATE_PATIENT_SQL, params)
             patient_id = cursor.fetchone()[0]
 
+        return _created_result(patient_id, first_name, last_name,
+                               dob_clean, contact_clean, insurance_info)
+
+    except Exception as e:
+        log.exception("[VERIFY] ❌ create_new_patient failed")
+        return {"status": "ERROR", "message": str(e)}
+
+
+async def acreate_new_patient(first_name: str, last_name: str, dob: str,
+                              contact_number: str, insurance_info: str = None) -> dict:
+    if not all([first_name, last_name, dob, contact_number]):
         return {
-            "status":         "CREATED",
-            "patient_id":     patient_id,
-            "first_name":     title_case(first_name),
-            "last_name":      title_case(last_name),
-            "date_of_birth":  dob_clean,
-            "contact_number": contact_clean,
-            "insurance_info": insurance_info
+            "status":  "MISSING_INFO",
+            "message": "First name, last name, date of birth, and contact number are all required."
         }
 
+    params, dob_clean, contact_clean = _prepare_new_patient(
+        first_name, last_name, dob, contact_number, insurance_info
+    )
+
+    try:
+        async with adb_cursor() as (cursor, conn):
+            await cursor.execute(_CREATE_PATIENT_SQL, params)
+            patient_id = (await cursor.fetchone())[0]
+
+        return _created_result(patient_id, first_name, last_name,
+                               dob_clean, contact_clean, insurance_info)
+
     except Exception as e:
-        print("[VERIFY] ❌ create_new_patient failed:")
-        traceback.print_exc()
+        log.exception("[VERIFY] ❌ acreate_new_patient failed")
         return {"status": "ERROR", "message": str(e)}
 
 
@@ -187,16 +359,8 @@ def get_patient_by_id(patient_id: int) -> dict:
         if not row:
             return {"status": "NOT_FOUND"}
 
-        return {
-            "status":         "FOUND",
-            "patient_id":     row[0],
-            "first_name":     title_case(row[1]),
-            "last_name":      title_case(row[2]),
-            "date_of_birth":  str(row[3]),
-            "contact_number": row[4],
-            "insurance_info": row[5]
-        }
+        return _patient_row_to_dict("FOUND", row)
 
     except Exception as e:
-        traceback.print_exc()
+        log.exception("[VERIFY] ❌ get_patient_by_id failed")
         return {"status": "ERROR", "message": str(e)}